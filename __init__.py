@@ -0,0 +1,97 @@
+bl_info = {
+    "name": "Blender Startup Tools",
+    "author": "Your Name",
+    "version": (2, 0),
+    "blender": (4, 3, 0),
+    "location": "3D View pie menus (Shift+J, Shift+X, Shift+Q, Alt+Shift+N, Alt+Space, F1/F2/F3, Alt+F1)",
+    "description": "Vertex alignment and joining, Geometry Nodes generation, view and gizmo pie menus",
+    "warning": "",
+    "wiki_url": "",
+    "category": "3D View",
+}
+
+import importlib
+import sys
+import time
+
+import bpy
+
+# Порядок регистрации модулей; тяжёлые зависимости (numpy, bmesh, ядра)
+# модули импортируют сами при первом вызове оператора
+MODULE_NAMES = (
+    "instrumentation",
+    "mesh_checkpoints",
+    "align_vertices_exclude_axis",
+    "join_nearest_vertices",
+    "geometry_nodes_tools",
+    "primitive_sync",
+    "prefetch",
+    "align_view_pie_menu",
+    "manipulator_pie_menu",
+    "disable_shift_f3_f4",
+)
+# Модули без классов, которые подгружаются лениво, но держат обработчики и кэши
+LAZY_MODULE_NAMES = (
+    "mesh_snapshot",
+    "selection_frames",
+    "base_curve",
+)
+REGISTRATION_BUDGET_S = 0.05
+
+addon_keymaps = []
+registration_time = None
+
+
+def _modules():
+    return [importlib.import_module(f".{name}", __package__) for name in MODULE_NAMES]
+
+
+def _register_keymaps(modules):
+    # В фоновом режиме (blender -b) конфигурации клавиш аддонов нет
+    keyconfig = bpy.context.window_manager.keyconfigs.addon
+    if keyconfig is None:
+        return
+
+    km = keyconfig.keymaps.new(name="3D View", space_type='VIEW_3D')
+    for module in modules:
+        for idname, key_type, modifiers, properties in module.keymap_items:
+            kmi = km.keymap_items.new(idname, type=key_type, value='PRESS', **modifiers)
+            for name, value in properties.items():
+                setattr(kmi.properties, name, value)
+            addon_keymaps.append((km, kmi))
+
+
+def register():
+    global registration_time
+    start = time.perf_counter()
+
+    modules = _modules()
+    for module in modules:
+        for cls in module.classes:
+            bpy.utils.register_class(cls)
+        if hasattr(module, "register"):
+            module.register()
+    _register_keymaps(modules)
+
+    registration_time = time.perf_counter() - start
+    if registration_time > REGISTRATION_BUDGET_S:
+        print(f"Blender Startup Tools registered in {registration_time * 1000:.1f} ms "
+              f"(budget {REGISTRATION_BUDGET_S * 1000:.0f} ms).")
+
+
+def unregister():
+    for km, kmi in addon_keymaps:
+        km.keymap_items.remove(kmi)
+    addon_keymaps.clear()
+
+    for module in reversed(_modules()):
+        if hasattr(module, "unregister"):
+            module.unregister()
+        for cls in reversed(module.classes):
+            bpy.utils.unregister_class(cls)
+
+    # Ленивые модули выгружаются, только если успели загрузиться
+    for name in LAZY_MODULE_NAMES:
+        module = sys.modules.get(f"{__package__}.{name}")
+        if module and hasattr(module, "unregister"):
+            module.unregister()
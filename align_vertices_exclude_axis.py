@@ -1,24 +1,137 @@
-bl_info = {
-    "name": "Align Vertices with Axis Exclusion and Grouping",
-    "author": "Your Name",
-    "version": (1, 2),
-    "blender": (3, 6, 0),
-    "location": "Hotkey (Shift+X)",
-    "description": "Pie Menu for Aligning Vertices with Axis Exclusion and Grouping by Distance",
-    "warning": "",
-    "wiki_url": "",
-    "category": "3D View",
-}
+"""Align vertices with axis exclusion and grouping by distance (Shift+X)."""
 
 import bpy
-import bmesh
-from mathutils import Vector
+
+from . import instrumentation
+
+AXIS_INDEX = {'X': 0, 'Y': 1, 'Z': 2}
+
+
+# Встроенные ориентации трансформации, для которых есть свой режим;
+# остальные (Gimbal, Parent) сводятся к локальным осям
+TRANSFORM_ORIENTATIONS = {'GLOBAL', 'LOCAL', 'NORMAL', 'VIEW', 'CURSOR'}
+
+
+def _resolve_orientation(context, orientation):
+    if orientation != 'TRANSFORM':
+        return orientation
+    slot = context.scene.transform_orientation_slots[0]
+    if slot.custom_orientation is not None:
+        return 'CUSTOM'
+    return slot.type if slot.type in TRANSFORM_ORIENTATIONS else 'LOCAL'
+
+
+def orientation_matrix(context, obj, orientation):
+    """3x3 matrix taking local mesh coordinates into the alignment frame, or None.
+
+    Columns of the frame are its X, Y and Z axes in world space, and the
+    result is the transposed frame times the object's world matrix, so merge
+    distances are in world units for every orientation except Local.
+    """
+    import numpy as np
+    from . import selection_frames
+
+    orientation = _resolve_orientation(context, orientation)
+    if orientation == 'LOCAL':
+        return np.identity(3)
+
+    if orientation == 'GLOBAL':
+        axes = np.identity(3)
+    elif orientation == 'CUSTOM':
+        custom = context.scene.transform_orientation_slots[0].custom_orientation
+        if custom is None:
+            return None
+        axes = np.array(custom.matrix, dtype=np.float64)
+    elif orientation == 'NORMAL':
+        axes = selection_frames.selection_frame(obj)
+    elif orientation == 'VIEW':
+        if context.region_data is None:
+            return None
+        axes = np.array(context.region_data.view_rotation.to_matrix(), dtype=np.float64)
+    else:
+        axes = np.array(context.scene.cursor.matrix.to_3x3().normalized(), dtype=np.float64)
+
+    matrix = axes.T @ np.array(obj.matrix_world.to_3x3(), dtype=np.float64)
+    # Вырожденный масштаб не обратить, выравниваем в локальных осях
+    if abs(np.linalg.det(matrix)) < 1e-12:
+        return np.identity(3)
+    return matrix
+
+
+def align_selection(co, axis, merge_distance, fit, matrix, merge_threshold=None, grouping='FIRST'):
+    """Align the selected coordinates of one mesh; return (coords, group count, weld map).
+
+    ``grouping`` is the ``linkage`` of ``geometry_kernels.cluster_by_distance``.
+    With a ``merge_threshold`` the weld map holds (sources, targets)
+    positions into ``co`` collapsing every group that coincides after
+    alignment, otherwise it is None.
+    """
+    import numpy as np
+    from . import geometry_kernels
+
+    coords = co.astype(np.float64) @ matrix.T
+    axes = [i for i in range(3) if i != axis]
+
+    # Group vertices based on distance, ignoring the excluded axis
+    projected = coords.copy()
+    projected[:, axis] = 0.0
+    groups = geometry_kernels.cluster_by_distance(projected, merge_distance, grouping)
+
+    # Align each group
+    if fit == 'AXES':
+        coords = geometry_kernels.align_clusters(coords, groups, axes)
+    else:
+        coords = geometry_kernels.fit_clusters(coords, groups, fit)
+
+    # Совпавшие группы берутся из тех же кластеров, без нового поиска по расстоянию
+    weld = None
+    if merge_threshold is not None:
+        weld = geometry_kernels.coincident_clusters(coords, groups, merge_threshold)
+    return coords @ np.linalg.inv(matrix).T, len(groups), weld
+
+
+def write_aligned(obj, selected, coords, weld):
+    """Write aligned coordinates back, welding the coincident groups in the same pass.
+
+    Returns the number of vertices merged.
+    """
+    from . import mesh_snapshot
+
+    if weld is None or not len(weld[0]):
+        mesh_snapshot.write_coords(obj, selected, coords)
+        return 0
+    sources, targets = weld
+    return mesh_snapshot.write_and_weld(obj, selected, coords, selected[sources], selected[targets])
+
+
+def align_object(obj, exclude_axis='X', merge_distance=0.1, fit='AXES', matrix=None, merge_threshold=None,
+                 grouping='FIRST'):
+    """Scripting entry point: align the selected vertices of a mesh object in any mode.
+
+    In object mode the mesh is read and written with foreach_get/foreach_set
+    and never converted to BMesh, unless ``merge_threshold`` is given and
+    coincident groups are welded. Returns the number of groups aligned.
+    """
+    import numpy as np
+    from . import mesh_snapshot
+
+    snapshot = mesh_snapshot.get_snapshot(obj)
+    selected = snapshot.selected_indices()
+    if not len(selected):
+        return 0
+    matrix = np.identity(3) if matrix is None else np.asarray(matrix, dtype=np.float64)
+    coords, group_count, weld = align_selection(snapshot.co[selected], AXIS_INDEX[exclude_axis], merge_distance,
+                                                fit, matrix, merge_threshold, grouping)
+    write_aligned(obj, selected, coords, weld)
+    return group_count
 
 
 class AlignVerticesExcludeAxisOperator(bpy.types.Operator):
     """Align vertices excluding one axis"""
     bl_idname = "mesh.align_vertices_exclude_axis"
     bl_label = "Align Vertices"
+    bl_description = ("Align vertices excluding one axis. Every vertex joins the first group that has a vertex "
+                      "within the merge distance; with Chained grouping any chain of close vertices forms one group")
     bl_options = {'REGISTER', 'UNDO'}
 
     exclude_axis: bpy.props.EnumProperty(
@@ -40,65 +153,102 @@ class AlignVerticesExcludeAxisOperator(bpy.types.Operator):
         precision=4,
     )
 
+    grouping: bpy.props.EnumProperty(
+        name="Grouping",
+        description="How vertices within the merge distance are gathered into groups",
+        items=[
+            ('FIRST', "First Match", "Every vertex, in index order, joins the first group that has a vertex "
+                                     "within the merge distance"),
+            ('SINGLE', "Chained", "Vertices linked by any chain of neighbors within the merge distance form one "
+                                  "group, however far the chain reaches"),
+        ],
+        default='FIRST'
+    )
+
+    fit: bpy.props.EnumProperty(
+        name="Fit",
+        description="Shape every group of vertices is snapped to",
+        items=[
+            ('AXES', "Centroid", "Snap the group to its centroid along the two non-excluded axes"),
+            ('LINE', "Best-Fit Line", "Project the group onto its own best-fit line"),
+            ('PLANE', "Best-Fit Plane", "Project the group onto its own best-fit plane"),
+        ],
+        default='AXES'
+    )
+
+    orientation: bpy.props.EnumProperty(
+        name="Orientation",
+        description="Axes the excluded axis and the merge distance refer to",
+        items=[
+            ('LOCAL', "Local", "Object's local axes"),
+            ('GLOBAL', "Global", "World axes"),
+            ('NORMAL', "Normal", "Tangent frame of the selection, Z along its average normal"),
+            ('VIEW', "View", "Axes of the 3D viewport"),
+            ('CUSTOM', "Custom", "The scene's active custom transform orientation"),
+            ('TRANSFORM', "Transform", "Whatever transform orientation the scene currently uses"),
+        ],
+        default='LOCAL'
+    )
+
+    merge_coincident: bpy.props.BoolProperty(
+        name="Merge Coincident",
+        description="Weld every group whose vertices coincide after alignment, reusing the groups just found",
+        default=False
+    )
+
+    merge_threshold: bpy.props.FloatProperty(
+        name="Merge Threshold",
+        description="Largest spread along any axis for an aligned group to count as coincident",
+        default=0.0001,
+        min=0.0,
+        precision=6,
+    )
+
+    @instrumentation.instrumented
     def execute(self, context):
-        obj = context.object
-        if not obj or obj.mode != 'EDIT':
-            self.report({'WARNING'}, "Please enter Edit Mode and select vertices.")
+        from . import mesh_snapshot, multi_edit
+
+        objects = multi_edit.mesh_objects(context)
+        if not objects:
+            self.report({'WARNING'}, "Please select mesh objects or enter Edit Mode and select vertices.")
             return {'CANCELLED'}
 
-        bm = bmesh.from_edit_mesh(obj.data)
-        selected_verts = [v for v in bm.verts if v.select]
+        # Извлечение данных — в основном потоке, ядра — в пуле потоков; нормали для
+        # ориентации по выделению читаются в том же проходе
+        normals = _resolve_orientation(context, self.orientation) == 'NORMAL'
+        jobs = []
+        for obj in objects:
+            snapshot = mesh_snapshot.get_snapshot(obj, normals=normals and obj.mode == 'EDIT')
+            selected = snapshot.selected_indices()
+            if len(selected):
+                jobs.append((obj, snapshot.co[selected], selected))
 
-        if not selected_verts:
+        if not jobs:
             self.report({'WARNING'}, "No vertices selected.")
             return {'CANCELLED'}
 
-        # Group vertices based on distance
-        groups = []
-        for vert in selected_verts:
-            found_group = None
-            for group in groups:
-                for other_vert in group:
-                    if self.is_within_distance(vert.co, other_vert.co):
-                        found_group = group
-                        break
-                if found_group:
-                    break
-            if found_group:
-                found_group.append(vert)
-            else:
-                groups.append([vert])
-
-        # Align each group
-        for group in groups:
-            avg_position = Vector((0.0, 0.0, 0.0))
-            for vert in group:
-                avg_position += vert.co
-            avg_position /= len(group)
-
-            for vert in group:
-                if self.exclude_axis == 'X':
-                    vert.co.y = avg_position.y
-                    vert.co.z = avg_position.z
-                elif self.exclude_axis == 'Y':
-                    vert.co.x = avg_position.x
-                    vert.co.z = avg_position.z
-                elif self.exclude_axis == 'Z':
-                    vert.co.x = avg_position.x
-                    vert.co.y = avg_position.y
-
-        bmesh.update_edit_mesh(obj.data)
-        return {'FINISHED'}
+        matrices = [orientation_matrix(context, obj, self.orientation) for obj, _co, _sel in jobs]
+        if any(matrix is None for matrix in matrices):
+            self.report({'WARNING'}, "The chosen orientation is not available here.")
+            return {'CANCELLED'}
+
+        # Свойства оператора читаем до запуска потоков: RNA не потокобезопасна
+        options = (AXIS_INDEX[self.exclude_axis], self.merge_distance, self.fit)
+        merge_threshold = self.merge_threshold if self.merge_coincident else None
+        results = multi_edit.run_parallel(
+            align_selection, [(co, *options, matrix, merge_threshold, self.grouping)
+                              for (_obj, co, _sel), matrix in zip(jobs, matrices)])
+        instrumentation.note(objects=len(jobs),
+                             selected_verts=sum(len(selected) for _obj, _co, selected in jobs),
+                             groups=sum(group_count for _coords, group_count, _weld in results))
 
-    def is_within_distance(self, co1, co2):
-        """Check if two coordinates are within the merge distance, excluding the selected axis."""
-        if self.exclude_axis == 'X':
-            dist = (co1.y - co2.y) ** 2 + (co1.z - co2.z) ** 2
-        elif self.exclude_axis == 'Y':
-            dist = (co1.x - co2.x) ** 2 + (co1.z - co2.z) ** 2
-        elif self.exclude_axis == 'Z':
-            dist = (co1.x - co2.x) ** 2 + (co1.y - co2.y) ** 2
-        return dist <= self.merge_distance ** 2
+        merged = 0
+        for (obj, _co, selected), (coords, _group_count, weld) in zip(jobs, results):
+            merged += write_aligned(obj, selected, coords, weld)
+        if self.merge_coincident:
+            instrumentation.note(merged_verts=merged)
+            self.report({'INFO'}, f"Merged {merged} vertices.")
+        return {'FINISHED'}
 
 
 class AlignVerticesPieMenuMT(bpy.types.Menu):  # Переименовано
@@ -111,31 +261,17 @@ class AlignVerticesPieMenuMT(bpy.types.Menu):  # Переименовано
         pie.operator("mesh.align_vertices_exclude_axis", text="Exclude X").exclude_axis = 'X'
         pie.operator("mesh.align_vertices_exclude_axis", text="Exclude Y").exclude_axis = 'Y'
         pie.operator("mesh.align_vertices_exclude_axis", text="Exclude Z").exclude_axis = 'Z'
+        pie.menu("VIEW3D_MT_coordinate_checkpoints_submenu", text="Checkpoints")
+        pie.operator("mesh.align_vertices_exclude_axis", text="Fit Lines").fit = 'LINE'
+        pie.operator("mesh.align_vertices_exclude_axis", text="Fit Planes").fit = 'PLANE'
+        pie.operator("mesh.align_vertices_exclude_axis", text="Align and Merge").merge_coincident = True
 
 
-addon_keymaps = []
-
-
-def register():
-    bpy.utils.register_class(AlignVerticesExcludeAxisOperator)
-    bpy.utils.register_class(AlignVerticesPieMenuMT)
-
-    wm = bpy.context.window_manager
-    km = wm.keyconfigs.addon.keymaps.new(name="3D View", space_type='VIEW_3D')
-    kmi = km.keymap_items.new("wm.call_menu_pie", type='X', value='PRESS', shift=True)
-    kmi.properties.name = "VIEW3D_MT_align_vertices_pie_menu"
-    addon_keymaps.append((km, kmi))
-
-    print("Pie menu 'Align Vertices' registered with hotkey Shift+X.")
-
-
-def unregister():
-    for km, kmi in addon_keymaps:
-        km.keymap_items.remove(kmi)
-    addon_keymaps.clear()
-    bpy.utils.unregister_class(AlignVerticesExcludeAxisOperator)
-    bpy.utils.unregister_class(AlignVerticesPieMenuMT)
-
+classes = (
+    AlignVerticesExcludeAxisOperator,
+    AlignVerticesPieMenuMT,
+)
 
-if __name__ == "__main__":
-    register()
+keymap_items = (
+    ("wm.call_menu_pie", 'X', {'shift': True}, {'name': AlignVerticesPieMenuMT.bl_idname}),
+)
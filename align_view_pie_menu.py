@@ -1,21 +1,27 @@
-bl_info = {
-    "name": "Align View to Active with Orthographic",
-    "author": "Your Name",
-    "version": (1, 1),
-    "blender": (3, 6, 0),
-    "location": "Hotkey (Shift+Q)",
-    "description": "Pie Menu for Aligning View to Active with Orthographic View",
-    "warning": "",
-    "wiki_url": "",
-    "category": "3D View",
-}
+"""Pie Menu for Aligning View to Active with Orthographic View (Shift+Q)."""
 
 import bpy
-import math
-import mathutils
+
+from . import instrumentation
 
 ALIGN_VIEW_OPERATOR = "view3d.align_view_to_active_geometry"
 
+# Оси вида (X, Y, Z) для каждого направления как (столбец кадра, знак);
+# столбцы кадра выделения — касательная, бикасательная и нормаль
+VIEW_AXES = {
+    'TOP': ((0, 1), (1, 1), (2, 1)),
+    'BOTTOM': ((0, 1), (1, -1), (2, -1)),
+    'FRONT': ((0, 1), (2, 1), (1, -1)),
+    'BACK': ((0, -1), (2, 1), (1, 1)),
+    'RIGHT': ((1, 1), (2, 1), (0, 1)),
+    'LEFT': ((1, -1), (2, 1), (0, -1)),
+}
+# Перевороты поворачивают текущий вид на 180° вокруг его оси
+FLIP_AXES = {
+    'TOP_FLIP': 'Z',
+    'FRONT_FLIP': 'Y',
+}
+
 
 class AlignViewToActiveOperator(bpy.types.Operator):
     bl_idname = ALIGN_VIEW_OPERATOR
@@ -23,29 +29,34 @@ class AlignViewToActiveOperator(bpy.types.Operator):
     bl_description = "Align view to active direction"
     axis: bpy.props.StringProperty()
 
-    def execute(self, _context):
-        region_3d = bpy.context.space_data.region_3d
-
-        if self.axis == 'TOP':
-            bpy.ops.view3d.view_axis(type='TOP', align_active=True)
-        elif self.axis == 'BOTTOM':
-            bpy.ops.view3d.view_axis(type='BOTTOM', align_active=True)
-        elif self.axis == 'FRONT':
-            bpy.ops.view3d.view_axis(type='FRONT', align_active=True)
-        elif self.axis == 'BACK':
-            bpy.ops.view3d.view_axis(type='BACK', align_active=True)
-        elif self.axis == 'RIGHT':
-            bpy.ops.view3d.view_axis(type='RIGHT', align_active=True)
-        elif self.axis == 'LEFT':
-            bpy.ops.view3d.view_axis(type='LEFT', align_active=True)
-        elif self.axis == 'TOP_FLIP':
-            flip_rotation = mathutils.Matrix.Rotation(math.pi, 4, 'Z')
-            region_3d.view_rotation = region_3d.view_rotation @ flip_rotation.to_quaternion()
-        elif self.axis == 'FRONT_FLIP':
-            flip_rotation = mathutils.Matrix.Rotation(math.pi, 4, 'Y')
-            region_3d.view_rotation = region_3d.view_rotation @ flip_rotation.to_quaternion()
+    @classmethod
+    def poll(cls, context):
+        return context.space_data is not None and context.space_data.type == 'VIEW_3D'
+
+    @instrumentation.instrumented
+    def execute(self, context):
+        import math
+        import mathutils
 
-        bpy.context.space_data.region_3d.view_perspective = 'ORTHO'
+        region_3d = context.space_data.region_3d
+
+        if self.axis in FLIP_AXES:
+            flip_rotation = mathutils.Matrix.Rotation(math.pi, 4, FLIP_AXES[self.axis])
+            region_3d.view_rotation = region_3d.view_rotation @ flip_rotation.to_quaternion()
+        elif self.axis in VIEW_AXES:
+            from . import selection_frames
+
+            frame = selection_frames.selection_frame(context.active_object)
+            if frame is None:
+                self.report({'WARNING'}, "No active object to align the view to.")
+                return {'CANCELLED'}
+            columns = [frame[:, column] * sign for column, sign in VIEW_AXES[self.axis]]
+            rotation = mathutils.Matrix([tuple(c) for c in columns]).transposed()
+            region_3d.view_rotation = rotation.to_quaternion()
+        else:
+            return {'CANCELLED'}
+
+        region_3d.view_perspective = 'ORTHO'
         return {'FINISHED'}
 
 
@@ -65,28 +76,11 @@ class VIEW3D_MT_AlignViewToActivePieMenu(bpy.types.Menu):  # Имя меню и
         pie.operator(ALIGN_VIEW_OPERATOR, text="Front Flip", icon='FORWARD').axis = 'FRONT_FLIP'
 
 
-addon_keymaps = []
-
-
-def register():
-    bpy.utils.register_class(AlignViewToActiveOperator)
-    bpy.utils.register_class(VIEW3D_MT_AlignViewToActivePieMenu)
-    wm = bpy.context.window_manager
-    km = wm.keyconfigs.addon.keymaps.new(name="3D View", space_type='VIEW_3D')
-    kmi = km.keymap_items.new("wm.call_menu_pie", type='Q', value='PRESS', shift=True)
-    kmi.properties.name = "VIEW3D_MT_AlignViewToActivePieMenu"
-    addon_keymaps.append((km, kmi))
-
-    print("Pie menu 'Align View to Active' registered with hotkey Shift+Q.")
-
-
-def unregister():
-    for km, kmi in addon_keymaps:
-        km.keymap_items.remove(kmi)
-    addon_keymaps.clear()
-    bpy.utils.unregister_class(AlignViewToActiveOperator)
-    bpy.utils.unregister_class(VIEW3D_MT_AlignViewToActivePieMenu)  # Изменено имя
-
+classes = (
+    AlignViewToActiveOperator,
+    VIEW3D_MT_AlignViewToActivePieMenu,
+)
 
-if __name__ == "__main__":
-    register()
+keymap_items = (
+    ("wm.call_menu_pie", 'Q', {'shift': True}, {'name': "VIEW3D_MT_AlignViewToActivePieMenu"}),
+)
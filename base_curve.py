@@ -0,0 +1,116 @@
+"""Ordered polyline of the saved base group, persisted on the object.
+
+Save Base Group walks the base group into an ordered chain or loop and
+stores the ordered indices, cumulative arc length and segment tangents as
+custom properties next to ``base_group``, with a fingerprint of the base
+coordinates. Equalize validates the fingerprint and reuses the stored
+arrays (and, within a session, the polyline's KD-tree) instead of
+re-deriving neighbors and tangents on every run.
+"""
+
+import zlib
+
+import numpy as np
+
+from . import geometry_kernels
+
+ORDER_KEY = "base_polyline"
+CLOSED_KEY = "base_polyline_closed"
+ARC_LENGTH_KEY = "base_polyline_arc_length"
+TANGENTS_KEY = "base_polyline_tangents"
+FINGERPRINT_KEY = "base_polyline_fingerprint"
+KEYS = (ORDER_KEY, CLOSED_KEY, ARC_LENGTH_KEY, TANGENTS_KEY, FINGERPRINT_KEY)
+
+# Полилинии по имени объекта: (отпечаток, Polyline с построенным KD-деревом)
+_cache = {}
+
+
+def fingerprint(co, ordered):
+    """Digest of the ordered base vertices and their coordinates."""
+    digest = zlib.crc32(np.ascontiguousarray(co[ordered], dtype=np.float32).tobytes(),
+                        zlib.crc32(np.asarray(ordered, dtype=np.int64).tobytes()))
+    return f"{len(ordered)}:{digest:08x}"
+
+
+def clear(obj):
+    for key in KEYS:
+        if key in obj:
+            del obj[key]
+    _cache.pop(obj.name, None)
+
+
+def save(obj, snapshot, base):
+    """Order the base group, persist its polyline on the object and return it.
+
+    Returns None (and drops any stored polyline) when the base group
+    branches or falls apart, so it cannot be walked as one curve.
+    """
+    result = geometry_kernels.order_polyline(
+        snapshot.vert_count, base, snapshot.adjacency_indptr, snapshot.adjacency_indices)
+    if result is None:
+        clear(obj)
+        return None
+
+    ordered, closed = result
+    polyline = geometry_kernels.Polyline(snapshot.co[ordered], closed, indices=ordered)
+    key = fingerprint(snapshot.co, ordered)
+    obj[ORDER_KEY] = ordered.tolist()
+    obj[CLOSED_KEY] = closed
+    obj[ARC_LENGTH_KEY] = polyline.cumulative.tolist()
+    obj[TANGENTS_KEY] = polyline.tangents.ravel().tolist()
+    obj[FINGERPRINT_KEY] = key
+    _cache[obj.name] = (key, polyline)
+    return polyline
+
+
+def load_stored(obj, snapshot):
+    """Polyline of the object's base group if the stored one still matches the mesh, else None.
+
+    Read-only: uses the in-memory polyline or the persisted arrays, and
+    never re-orders the base group or writes custom properties.
+    """
+    if not obj.get("base_group") or ORDER_KEY not in obj:
+        return None
+    ordered = np.asarray(obj[ORDER_KEY], dtype=np.int64)
+    if not len(ordered) or ordered.max() >= snapshot.vert_count:
+        return None
+
+    key = fingerprint(snapshot.co, ordered)
+    cached = _cache.get(obj.name)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    if obj.get(FINGERPRINT_KEY) != key:
+        return None
+
+    polyline = geometry_kernels.Polyline(
+        snapshot.co[ordered], bool(obj[CLOSED_KEY]),
+        cumulative=np.asarray(obj[ARC_LENGTH_KEY], dtype=np.float64),
+        tangents=np.asarray(obj[TANGENTS_KEY], dtype=np.float64),
+        indices=ordered,
+    )
+    _cache[obj.name] = (key, polyline)
+    return polyline
+
+
+def load(obj, snapshot):
+    """Polyline of the object's base group that matches the current mesh, or None.
+
+    Uses the stored polyline while its fingerprint matches, and re-orders
+    and re-persists the base group when the base vertices moved or the
+    stored order no longer fits the mesh.
+    """
+    if not obj.get("base_group"):
+        return None
+    polyline = load_stored(obj, snapshot)
+    if polyline is not None:
+        return polyline
+
+    ordered = np.asarray(obj.get(ORDER_KEY, ()), dtype=np.int64)
+    if not len(ordered) or ordered.max() >= snapshot.vert_count:
+        ordered = np.asarray(obj["base_group"], dtype=np.int64)
+    # Порядок ещё не сохранён, базовые вершины сдвинулись или топология изменилась
+    return save(obj, snapshot, ordered)
+
+
+def unregister():
+    _cache.clear()
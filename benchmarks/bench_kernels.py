@@ -0,0 +1,309 @@
+"""Benchmark the geometry kernels against the original per-vertex algorithms.
+
+Runs with plain ``python`` and NumPy, no Blender required:
+
+    python benchmarks/bench_kernels.py --sizes 1000,10000,100000 --output results.json
+    python benchmarks/bench_kernels.py --compare results.json
+
+Reference timings are only taken up to ``--reference-limit`` elements,
+since the original algorithms are quadratic. Wherever a reference runs, the
+kernel result is checked against it, so a faster but wrong kernel fails the
+run instead of showing up as a speedup.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import geometry_kernels  # noqa: E402
+import reference  # noqa: E402
+import synthetic  # noqa: E402
+
+MERGE_DISTANCE = 0.01
+
+
+def same_groups(groups, expected):
+    """Whether two lists of index groups form the same partition, in any order."""
+    return sorted(sorted(g) for g in map(list, groups)) == sorted(sorted(g) for g in expected)
+
+
+def nearest_match(co, pairs, expected):
+    # Равноудалённые вершины допустимы в любом порядке, сравниваются расстояния
+    expected = np.asarray(expected)
+    return np.allclose(np.linalg.norm(co[pairs[:, 0]] - co[pairs[:, 1]], axis=1),
+                       np.linalg.norm(co[expected[:, 0]] - co[expected[:, 1]], axis=1))
+
+
+def positions_match(result, expected, tolerance=1e-5):
+    """Whether (indices, positions) from a kernel match a {index: position} reference."""
+    indices, positions = result
+    if sorted(np.asarray(indices).tolist()) != sorted(expected):
+        return False
+    reference_positions = np.array([expected[i] for i in np.asarray(indices).tolist()]).reshape(-1, 3)
+    return np.allclose(positions, reference_positions, atol=tolerance)
+
+
+def case_components(size):
+    co, edges, group1, group2 = synthetic.edge_loops(size // 2)
+    mask = np.ones(len(co), dtype=bool)
+    neighbors = reference.adjacency(edges.tolist(), len(co))
+    return (
+        lambda: geometry_kernels.connected_components(edges, mask),
+        lambda: reference.find_vertex_groups(range(len(co)), neighbors),
+        same_groups,
+    )
+
+
+def case_nearest_pairs(size):
+    co, edges, group1, group2 = synthetic.edge_loops(size // 2)
+    co_list = [tuple(v) for v in co.tolist()]
+    return (
+        lambda: geometry_kernels.nearest_pairs(co, group1, group2),
+        lambda: reference.find_nearest_pairs(co_list, group1.tolist(), group2.tolist()),
+        lambda pairs, expected: nearest_match(co, pairs, expected),
+    )
+
+
+def case_nearest_candidates(size):
+    co, edges, group1, group2 = synthetic.edge_loops(size // 2)
+    # Запасные кандидаты для проверки разрезов; прежний алгоритм брал только ближайшего
+    return (
+        lambda: geometry_kernels.nearest_candidates(co, group1, group2, 4),
+        None,
+        None,
+    )
+
+
+def case_clustering(size):
+    points = synthetic.point_cloud(size, spread=MERGE_DISTANCE / 4)
+    projected = points.copy()
+    projected[:, 0] = 0.0
+    co_list = [tuple(v) for v in points.tolist()]
+
+    def aligned_to(aligned, groups):
+        # Каждая группа эталона должна оказаться в среднем своих точек по осям Y и Z
+        expected = points.copy()
+        for group in groups:
+            expected[group, 1:] = points[group, 1:].mean(axis=0)
+        return np.allclose(aligned, expected)
+
+    return (
+        lambda: geometry_kernels.align_clusters(
+            points, geometry_kernels.cluster_by_distance(projected, MERGE_DISTANCE), [1, 2]),
+        lambda: reference.cluster_by_distance(co_list, MERGE_DISTANCE, exclude_axis=0),
+        aligned_to,
+    )
+
+
+def case_cluster_fit(size):
+    points = synthetic.point_cloud(size, cluster_size=8, spread=MERGE_DISTANCE / 4)
+    clusters = geometry_kernels.cluster_by_distance(points, MERGE_DISTANCE)
+
+    def per_cluster():
+        # Прежний подход: отдельный eigh на каждый кластер
+        result = points.copy()
+        for members in clusters:
+            centered = points[members] - points[members].mean(axis=0)
+            direction = np.linalg.eigh(centered.T @ centered)[1][:, 2]
+            result[members] = points[members].mean(axis=0) + np.outer(centered @ direction, direction)
+        return result
+
+    return (
+        lambda: geometry_kernels.fit_clusters(points, clusters, 'LINE'),
+        per_cluster,
+        lambda fitted, expected: np.allclose(fitted, expected, atol=1e-9),
+    )
+
+
+def case_equalize(size):
+    co, edges, base, moved = synthetic.strip(size // 2)
+    indptr, indices = geometry_kernels.build_adjacency(edges, len(co))
+    co_list = [tuple(v) for v in co.tolist()]
+    neighbors = reference.adjacency(edges.tolist(), len(co))
+    return (
+        lambda: geometry_kernels.equalize_positions(co, base, moved, indptr, indices, orthogonal=True),
+        lambda: reference.equalize_positions(co_list, neighbors, base.tolist(), moved.tolist(), orthogonal=True),
+        positions_match,
+    )
+
+
+def case_relax(size):
+    co, edges, base, moved = synthetic.strip(size // 2)
+    indptr, indices = geometry_kernels.build_adjacency(edges, len(co))
+    ordered, closed = geometry_kernels.order_polyline(len(co), base, indptr, indices)
+
+    def relax():
+        # Как в операторе: обход кривой от базовой вершины, соединённой с вершиной ребром
+        polyline = geometry_kernels.Polyline(co[ordered], closed, indices=ordered)
+        start = geometry_kernels.joined_base_parameters(polyline, moved, indptr, indices)
+        return geometry_kernels.relax_spacing(co, polyline, moved, start=start)
+
+    # У релаксации нет прежнего аналога, эталон не замеряется
+    return relax, None, None
+
+
+def case_equalize_polyline(size):
+    co, edges, base, moved = synthetic.strip(size // 2)
+    indptr, indices = geometry_kernels.build_adjacency(edges, len(co))
+    ordered, closed = geometry_kernels.order_polyline(len(co), base, indptr, indices)
+    polyline = geometry_kernels.Polyline(co[ordered], closed)
+    polyline.project(co[:1])
+    co_list = [tuple(v) for v in co.tolist()]
+    neighbors = reference.adjacency(edges.tolist(), len(co))
+    # Эталон ставит вершину от ближайшей базовой вершины, а ядро - от точной проекции
+    # на полилинию, поэтому результаты совпадают лишь с точностью до шага базы
+    spacing = float(np.median(np.diff(polyline.cumulative)))
+    # Дерево полилинии уже построено, как при повторном запуске с сохранённой базой
+    return (
+        lambda: geometry_kernels.equalize_along_polyline(co, polyline, moved, orthogonal=True),
+        lambda: reference.equalize_positions(co_list, neighbors, base.tolist(), moved.tolist(), orthogonal=True),
+        lambda result, expected: positions_match(result, expected, tolerance=spacing),
+    )
+
+
+def case_sphere(size):
+    segments = max(int(np.sqrt(size * 2)), 8)
+    co, polygon_count = synthetic.uv_sphere(segments, max(size // segments, 3))
+    co_list = [tuple(v) for v in co.tolist()]
+    return (
+        lambda: geometry_kernels.sphere_parameters(co, polygon_count),
+        lambda: reference.sphere_segments(co_list),
+        lambda parameters, segments: parameters[0] == segments,
+    )
+
+
+def case_cylinder(size):
+    co, normals, sizes = synthetic.cylinder(size // 2)
+    co_list = [tuple(v) for v in co.tolist()]
+    return (
+        lambda: geometry_kernels.cylinder_parameters(co, geometry_kernels.cylinder_cap_normal(normals, sizes)),
+        lambda: reference.cylinder_parameters(co_list, tuple(normals[0])),
+        lambda parameters, expected: parameters[0] == expected[0] and np.allclose(parameters[1:], expected[1:]),
+    )
+
+
+def case_ransac_sphere(size):
+    co, normals = synthetic.scanned_sphere(size)
+    # Точная подгонка по топологии на сканах не работает, эталона нет
+    return (
+        lambda: geometry_kernels.fit_sphere(co, co, normals),
+        None,
+        None,
+    )
+
+
+def case_ransac_cylinder(size):
+    co, normals = synthetic.scanned_cylinder(size)
+    return (
+        lambda: geometry_kernels.fit_cylinder(co, co, normals),
+        None,
+        None,
+    )
+
+
+CASES = {
+    "connected_components": case_components,
+    "nearest_pairs": case_nearest_pairs,
+    "nearest_candidates": case_nearest_candidates,
+    "cluster_align": case_clustering,
+    "cluster_fit": case_cluster_fit,
+    "equalize_positions": case_equalize,
+    "equalize_polyline": case_equalize_polyline,
+    "relax_spacing": case_relax,
+    "sphere_parameters": case_sphere,
+    "cylinder_parameters": case_cylinder,
+    "ransac_sphere": case_ransac_sphere,
+    "ransac_cylinder": case_ransac_cylinder,
+}
+
+
+def best_time(func, repeat):
+    """Best time of ``repeat`` runs, and the result of the last run."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def run(kernels, sizes, repeat, reference_limit):
+    results = []
+    for name in kernels:
+        for size in sizes:
+            kernel, baseline, check = CASES[name](size)
+            kernel_s, output = best_time(kernel, repeat)
+            entry = {"kernel": name, "size": size, "kernel_s": kernel_s, "reference_s": None, "matches": None}
+            if baseline is not None and size <= reference_limit:
+                entry["reference_s"], expected = best_time(baseline, 1)
+                entry["matches"] = bool(check(output, expected))
+            results.append(entry)
+
+            speedup = ""
+            if entry["reference_s"] is not None:
+                speedup = f"  reference {entry['reference_s']:.4f}s  x{entry['reference_s'] / entry['kernel_s']:.1f}"
+                if not entry["matches"]:
+                    speedup += "  MISMATCH"
+            print(f"{name:<22}{size:>10}  kernel {entry['kernel_s']:.4f}s{speedup}")
+    return results
+
+
+def compare(results, baseline_path, tolerance):
+    """Print kernels slower than the stored baseline by more than the tolerance factor."""
+    with open(baseline_path) as f:
+        baseline = {(r["kernel"], r["size"]): r["kernel_s"] for r in json.load(f)["results"]}
+
+    regressions = []
+    for entry in results:
+        previous = baseline.get((entry["kernel"], entry["size"]))
+        if previous and entry["kernel_s"] > previous * tolerance:
+            regressions.append(entry)
+            print(f"REGRESSION {entry['kernel']} @ {entry['size']}: "
+                  f"{previous:.4f}s -> {entry['kernel_s']:.4f}s")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000",
+                        help="comma separated element counts")
+    parser.add_argument("--kernels", default=",".join(CASES), help="comma separated kernel names")
+    parser.add_argument("--repeat", type=int, default=3, help="kernel runs per size, the best is kept")
+    parser.add_argument("--reference-limit", type=int, default=2000,
+                        help="largest size the quadratic reference implementations are timed at")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="JSON results to check for regressions against")
+    parser.add_argument("--tolerance", type=float, default=1.25,
+                        help="slowdown factor reported as a regression")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    kernels = [k for k in args.kernels.split(",") if k]
+    results = run(kernels, sizes, args.repeat, args.reference_limit)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "platform": platform.platform(),
+                "results": results,
+            }, f, indent=2)
+
+    mismatches = [entry for entry in results if entry["matches"] is False]
+    for entry in mismatches:
+        print(f"MISMATCH {entry['kernel']} @ {entry['size']}: kernel result differs from the reference")
+    if mismatches or (args.compare and compare(results, args.compare, args.tolerance)):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Pure-Python ports of the original per-vertex operator algorithms.
+
+They mirror the loops that used to live inside the operators' ``execute``
+methods, with tuples in place of BMesh vertices, and serve as the baseline
+the NumPy kernels are timed against.
+"""
+
+import math
+
+
+def sub(a, b):
+    return a[0] - b[0], a[1] - b[1], a[2] - b[2]
+
+
+def length(a):
+    return math.sqrt(a[0] * a[0] + a[1] * a[1] + a[2] * a[2])
+
+
+def normalized(a):
+    n = length(a)
+    return (a[0] / n, a[1] / n, a[2] / n) if n else a
+
+
+def cross(a, b):
+    return a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0]
+
+
+def adjacency(edges, vert_count):
+    neighbors = [[] for _ in range(vert_count)]
+    for a, b in edges:
+        neighbors[a].append(b)
+        neighbors[b].append(a)
+    return neighbors
+
+
+def find_vertex_groups(verts, neighbors):
+    verts = set(verts)
+    visited = set()
+    groups = []
+    for v in sorted(verts):
+        if v in visited:
+            continue
+        group = []
+        stack = [v]
+        while stack:
+            current = stack.pop()
+            if current not in visited:
+                visited.add(current)
+                group.append(current)
+                for neighbor in neighbors[current]:
+                    if neighbor in verts and neighbor not in visited:
+                        stack.append(neighbor)
+        groups.append(group)
+    return groups
+
+
+def find_nearest_pairs(co, group1, group2):
+    return [(v1, min(group2, key=lambda v2: length(sub(co[v1], co[v2])))) for v1 in group1]
+
+
+def cluster_by_distance(co, merge_distance, exclude_axis=0):
+    def is_within_distance(a, b):
+        dist = sum((a[i] - b[i]) ** 2 for i in range(3) if i != exclude_axis)
+        return dist <= merge_distance ** 2
+
+    groups = []
+    for vert in range(len(co)):
+        found_group = None
+        for group in groups:
+            for other in group:
+                if is_within_distance(co[vert], co[other]):
+                    found_group = group
+                    break
+            if found_group:
+                break
+        if found_group:
+            found_group.append(vert)
+        else:
+            groups.append([vert])
+    return groups
+
+
+def equalize_positions(co, neighbors, group1, group2, distance_factor=1.0, orthogonal=False):
+    base = set(group1)
+    result = {}
+    for v2 in group2:
+        closest = min(group1, key=lambda bv: length(sub(co[v2], co[bv])))
+        near = [n for n in neighbors[closest] if n in base]
+        if not near:
+            continue
+        if len(near) == 1:
+            tangent = normalized(sub(co[closest], co[near[0]]))
+        else:
+            tangent = normalized(sub(co[near[1]], co[near[0]]))
+        offset = sub(co[v2], co[closest])
+        edge_length = length(offset) * distance_factor
+        if orthogonal:
+            direction = normalized(cross(normalized(cross(tangent, offset)), tangent))
+        else:
+            direction = normalized(offset)
+        result[v2] = tuple(co[closest][i] + direction[i] * edge_length for i in range(3))
+    return result
+
+
+def sphere_segments(co):
+    temp_z = round(co[4][2], 4)
+    return sum(1 for v in co if round(v[2], 4) == temp_z)
+
+
+def cylinder_parameters(co, normal):
+    projection = [v[0] * normal[0] + v[1] * normal[1] + v[2] * normal[2] for v in co]
+    min_proj = min(projection)
+    height = max(projection) - min_proj
+    base = [v for v, p in zip(co, projection) if round(p, 4) == round(min_proj, 4)]
+    center = tuple(sum(v[i] for v in base) / len(base) for i in range(3))
+    radius = sum(length(sub(v, center)) for v in base) / len(base)
+    return len(base), height, radius
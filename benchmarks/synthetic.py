@@ -0,0 +1,117 @@
+"""Synthetic meshes for the kernel benchmarks, built directly as NumPy arrays."""
+
+import numpy as np
+
+
+def circle(count, radius=1.0, z=0.0):
+    angles = np.linspace(0.0, 2.0 * np.pi, count, endpoint=False)
+    return np.column_stack((np.cos(angles) * radius, np.sin(angles) * radius, np.full(count, z)))
+
+
+def loop_edges(count, offset=0):
+    indices = np.arange(count)
+    return np.column_stack((indices, (indices + 1) % count)) + offset
+
+
+def edge_loops(count, seed=0):
+    """Two concentric, slightly noisy edge loops of ``count`` vertices each.
+
+    Returns (co, edges, group1, group2) with the first loop as group1.
+    """
+    rng = np.random.default_rng(seed)
+    inner = circle(count, 1.0)
+    outer = circle(count, 1.2) + rng.normal(scale=1e-3, size=(count, 3))
+    co = np.vstack((inner, outer))
+    edges = np.vstack((loop_edges(count), loop_edges(count, count)))
+    return co, edges, np.arange(count), np.arange(count, 2 * count)
+
+
+def strip(count, seed=0):
+    """A base polyline along X with a noisy parallel row of vertices joined to it.
+
+    Returns (co, edges, base, moved).
+    """
+    rng = np.random.default_rng(seed)
+    xs = np.linspace(0.0, 10.0, count)
+    base = np.column_stack((xs, np.zeros(count), np.zeros(count)))
+    moved = base + np.column_stack((rng.normal(scale=0.02, size=count),
+                                    1.0 + rng.normal(scale=0.1, size=count),
+                                    np.zeros(count)))
+    indices = np.arange(count)
+    edges = np.vstack((np.column_stack((indices[:-1], indices[1:])),
+                       np.column_stack((indices, indices + count))))
+    return np.vstack((base, moved)), edges, indices, indices + count
+
+
+def point_cloud(count, cluster_size=4, spread=1e-3, seed=0):
+    """Random points grouped in tight clusters of ``cluster_size`` near-coincident copies."""
+    rng = np.random.default_rng(seed)
+    centers = rng.random((max(count // cluster_size, 1), 3)) * np.cbrt(count)
+    points = np.repeat(centers, cluster_size, axis=0)[:count]
+    return points + rng.uniform(-spread, spread, size=points.shape)
+
+
+def uv_sphere(segments, rings, radius=1.0):
+    """Vertices of a UV sphere ring by ring, followed by the two poles.
+
+    Returns (co, polygon_count).
+    """
+    heights = np.linspace(np.pi, 0.0, rings + 1)[1:-1]
+    angles = np.linspace(0.0, 2.0 * np.pi, segments, endpoint=False)
+    theta, phi = np.meshgrid(heights, angles, indexing='ij')
+    co = np.column_stack((
+        (np.sin(theta) * np.cos(phi)).ravel(),
+        (np.sin(theta) * np.sin(phi)).ravel(),
+        np.cos(theta).ravel(),
+    )) * radius
+    co = np.vstack((co, [(0.0, 0.0, -radius), (0.0, 0.0, radius)]))
+    return co, segments * rings
+
+
+def cylinder(vertices, depth=2.0, radius=1.0):
+    """Vertices of a capped cylinder along Z plus its polygon normals and sizes.
+
+    Returns (co, polygon_normals, polygon_sizes).
+    """
+    co = np.vstack((circle(vertices, radius, -depth / 2), circle(vertices, radius, depth / 2)))
+    angles = np.linspace(0.0, 2.0 * np.pi, vertices, endpoint=False) + np.pi / vertices
+    sides = np.column_stack((np.cos(angles), np.sin(angles), np.zeros(vertices)))
+    normals = np.vstack(([(0.0, 0.0, -1.0), (0.0, 0.0, 1.0)], sides))
+    sizes = np.concatenate(([vertices, vertices], np.full(vertices, 4)))
+    return co, normals, sizes
+
+
+def scanned_cylinder(count, radius=1.0, depth=2.0, noise=0.005, outliers=0.1, seed=0):
+    """Noisy surface samples of a tilted, off-centre cylinder with random outliers.
+
+    Returns (co, normals) of ``count`` points, as a scan would give them.
+    """
+    rng = np.random.default_rng(seed)
+    axis = np.array([1.0, 1.0, 0.3]) / np.linalg.norm([1.0, 1.0, 0.3])
+    u = np.cross(axis, [0.0, 0.0, 1.0])
+    u /= np.linalg.norm(u)
+    v = np.cross(axis, u)
+    angles = rng.uniform(0.0, 2.0 * np.pi, count)
+    radial = np.cos(angles)[:, None] * u + np.sin(angles)[:, None] * v
+    heights = rng.uniform(-depth / 2, depth / 2, count)
+    co = (0.5, -0.25, 1.0) + radius * radial + heights[:, None] * axis + rng.normal(scale=noise, size=(count, 3))
+    normals = radial + rng.normal(scale=10 * noise, size=(count, 3))
+
+    stray = int(count * outliers)
+    co[:stray] = rng.uniform(-2 * depth, 2 * depth, (stray, 3))
+    normals[:stray] = rng.normal(size=(stray, 3))
+    return co, normals
+
+
+def scanned_sphere(count, radius=1.0, noise=0.005, outliers=0.1, seed=0):
+    """Noisy surface samples of an off-centre sphere with random outliers, as (co, normals)."""
+    rng = np.random.default_rng(seed)
+    directions = rng.normal(size=(count, 3))
+    directions /= np.linalg.norm(directions, axis=1, keepdims=True)
+    co = (0.5, -0.25, 1.0) + radius * directions + rng.normal(scale=noise, size=(count, 3))
+    normals = directions + rng.normal(scale=10 * noise, size=(count, 3))
+
+    stray = int(count * outliers)
+    co[:stray] = rng.uniform(-2 * radius, 2 * radius, (stray, 3))
+    normals[:stray] = rng.normal(size=(stray, 3))
+    return co, normals
@@ -0,0 +1,129 @@
+"""Storage of lightweight vertex coordinate checkpoints.
+
+Checkpoints keep only vertex indices and float32 coordinates, read and
+written in bulk, in a bounded ring per object.
+"""
+
+import tempfile
+import zlib
+from collections import deque
+
+import numpy as np
+
+MAX_CHECKPOINTS = 8
+
+# Кольцевые буферы чекпоинтов по имени объекта
+_checkpoints = {}
+
+
+class CoordinateCheckpoint:
+    """Coordinates of a subset of vertices stored as index + float32 arrays."""
+
+    def __init__(self, vert_count, indices, coords, storage='MEMORY'):
+        self.vert_count = vert_count
+        self.count = len(indices)
+        self.storage = storage
+        self._file = None
+
+        indices = np.ascontiguousarray(indices, dtype=np.int32)
+        coords = np.ascontiguousarray(coords, dtype=np.float32).reshape(-1, 3)
+
+        if storage == 'COMPRESSED':
+            # Индексы выделения обычно идут подряд, поэтому разности сжимаются почти в ноль
+            deltas = np.diff(indices, prepend=np.int32(0)).astype(np.int32)
+            self._indices = zlib.compress(deltas.tobytes(), 1)
+            self._coords = zlib.compress(coords.tobytes(), 1)
+        elif storage == 'MEMMAP':
+            self._file = tempfile.TemporaryFile(prefix="vertex_checkpoint_")
+            self._indices = indices
+            self._coords = np.memmap(self._file, dtype=np.float32, mode='w+', shape=coords.shape)
+            self._coords[:] = coords
+            self._coords.flush()
+        else:
+            self._indices = indices
+            self._coords = coords
+
+    @property
+    def nbytes(self):
+        """Resident size of the checkpoint in bytes (memory-mapped coordinates are not counted)."""
+        if self.storage == 'COMPRESSED':
+            return len(self._indices) + len(self._coords)
+        if self.storage == 'MEMMAP':
+            return self._indices.nbytes
+        return self._indices.nbytes + self._coords.nbytes
+
+    def indices(self):
+        if self.storage == 'COMPRESSED':
+            deltas = np.frombuffer(zlib.decompress(self._indices), dtype=np.int32)
+            return np.cumsum(deltas, dtype=np.int32)
+        return self._indices
+
+    def coords(self):
+        if self.storage == 'COMPRESSED':
+            return np.frombuffer(zlib.decompress(self._coords), dtype=np.float32).reshape(-1, 3)
+        return np.asarray(self._coords)
+
+    def release(self):
+        """Close the backing temp file of a memory-mapped checkpoint."""
+        if self._file is not None:
+            self._coords = None
+            self._file.close()
+            self._file = None
+
+
+def get_checkpoints(obj):
+    """Return the bounded checkpoint ring of an object, creating it on first use."""
+    ring = _checkpoints.get(obj.name)
+    if ring is None:
+        ring = _checkpoints[obj.name] = deque()
+    return ring
+
+
+def push_checkpoint(obj, checkpoint, limit=MAX_CHECKPOINTS):
+    """Append a checkpoint, dropping (and releasing) the oldest ones beyond the limit."""
+    ring = get_checkpoints(obj)
+    ring.append(checkpoint)
+    while len(ring) > limit:
+        ring.popleft().release()
+
+
+def clear_checkpoints(obj=None):
+    """Release the checkpoints of one object, or of every object when none is given."""
+    if obj is None:
+        rings = list(_checkpoints.values())
+        _checkpoints.clear()
+    else:
+        rings = [_checkpoints.pop(obj.name, ())]
+    for ring in rings:
+        for checkpoint in ring:
+            checkpoint.release()
+
+
+def read_coordinates(obj, selected_only=True):
+    """Bulk-read vertex coordinates of a mesh object, returning (vert_count, indices, coords).
+
+    The coordinates and selection come from the cached mesh snapshot, so an
+    edit mesh is only synced to the Mesh when the snapshot is stale.
+    """
+    from . import mesh_snapshot
+
+    snapshot = mesh_snapshot.get_snapshot(obj)
+    if not selected_only:
+        # Снимок правится на месте при записи, поэтому чекпоинт держит свою копию
+        return snapshot.vert_count, np.arange(snapshot.vert_count, dtype=np.int32), snapshot.co.copy()
+
+    indices = snapshot.selected_indices().astype(np.int32)
+    return snapshot.vert_count, indices, snapshot.co[indices]
+
+
+def write_coordinates(obj, indices, coords):
+    """Write coordinates back to the given vertex indices in a single update.
+
+    Only the checkpointed vertices are written: into the existing edit
+    BMesh in edit mode (keeping its selection history, hidden state and
+    vertex references), or with one ``foreach_set`` on the Mesh otherwise.
+    The cached snapshot is patched instead of extracted again.
+    """
+    from . import mesh_snapshot
+
+    mesh_snapshot.write_coords(obj, np.asarray(indices, dtype=np.int64), coords)
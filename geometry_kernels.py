@@ -0,0 +1,1345 @@
+"""Pure NumPy geometry kernels behind the mesh and geometry nodes operators.
+
+Nothing in this module imports ``bpy``, ``bmesh`` or ``mathutils``; the
+operators extract arrays from Blender and call these functions, so every
+kernel can also be run and timed with plain ``python`` (see ``benchmarks/``).
+"""
+
+import numpy as np
+
+_NEIGHBOR_OFFSETS = np.array(
+    [(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)], dtype=np.int64
+)
+
+
+def normalize_rows(vectors):
+    """Normalize an (N, 3) array row-wise, leaving zero rows unchanged."""
+    lengths = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, lengths, out=np.zeros_like(vectors), where=lengths > 0)
+
+
+def build_adjacency(edges, vert_count):
+    """Build a CSR adjacency (indptr, indices) from an (E, 2) edge array."""
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    if not len(edges):
+        return np.zeros(vert_count + 1, dtype=np.int32), np.zeros(0, dtype=np.int32)
+
+    sources = np.concatenate((edges[:, 0], edges[:, 1]))
+    targets = np.concatenate((edges[:, 1], edges[:, 0]))
+    order = np.argsort(sources, kind='stable')
+
+    indptr = np.zeros(vert_count + 1, dtype=np.int32)
+    np.cumsum(np.bincount(sources, minlength=vert_count), out=indptr[1:])
+    return indptr, targets[order].astype(np.int32)
+
+
+def connected_components(edges, mask):
+    """Split the masked vertices into groups connected by edges between masked vertices.
+
+    Uses min-label hooking with pointer jumping, which converges in a
+    logarithmic number of vectorized passes even for long edge loops.
+    Groups are returned as index arrays ordered by their smallest index.
+    """
+    mask = np.asarray(mask, dtype=bool)
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    edges = edges[mask[edges[:, 0]] & mask[edges[:, 1]]]
+    u, v = edges[:, 0], edges[:, 1]
+
+    parent = np.arange(len(mask), dtype=np.int64)
+    while len(edges):
+        pu, pv = parent[u], parent[v]
+        if np.array_equal(pu, pv):
+            break
+        np.minimum.at(parent, np.maximum(pu, pv), np.minimum(pu, pv))
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+    members = np.flatnonzero(mask)
+    roots = parent[members]
+    order = np.argsort(roots, kind='stable')
+    _, starts = np.unique(roots[order], return_index=True)
+    return np.split(members[order], starts[1:]) if len(members) else []
+
+
+class _Grid:
+    """Points bucketed by a uniform grid for vectorized neighborhood queries.
+
+    Cells are addressed by linear keys, so a neighbor cell is a constant key
+    offset and sorted query keys stay sorted for every one of the 27 lookups.
+    Points are stored in key order to keep candidate gathers cache friendly.
+    """
+
+    def __init__(self, points, cell_size):
+        self.origin = points.min(axis=0)
+        extents = points.max(axis=0) - self.origin
+        # Огрубляем сетку, пока линейные ключи ячеек помещаются в int64
+        while np.prod(np.floor(extents / cell_size) + 3) > 2.0 ** 62:
+            cell_size *= 2.0
+        self.cell_size = cell_size
+        self.dims = np.floor(extents / cell_size).astype(np.int64) + 3
+        self.strides = np.array([self.dims[1] * self.dims[2], self.dims[2], 1], dtype=np.int64)
+
+        keys = self.cell_keys(points)
+        self.order = np.argsort(keys, kind='stable')
+        self.points = points[self.order]
+        self.keys, self.starts, self.counts = np.unique(keys[self.order], return_index=True, return_counts=True)
+
+    def cell_keys(self, points):
+        # Точки вне сетки прижимаются к граничному слою ячеек; для них
+        # соседние ячейки пусты, и проверка точности отклоняет результат
+        cells = np.clip(np.floor((points - self.origin) / self.cell_size), -1, self.dims - 2)
+        return (cells.astype(np.int64) + 1) @ self.strides
+
+    def candidates(self, keys, offsets=_NEIGHBOR_OFFSETS):
+        """Yield (rows, counts, positions) blocks covering the cells around each sorted query key.
+
+        The candidates of ``keys[rows[i]]`` are ``counts[i]`` consecutive
+        entries of ``positions``, which index ``self.points``.
+        """
+        for offset in offsets:
+            shifted = keys + offset @ self.strides
+            slots = np.searchsorted(self.keys, shifted)
+            slots = np.minimum(slots, len(self.keys) - 1)
+            hit = self.keys[slots] == shifted
+            rows = np.flatnonzero(hit)
+            counts = self.counts[slots[hit]]
+            starts = self.starts[slots[hit]]
+            if not len(rows):
+                continue
+
+            # Позиция внутри ячейки для каждого кандидата
+            within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            yield rows, counts, np.repeat(starts, counts) + within
+
+
+def _box_distance(points, mins, maxs):
+    """Squared distance from each point to the matching axis-aligned box."""
+    below = np.maximum(mins - points, 0.0)
+    above = np.maximum(points - maxs, 0.0)
+    return (below * below + above * above).sum(axis=1)
+
+
+def _update_best(rows, positions, squared, best, best_position):
+    """Lower best[row] to the smallest candidate of each row group, recording its position.
+
+    ``rows`` must be sorted so every row's candidates are consecutive.
+    """
+    if not len(rows):
+        return
+    starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+    minima = np.minimum.reduceat(squared, starts)
+    group = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(rows)]))
+    winners = np.flatnonzero((squared == minima[group]) & (squared < best[rows]))
+    best_position[rows[winners]] = positions[winners]
+    best[rows[winners]] = squared[winners]
+
+
+def _row_ranks(rows, values):
+    """Rank of every value within its row, and the (row, value) sort order the ranks follow."""
+    order = np.lexsort((values, rows))
+    ordered = rows[order]
+    return np.arange(len(rows)) - np.searchsorted(ordered, ordered), order
+
+
+class KDTree:
+    """Implicit balanced KD-tree over an (N, 3) point array with batched exact queries.
+
+    Node ``j`` of level ``d`` covers the tree-ordered points
+    ``[bounds[d][j], bounds[d][j + 1])``; every level is built with one
+    argsort, and queries walk all levels for all queries at once. ``boxes``
+    may give a (lo, hi) box around every point, e.g. the segment a midpoint
+    stands for; node bounds then enclose those boxes.
+    """
+
+    def __init__(self, points, leaf_size=8, boxes=None):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        count = len(self.points)
+        self.depth = max(int(np.floor(np.log2(max(count / leaf_size, 1)))), 0)
+        self.order = np.arange(count)
+        self.bounds, self.axes, self.splits = [], [], []
+
+        for level in range(self.depth + 1):
+            bounds = np.arange(2 ** level + 1) * count // 2 ** level
+            self.bounds.append(bounds)
+            if level == self.depth:
+                break
+
+            tree_points = self.points[self.order]
+            mins = np.minimum.reduceat(tree_points, bounds[:-1])
+            maxs = np.maximum.reduceat(tree_points, bounds[:-1])
+            axes = np.argmax(maxs - mins, axis=1)
+
+            # Сортировка внутри узлов по их самой длинной оси одним ключом:
+            # целая часть - номер узла, дробная - нормированная координата
+            node = np.repeat(np.arange(2 ** level), np.diff(bounds))
+            axis = axes[node]
+            extent = (maxs - mins)[node, axis]
+            fraction = (tree_points[np.arange(count), axis] - mins[node, axis]) / np.where(extent > 0, extent, 1.0)
+            self.order = self.order[np.argsort(node + fraction * 0.5, kind='stable')]
+
+            middles = (bounds[:-1] + bounds[1:]) // 2
+            self.axes.append(axes)
+            self.splits.append(self.points[self.order[middles], axes])
+
+        tree_points = self.points[self.order]
+        self.tree_points = tree_points
+        lows, highs = (tree_points, tree_points) if boxes is None else \
+            (np.asarray(boxes[0], dtype=np.float64)[self.order], np.asarray(boxes[1], dtype=np.float64)[self.order])
+        self.mins = [np.minimum.reduceat(lows, bounds[:-1]) for bounds in self.bounds]
+        self.maxs = [np.maximum.reduceat(highs, bounds[:-1]) for bounds in self.bounds]
+        leaf_bounds = self.bounds[-1]
+        self.leaf_size = int(np.diff(leaf_bounds).max()) if count else 0
+
+    def _scan_leaves(self, queries, rows, leaves):
+        """Nearest tree position and squared distance for each (query row, leaf) pair."""
+        starts = self.bounds[-1][leaves]
+        sizes = self.bounds[-1][leaves + 1] - starts
+        positions = starts[:, None] + np.arange(self.leaf_size)
+        valid = np.arange(self.leaf_size) < sizes[:, None]
+        positions = np.where(valid, positions, starts[:, None])
+        squared = ((self.tree_points[positions] - queries[rows][:, None, :]) ** 2).sum(axis=2)
+        squared[~valid] = np.inf
+        nearest = squared.argmin(axis=1)
+        return positions[np.arange(len(rows)), nearest], squared[np.arange(len(rows)), nearest]
+
+    def _query_block(self, queries):
+        count = len(queries)
+        rows = np.arange(count)
+
+        # Спуск к листу запроса даёт начальную верхнюю границу расстояния
+        node = np.zeros(count, dtype=np.int64)
+        for level in range(self.depth):
+            axis = self.axes[level][node]
+            node = 2 * node + (queries[rows, axis] >= self.splits[level][node])
+        home = node
+        best_position, best = self._scan_leaves(queries, rows, home)
+
+        # Обход всех уровней сразу: медианная точка каждого узла уточняет
+        # верхнюю границу, и остаются только узлы ближе этой границы
+        node = np.zeros(count, dtype=np.int64)
+        for level in range(self.depth + 1):
+            bounds = self.bounds[level]
+            middle = (bounds[node] + bounds[node + 1]) // 2
+            squared = ((self.tree_points[middle] - queries[rows]) ** 2).sum(axis=1)
+            _update_best(rows, middle, squared, best, best_position)
+
+            close = _box_distance(queries[rows], self.mins[level][node], self.maxs[level][node]) < best[rows]
+            rows, node = rows[close], node[close]
+            if level < self.depth:
+                rows = np.repeat(rows, 2)
+                node = (2 * np.repeat(node, 2) + np.tile([0, 1], len(node)))
+
+        other = node != home[rows]
+        rows, node = rows[other], node[other]
+        if len(rows):
+            # Сначала в каждой строке лист с ближайшей рамкой: обычно ближайшая
+            # точка в нём, и остальные листья затем отсеиваются по новой границе
+            box = _box_distance(queries[rows], self.mins[-1][node], self.maxs[-1][node])
+            rank, order = _row_ranks(rows, box)
+            first = order[rank == 0]
+            positions, squared = self._scan_leaves(queries, rows[first], node[first])
+            _update_best(rows[first], positions, squared, best, best_position)
+
+            rest = np.ones(len(rows), dtype=bool)
+            rest[first] = False
+            rest &= box < best[rows]
+            rows, node = rows[rest], node[rest]
+            if len(rows):
+                # Строки по-прежнему идут по возрастанию
+                positions, squared = self._scan_leaves(queries, rows, node)
+                _update_best(rows, positions, squared, best, best_position)
+
+        return best_position, best
+
+    def query(self, queries, block=1 << 16):
+        """Exact nearest point of every query, as (indices, distances)."""
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 3)
+        indices = np.full(len(queries), -1, dtype=np.int64)
+        distances = np.full(len(queries), np.inf)
+        if not len(self.points):
+            return indices, distances
+        for start in range(0, len(queries), block):
+            positions, squared = self._query_block(queries[start:start + block])
+            indices[start:start + block], distances[start:start + block] = self.order[positions], np.sqrt(squared)
+        return indices, distances
+
+    def _leaves_within(self, queries, rows, bound, limit):
+        """Leaves whose box lies within the squared ``bound`` of the query, as (rows, leaves, box distances).
+
+        Returns None when the leaves would hold more than ``limit`` points,
+        so the caller can retry with fewer rows.
+        """
+        node = np.zeros(len(rows), dtype=np.int64)
+        for level in range(self.depth + 1):
+            box = _box_distance(queries[rows], self.mins[level][node], self.maxs[level][node])
+            close = box <= bound[rows]
+            rows, node, box = rows[close], node[close], box[close]
+            if limit is not None and len(rows) * self.leaf_size > limit:
+                return None
+            if level < self.depth:
+                rows = np.repeat(rows, 2)
+                node = 2 * np.repeat(node, 2) + np.tile([0, 1], len(node))
+        return rows, node, box
+
+    def _gather(self, queries, bound, limit):
+        """Leaves within the squared ``bound`` of every query, found in blocks whose points stay under ``limit``."""
+        found = []
+        pending = np.arange(len(queries))
+        chunk = len(pending)
+        while len(pending):
+            result = self._leaves_within(queries, pending[:chunk], bound, limit if chunk > 1 else None)
+            if result is None:
+                chunk = max(chunk // 2, 1)
+                continue
+            found.append(result)
+            pending = pending[chunk:]
+        if not found:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+        return tuple(np.concatenate(parts) for parts in zip(*found))
+
+    def _leaf_positions(self, rows, leaves):
+        """Every tree position of the given leaves, as (rows, positions)."""
+        starts = self.bounds[-1][leaves]
+        sizes = self.bounds[-1][leaves + 1] - starts
+        valid = np.arange(self.leaf_size) < sizes[:, None]
+        return np.repeat(rows, sizes), (starts[:, None] + np.arange(self.leaf_size))[valid]
+
+    def _k_bound(self, queries, k):
+        """Squared upper bound of the k-th nearest distance of every query.
+
+        The bound is the k-th distance among the tree-ordered points around
+        the query's nearest point: the tree order keeps them close to the
+        query, and a window of a few leaves on either side brings the bound
+        near the true k-th distance, so few leaves lie within it.
+        """
+        count = len(self.points)
+        half = max(k, 2 * self.leaf_size)
+        if count <= 2 * half:
+            return np.full(len(queries), np.inf)
+        nearest, _squared = self._query_block(queries)
+        first = np.clip(nearest - half, 0, count - 2 * half - 1)
+        window = first[:, None] + np.arange(2 * half + 1)
+        squared = ((self.tree_points[window] - queries[:, None, :]) ** 2).sum(axis=2)
+        return np.partition(squared, k - 1, axis=1)[:, k - 1]
+
+    def _nearest_in_leaves(self, queries, leaves, k):
+        """The ``k`` nearest tree positions of every query among its own (N, L) leaves, closest first.
+
+        Returns (positions, squared distances) of shape (N, min(k, L * leaf
+        size)), padded with inf where the leaves hold fewer points.
+        """
+        starts = self.bounds[-1][leaves][..., None]
+        positions = starts + np.arange(self.leaf_size)
+        valid = positions < self.bounds[-1][leaves + 1][..., None]
+        positions = np.where(valid, positions, starts).reshape(len(queries), -1)
+        squared = ((self.tree_points[positions] - queries[:, None, :]) ** 2).sum(axis=2)
+        squared[~valid.reshape(len(queries), -1)] = np.inf
+
+        if k < squared.shape[1]:
+            nearest = np.argpartition(squared, k - 1, axis=1)[:, :k]
+            positions = np.take_along_axis(positions, nearest, axis=1)
+            squared = np.take_along_axis(squared, nearest, axis=1)
+        order = np.argsort(squared, axis=1)
+        return np.take_along_axis(positions, order, axis=1), np.take_along_axis(squared, order, axis=1)
+
+    def _query_k_block(self, queries, k, limit):
+        count = len(queries)
+        wanted = min(k, len(self.points))
+        indices = np.full((count, k), -1, dtype=np.int64)
+        distances = np.full((count, k), np.inf)
+
+        rows, leaves, _box = self._gather(queries, self._k_bound(queries, k), limit)
+        per_row = np.bincount(rows, minlength=count)
+        firsts = np.cumsum(per_row) - per_row
+
+        # Строки с одинаковым числом листьев образуют плотную матрицу кандидатов,
+        # и k ближайших в ней выбирает argpartition без сортировки всех точек
+        for leaf_count in np.unique(per_row[per_row > 0]).tolist():
+            bucket = np.flatnonzero(per_row == leaf_count)
+            step = max(limit // (leaf_count * self.leaf_size), 1)
+            for start in range(0, len(bucket), step):
+                part = bucket[start:start + step]
+                positions, squared = self._nearest_in_leaves(
+                    queries[part], leaves[firsts[part][:, None] + np.arange(leaf_count)], wanted)
+                width = positions.shape[1]
+                indices[part, :width] = np.where(np.isfinite(squared), self.order[positions], -1)
+                distances[part, :width] = np.sqrt(squared)
+        return indices, distances
+
+    def query_k(self, queries, k, block=1 << 14, limit=1 << 22):
+        """Exact ``k`` nearest points of every query, closest first, as (indices, distances) of shape (N, k).
+
+        Rows are padded with -1 and inf when the tree holds fewer than ``k``
+        points. ``limit`` caps the candidates gathered at once, so memory
+        stays bounded however far the neighbors are.
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 3)
+        indices = np.full((len(queries), k), -1, dtype=np.int64)
+        distances = np.full((len(queries), k), np.inf)
+        if not len(self.points) or k < 1:
+            return indices, distances
+        for start in range(0, len(queries), block):
+            indices[start:start + block], distances[start:start + block] = \
+                self._query_k_block(queries[start:start + block], k, limit)
+        return indices, distances
+
+
+def nearest_neighbors(points, queries):
+    """Find the exact nearest point for every query, returning (indices, distances)."""
+    return KDTree(points).query(queries)
+
+
+def radius_pairs(points, radius):
+    """Return an (P, 2) array of index pairs i < j closer than or equal to radius."""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    if len(points) < 2:
+        return np.zeros((0, 2), dtype=np.int64)
+    # Ячейка не меньше радиуса; нижняя граница защищает целочисленные координаты ячеек от переполнения
+    largest = float(np.ptp(points, axis=0).max())
+    grid = _Grid(points, max(radius, largest * 1e-9, 1e-12))
+    keys = grid.keys[np.repeat(np.arange(len(grid.keys)), grid.counts)]
+
+    pairs = []
+    for rows, counts, positions in grid.candidates(keys):
+        rows = np.repeat(rows, counts)
+        keep = rows < positions
+        rows, positions = rows[keep], positions[keep]
+        squared = ((grid.points[rows] - grid.points[positions]) ** 2).sum(axis=1)
+        close = squared <= radius * radius
+        pairs.append(np.column_stack((grid.order[rows[close]], grid.order[positions[close]])))
+
+    pairs = np.concatenate(pairs) if pairs else np.zeros((0, 2), dtype=np.int64)
+    pairs.sort(axis=1)
+    return np.unique(pairs, axis=0) if len(pairs) else pairs
+
+
+def cluster_by_distance(points, radius, linkage='FIRST'):
+    """Group points that lie within radius of each other.
+
+    With ``linkage='FIRST'`` every point, in index order, joins the earliest
+    created group that already has a member within radius, or starts a new
+    one; this is the grouping of the original per-vertex tool. With
+    ``'SINGLE'`` points linked by any chain of neighbors within radius end
+    up in one group, however far the chain reaches. Groups are returned as
+    index arrays ordered by their smallest index.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    pairs = radius_pairs(points, radius)
+    if linkage == 'SINGLE':
+        return connected_components(pairs, np.ones(len(points), dtype=bool))
+
+    # Группа точки - самая ранняя из групп её соседей с меньшими индексами; группы
+    # нумеруются первой точкой, поэтому самая ранняя - с наименьшим номером
+    order = np.argsort(pairs[:, 1], kind='stable')
+    later, earlier = pairs[order, 1], pairs[order, 0].tolist()
+    indptr = np.searchsorted(later, np.arange(len(points) + 1)).tolist()
+    labels = list(range(len(points)))
+    for point in np.unique(later).tolist():
+        labels[point] = min([labels[other] for other in earlier[indptr[point]:indptr[point + 1]]])
+
+    labels = np.array(labels, dtype=np.int64)
+    members = np.argsort(labels, kind='stable')
+    _, starts = np.unique(labels[members], return_index=True)
+    return np.split(members, starts[1:]) if len(members) else []
+
+
+def cluster_labels(clusters, count):
+    """Convert a list of index arrays into a per-point cluster label array."""
+    labels = np.empty(count, dtype=np.int64)
+    if len(clusters):
+        sizes = [len(members) for members in clusters]
+        labels[np.concatenate(clusters)] = np.repeat(np.arange(len(clusters)), sizes)
+    return labels
+
+
+def coincident_clusters(points, clusters, tolerance):
+    """Weld map collapsing every cluster whose points coincide within ``tolerance`` on each axis.
+
+    Returns (sources, targets) index arrays: every other member of such a
+    cluster maps onto its first member.
+    """
+    clusters = [members for members in clusters if len(members) > 1]
+    if not clusters:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    sizes = np.array([len(members) for members in clusters])
+    members = np.concatenate(clusters)
+    starts = np.cumsum(sizes) - sizes
+    clustered = points[members]
+    extent = np.maximum.reduceat(clustered, starts) - np.minimum.reduceat(clustered, starts)
+
+    coincident = np.repeat((extent <= tolerance).all(axis=1), sizes)
+    targets = np.repeat(members[starts], sizes)
+    welded = coincident & (members != targets)
+    return members[welded], targets[welded]
+
+
+def _cluster_means(points, labels, cluster_count):
+    counts = np.bincount(labels, minlength=cluster_count)
+    sums = np.column_stack([np.bincount(labels, weights=points[:, i], minlength=cluster_count) for i in range(3)])
+    return sums / np.maximum(counts, 1)[:, None]
+
+
+def align_clusters(points, clusters, axes):
+    """Snap every cluster to its centroid along the given axes, returning new points."""
+    points = np.array(points, dtype=np.float64).reshape(-1, 3)
+    if not len(clusters):
+        return points
+    labels = cluster_labels(clusters, len(points))
+    means = _cluster_means(points, labels, len(clusters))
+    points[:, axes] = means[labels][:, axes]
+    return points
+
+
+def fit_clusters(points, clusters, shape='LINE'):
+    """Project every cluster onto its own best-fit line or plane, returning new points.
+
+    All cluster covariances are accumulated at once and decomposed with one
+    batched ``eigh``; the line follows the largest eigenvector and the plane
+    is normal to the smallest one.
+    """
+    points = np.array(points, dtype=np.float64).reshape(-1, 3)
+    if not len(clusters):
+        return points
+    labels = cluster_labels(clusters, len(points))
+    cluster_count = len(clusters)
+    means = _cluster_means(points, labels, cluster_count)
+    centered = points - means[labels]
+
+    covariance = np.empty((cluster_count, 3, 3))
+    for i in range(3):
+        for j in range(i, 3):
+            covariance[:, i, j] = covariance[:, j, i] = np.bincount(
+                labels, weights=centered[:, i] * centered[:, j], minlength=cluster_count)
+    _values, vectors = np.linalg.eigh(covariance)
+
+    if shape == 'LINE':
+        direction = vectors[:, :, 2][labels]
+        along = np.einsum('ij,ij->i', centered, direction)
+        return means[labels] + along[:, None] * direction
+    normal = vectors[:, :, 0][labels]
+    across = np.einsum('ij,ij->i', centered, normal)
+    return points - across[:, None] * normal
+
+
+def nearest_pairs(co, group1, group2):
+    """Pair every vertex of group1 with its nearest vertex of group2."""
+    group1 = np.asarray(group1, dtype=np.int64)
+    group2 = np.asarray(group2, dtype=np.int64)
+    nearest, _ = nearest_neighbors(co[group2], co[group1])
+    return np.column_stack((group1, group2[nearest]))
+
+
+def nearest_candidates(co, group1, group2, count, tree=None):
+    """The ``count`` nearest group2 vertices of every group1 vertex, closest first.
+
+    Returns (candidates, distances) of shape (len(group1), count) holding
+    vertex indices into ``co``, padded with -1 and inf. ``tree`` may be a
+    KD-tree already built over ``co[group2]``.
+    """
+    group1 = np.asarray(group1, dtype=np.int64)
+    group2 = np.asarray(group2, dtype=np.int64)
+    if tree is None:
+        tree = KDTree(co[group2])
+    nearest, distances = tree.query_k(co[group1], count)
+    return np.where(nearest >= 0, group2[nearest], -1), distances
+
+
+def _base_neighbors(vert_count, base, indptr, indices):
+    """First and second base neighbor (-1 if missing) and base degree of every vertex."""
+    in_base = np.zeros(vert_count, dtype=bool)
+    in_base[base] = True
+
+    sources = np.repeat(np.arange(vert_count), np.diff(indptr))
+    keep = in_base[sources] & in_base[indices]
+    sources, targets = sources[keep], indices[keep].astype(np.int64)
+    rank = np.arange(len(sources)) - np.searchsorted(sources, sources)
+
+    first = np.full(vert_count, -1, dtype=np.int64)
+    second = np.full(vert_count, -1, dtype=np.int64)
+    first[sources[rank == 0]] = targets[rank == 0]
+    second[sources[rank == 1]] = targets[rank == 1]
+    return first, second, np.bincount(sources, minlength=vert_count)
+
+
+def base_tangents(co, base, indptr, indices):
+    """Local curve tangents of the base group vertices.
+
+    A base vertex with one base neighbor uses the direction from that
+    neighbor; with two or more it uses the direction between the first two.
+    Returns (tangents, valid) indexed by vertex.
+    """
+    vert_count = len(co)
+    first, second, _degree = _base_neighbors(vert_count, base, indptr, indices)
+
+    valid = first >= 0
+    has_two = second >= 0
+    tangents = np.zeros((vert_count, 3))
+    one = valid & ~has_two
+    tangents[one] = co[one] - co[first[one]]
+    tangents[has_two] = co[second[has_two]] - co[first[has_two]]
+    return normalize_rows(tangents), valid
+
+
+def equalize_positions(co, base, moved, indptr, indices,
+                       distance_factor=1.0, average_length=None, orthogonal=False):
+    """Place moved vertices relative to their closest base vertex.
+
+    Returns (indices, positions) for the vertices whose closest base vertex
+    has at least one base neighbor to derive a tangent from.
+    """
+    co = np.asarray(co, dtype=np.float64)
+    base = np.asarray(base, dtype=np.int64)
+    moved = np.asarray(moved, dtype=np.int64)
+
+    tangents, valid = base_tangents(co, base, indptr, indices)
+    nearest, _ = nearest_neighbors(co[base], co[moved])
+    closest = base[nearest]
+
+    keep = valid[closest]
+    moved, closest = moved[keep], closest[keep]
+    tangent = tangents[closest]
+    offset = co[moved] - co[closest]
+
+    if average_length is None:
+        lengths = np.linalg.norm(offset, axis=1)
+    else:
+        lengths = np.full(len(moved), average_length)
+
+    if orthogonal:
+        direction = normalize_rows(np.cross(normalize_rows(np.cross(tangent, offset)), tangent))
+    else:
+        direction = normalize_rows(offset)
+
+    return moved, co[closest] + direction * (lengths * distance_factor)[:, None]
+
+
+def order_polyline(vert_count, base, indptr, indices):
+    """Walk the base group as one polyline.
+
+    Returns (ordered indices, closed), or None when the base group branches
+    or falls apart into several pieces.
+    """
+    base = np.unique(np.asarray(base, dtype=np.int64))
+    if len(base) < 2:
+        return None
+    first, second, degree = _base_neighbors(vert_count, base, indptr, indices)
+    degree = degree[base]
+    if (degree > 2).any() or (degree == 0).any():
+        return None
+
+    ends = base[degree == 1]
+    if len(ends) not in (0, 2):
+        return None
+    closed = not len(ends)
+
+    # Обход по спискам: у каждой вершины не больше двух соседей
+    first, second = first.tolist(), second.tolist()
+    ordered = [int(ends[0]) if len(ends) else int(base[0])]
+    previous = -1
+    for _ in range(len(base) - 1):
+        current = ordered[-1]
+        following = first[current] if first[current] != previous else second[current]
+        if following < 0:
+            break
+        ordered.append(following)
+        previous = current
+
+    if len(ordered) != len(base):
+        return None
+    return np.array(ordered, dtype=np.int64), closed
+
+
+def arc_lengths(points):
+    """Cumulative arc length at every point of a polyline, starting at zero."""
+    cumulative = np.zeros(len(points))
+    np.cumsum(np.linalg.norm(np.diff(points, axis=0), axis=1), out=cumulative[1:])
+    return cumulative
+
+
+class Polyline:
+    """Ordered polyline with cumulative arc length, segment tangents and a lazy segment KD-tree.
+
+    A closed polyline repeats its first point at the end. ``cumulative`` and
+    ``tangents`` may be passed in when they were persisted earlier, and
+    ``indices`` are the mesh vertices the points were taken from.
+    """
+
+    def __init__(self, points, closed=False, cumulative=None, tangents=None, indices=None):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.closed = closed
+        self.indices = None if indices is None else np.asarray(indices, dtype=np.int64)
+        self.points = np.vstack((points, points[:1])) if closed else points
+        self.cumulative = arc_lengths(self.points) if cumulative is None else np.asarray(cumulative, dtype=np.float64)
+        if tangents is None:
+            tangents = normalize_rows(np.diff(self.points, axis=0))
+        self.tangents = np.asarray(tangents, dtype=np.float64).reshape(-1, 3)
+        self._tree = None
+
+    @property
+    def length(self):
+        return float(self.cumulative[-1])
+
+    def _locate(self, t):
+        cumulative = self.cumulative
+        segment = np.clip(np.searchsorted(cumulative, t, side='right') - 1, 0, len(self.points) - 2)
+        lengths = cumulative[segment + 1] - cumulative[segment]
+        fraction = np.divide(t - cumulative[segment], lengths, out=np.zeros(len(segment)), where=lengths > 0)
+        return segment, fraction
+
+    def evaluate(self, t):
+        """Points and unit segment tangents at arc-length parameters t."""
+        points = self.points
+        segment, fraction = self._locate(t)
+        return points[segment] + (points[segment + 1] - points[segment]) * fraction[:, None], self.tangents[segment]
+
+    def smooth_tangents(self, t):
+        """Unit tangents at arc-length parameters t that turn continuously through the vertices.
+
+        Each vertex gets the mean of its two segment tangents, interpolated
+        linearly along the segments.
+        """
+        tangents = self.tangents
+        if self.closed:
+            ends = tangents[-1] + tangents[0]
+            first = last = ends
+        else:
+            first, last = tangents[0], tangents[-1]
+        vertex = normalize_rows(np.vstack((first, tangents[:-1] + tangents[1:], last)))
+        segment, fraction = self._locate(t)
+        return normalize_rows(vertex[segment] * (1.0 - fraction[:, None]) + vertex[segment + 1] * fraction[:, None])
+
+    def _closest_on_segments(self, queries, segments):
+        """Arc-length parameter and distance of the closest point of each segment to its query."""
+        points = self.points
+        start, vectors = points[segments], points[segments + 1] - points[segments]
+        squared = np.einsum('ij,ij->i', vectors, vectors)
+        fraction = np.divide(np.einsum('ij,ij->i', queries - start, vectors), squared,
+                             out=np.zeros(len(segments)), where=squared > 0)
+        fraction = np.clip(fraction, 0.0, 1.0)
+        distance = np.linalg.norm(start + vectors * fraction[:, None] - queries, axis=1)
+        return self.cumulative[segments] + fraction * np.sqrt(squared), distance
+
+    def project(self, queries, limit=1 << 22):
+        """Arc-length parameter of the closest polyline point to every query.
+
+        Segments are indexed by a KD-tree over their midpoints whose node
+        boxes enclose the segments, built on the first query and reused
+        afterwards. The segment of the nearest midpoint bounds the distance,
+        and every segment in a leaf within that bound is measured, so the
+        result is exact for any mix of segment lengths.
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 3)
+        points = self.points
+        if len(points) < 2:
+            return np.zeros(len(queries))
+        if self._tree is None:
+            starts, ends = points[:-1], points[1:]
+            self._tree = KDTree(0.5 * (starts + ends), boxes=(np.minimum(starts, ends), np.maximum(starts, ends)))
+        nearest, _ = self._tree.query(queries)
+        best_t, best_distance = self._closest_on_segments(queries, nearest)
+
+        rows, leaves, _box = self._tree._gather(queries, best_distance ** 2, limit)
+        rows, positions = self._tree._leaf_positions(rows, leaves)
+        t, distance = self._closest_on_segments(queries[rows], self._tree.order[positions])
+        rank, order = _row_ranks(rows, distance)
+        closest = order[rank == 0]
+        closest = closest[distance[closest] < best_distance[rows[closest]]]
+        best_t[rows[closest]] = t[closest]
+        return best_t
+
+    def walk(self, queries, start, steps=64):
+        """Arc-length parameter of a closest polyline point reached by walking from ``start``.
+
+        The start first moves along the curve by the query's offset along the
+        tangent there (one Newton step). Then every query steps from segment
+        to segment while its distance decreases, doubling the stride after
+        each improvement and halving it otherwise, until neither neighboring
+        segment is closer. The result is a local closest point, so a query
+        keeps to its own stretch of a curve that folds back near it. Returns
+        (t, converged); queries that did not settle within ``steps`` passes
+        keep their last parameter and are marked False.
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 3)
+        segment_count = len(self.points) - 1
+        converged = np.zeros(len(queries), dtype=bool)
+        if segment_count < 1:
+            return np.zeros(len(queries)), ~converged
+        # Шаг Ньютона: старт сдвигается вдоль кривой на смещение запроса по касательной
+        start = np.asarray(start, dtype=np.float64)
+        foot, tangent = self.evaluate(start)
+        start = start + np.einsum('ij,ij->i', queries - foot, tangent)
+        start = np.mod(start, self.length) if self.closed else np.clip(start, 0.0, self.length)
+        segment, _fraction = self._locate(start)
+        t, distance = self._closest_on_segments(queries, segment)
+        stride = np.ones(len(queries), dtype=np.int64)
+        active = np.arange(len(queries))
+
+        for _ in range(steps):
+            if not len(active):
+                break
+            current, closest = segment[active], distance[active]
+            best_segment, best_t, best_distance = current, t[active], closest
+            for direction in (1, -1):
+                neighbor = current + direction * stride[active]
+                if self.closed:
+                    neighbor = np.mod(neighbor, segment_count)
+                else:
+                    neighbor = np.clip(neighbor, 0, segment_count - 1)
+                neighbor_t, neighbor_distance = self._closest_on_segments(queries[active], neighbor)
+                better = neighbor_distance < best_distance
+                best_segment = np.where(better, neighbor, best_segment)
+                best_t = np.where(better, neighbor_t, best_t)
+                best_distance = np.where(better, neighbor_distance, best_distance)
+
+            improved = best_distance < closest
+            segment[active], t[active], distance[active] = best_segment, best_t, best_distance
+            # Сошёлся запрос, которому не помог даже шаг на соседний сегмент
+            settled = ~improved & (stride[active] == 1)
+            converged[active[settled]] = True
+            stride[active] = np.where(improved, stride[active] * 2, np.maximum(stride[active] // 2, 1))
+            active = active[~settled]
+        return t, converged
+
+
+def equalize_along_polyline(co, polyline, moved, distance_factor=1.0, average_length=None, orthogonal=False):
+    """Place moved vertices relative to their closest point on the base polyline.
+
+    Returns (indices, positions) like ``equalize_positions``.
+    """
+    co = np.asarray(co, dtype=np.float64)
+    moved = np.asarray(moved, dtype=np.int64)
+    foot, tangent = polyline.evaluate(polyline.project(co[moved]))
+    offset = co[moved] - foot
+
+    if average_length is None:
+        lengths = np.linalg.norm(offset, axis=1)
+    else:
+        lengths = np.full(len(moved), average_length)
+
+    if orthogonal:
+        direction = normalize_rows(offset - tangent * np.einsum('ij,ij->i', offset, tangent)[:, None])
+    else:
+        direction = normalize_rows(offset)
+
+    return moved, foot + direction * (lengths * distance_factor)[:, None]
+
+
+def _rotate_between(a, b, vectors):
+    """Rotate every vector by the smallest rotation taking unit vector a to unit vector b."""
+    axis = np.cross(a, b)
+    cosine = np.einsum('ij,ij->i', a, b)
+    # Для противоположных векторов поворот не определён, такие векторы не трогаем
+    valid = cosine > -1.0 + 1e-9
+    scale = np.divide(np.einsum('ij,ij->i', axis, vectors), 1.0 + cosine, out=np.zeros(len(a)), where=valid)
+    rotated = vectors * cosine[:, None] + np.cross(axis, vectors) + axis * scale[:, None]
+    return np.where(valid[:, None], rotated, vectors)
+
+
+def joined_base_parameters(polyline, moved, indptr, indices):
+    """Arc length of a polyline vertex joined by an edge to every moved vertex, NaN where there is none.
+
+    The polyline must know the mesh ``indices`` of its points.
+    """
+    moved = np.asarray(moved, dtype=np.int64)
+    start = np.full(len(moved), np.nan)
+    if polyline.indices is None or not len(moved):
+        return start
+    counts = indptr[moved + 1] - indptr[moved]
+    rows = np.repeat(np.arange(len(moved)), counts)
+    slots = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+    neighbors = indices[np.repeat(indptr[moved], counts) + slots]
+
+    # Позиция соседа в полилинии через поиск по отсортированным индексам её вершин
+    order = np.argsort(polyline.indices)
+    ordered = polyline.indices[order]
+    found = np.minimum(np.searchsorted(ordered, neighbors), len(ordered) - 1)
+    joined = ordered[found] == neighbors
+    rows, first = np.unique(rows[joined], return_index=True)
+    start[rows] = polyline.cumulative[order[found[joined][first]]]
+    return start
+
+
+def _smooth_lengths(lengths, smoothing, closed):
+    """Solve (I + smoothing * L) x = lengths, L being the Laplacian of a path or, when closed, a cycle.
+
+    The system is tridiagonal (cyclic when closed) with constant
+    coefficients, so the discrete Fourier transform diagonalizes it: a cycle
+    directly, a path through its mirrored copy, whose reflected ends give
+    the free-end rows of L.
+    """
+    count = len(lengths)
+    extended = lengths if closed else np.concatenate((lengths, lengths[::-1]))
+    size = len(extended)
+    eigenvalues = 2.0 - 2.0 * np.cos(2.0 * np.pi * np.arange(size // 2 + 1) / size)
+    return np.fft.irfft(np.fft.rfft(extended) / (1.0 + smoothing * eigenvalues), n=size)[:count]
+
+
+def _path_laplacian(values, closed):
+    if closed:
+        return 2.0 * values - np.roll(values, 1) - np.roll(values, -1)
+    result = np.zeros_like(values)
+    if len(values) > 1:
+        differences = np.diff(values)
+        result[:-1] -= differences
+        result[1:] += differences
+    return result
+
+
+def relax_spacing(co, polyline, moved, distance_factor=1.0, average_length=None, smoothing=25.0, start=None):
+    """Space moved vertices evenly along the base polyline and smooth their offsets.
+
+    Feet on the curve are found by walking from ``start`` (arc-length
+    guesses, NaN where unknown, see ``joined_base_parameters``); vertices
+    without a start or whose walk does not settle are projected with the
+    segment KD-tree. Arc-length parameters get the exact solution of the
+    fixed-end Laplacian (uniform spacing between the outermost vertices, or
+    around the loop). Offset lengths from the curve are smoothed by solving
+    (I + smoothing * L) x = lengths directly; every vertex keeps its offset
+    direction relative to the curve, turned with the curve tangent from its
+    old foot point to the new one. Returns (moved, positions, residual), the
+    residual being the largest error of the solved system relative to the
+    mean offset.
+    """
+    co = np.asarray(co, dtype=np.float64)
+    moved = np.asarray(moved, dtype=np.int64)
+    closed = polyline.closed
+
+    queries = co[moved]
+    if start is None:
+        t = polyline.project(queries)
+    else:
+        start = np.asarray(start, dtype=np.float64)
+        known = ~np.isnan(start)
+        t = np.empty(len(moved))
+        t[known], converged = polyline.walk(queries[known], start[known])
+        missing = np.concatenate((np.flatnonzero(~known), np.flatnonzero(known)[~converged]))
+        # Дерево отрезков строится, только если обход где-то не сошёлся
+        if len(missing):
+            t[missing] = polyline.project(queries[missing])
+    if closed:
+        # Точка шва проецируется и в начало, и в конец; берём начало
+        t = np.mod(t, polyline.length)
+    order = np.argsort(t, kind='stable')
+    moved, t = moved[order], t[order]
+    foot, _tangent = polyline.evaluate(t)
+    offsets = co[moved] - foot
+    old_tangents = polyline.smooth_tangents(t)
+    lengths = np.linalg.norm(offsets, axis=1) if average_length is None else np.full(len(moved), average_length)
+    scale = max(float(lengths.mean()), 1e-12) if len(moved) else 1.0
+
+    count = len(moved)
+    if closed:
+        t = t[0] + np.arange(count) * (polyline.length / count)
+        t = np.mod(t, polyline.length)
+    else:
+        t = np.linspace(t[0], t[-1], count)
+
+    # Сглаживаются длины смещений: векторы смещений поворачиваются вместе
+    # с кривой, и их лапласиан стянул бы даже ровную полосу к базе
+    smoothed = _smooth_lengths(lengths, smoothing, closed) if count else lengths
+    residual = smoothed + smoothing * _path_laplacian(smoothed, closed) - lengths
+    residual = float(np.abs(residual).max() / scale) if count else 0.0
+
+    foot, _tangent = polyline.evaluate(t)
+    directions = normalize_rows(_rotate_between(old_tangents, polyline.smooth_tangents(t), offsets))
+    return moved, foot + directions * (smoothed * distance_factor)[:, None], residual
+
+
+def connecting_edge_length(co, edges, group1, group2):
+    """Average length of the edges linking group1 to group2, or None without such edges."""
+    vert_count = len(co)
+    in_group1 = np.zeros(vert_count, dtype=bool)
+    in_group2 = np.zeros(vert_count, dtype=bool)
+    in_group1[group1] = True
+    in_group2[group2] = True
+    connecting = ((in_group2[edges[:, 0]] & in_group1[edges[:, 1]]) |
+                  (in_group1[edges[:, 0]] & in_group2[edges[:, 1]]))
+    if not connecting.any():
+        return None
+    connecting = edges[connecting]
+    return float(np.linalg.norm(co[connecting[:, 0]] - co[connecting[:, 1]], axis=1).mean())
+
+
+def sphere_segments(co):
+    """Count the vertices on the same ring as vertex 4, which equals the segment count."""
+    heights = np.round(np.asarray(co)[:, 2], 4)
+    return int(np.count_nonzero(heights == heights[4]))
+
+
+def sphere_parameters(co, polygon_count):
+    """Segments, rings and radius of a UV sphere given its applied vertex coordinates."""
+    co = np.asarray(co, dtype=np.float64).reshape(-1, 3)
+    radius = float(np.ptp(co, axis=0).max()) / 2
+    segments = sphere_segments(co)
+    rings = polygon_count // segments
+    return segments, rings, radius
+
+
+def classify_primitive(co, polygon_sizes, tolerance=1e-3):
+    """Recognise an unmodified UV sphere or cylinder from its topology.
+
+    Returns 'SPHERE', 'CYLINDER' or None. A cylinder has two equal n-gon
+    caps and quads around them; a UV sphere has two triangle fans at the
+    poles, quads in between and all vertices at the same distance from the
+    centre, within ``tolerance`` of the radius.
+    """
+    co = np.asarray(co, dtype=np.float64).reshape(-1, 3)
+    sizes = np.asarray(polygon_sizes)
+    if not len(co) or not len(sizes):
+        return None
+
+    ngons = sizes[sizes > 4]
+    quads = np.count_nonzero(sizes == 4)
+    if len(ngons) == 2 and ngons[0] == ngons[1] and quads == ngons[0] == len(sizes) - 2 \
+            and len(co) == 2 * ngons[0]:
+        return 'CYLINDER'
+
+    triangles = np.count_nonzero(sizes == 3)
+    segments = triangles // 2
+    if len(ngons) or segments < 3 or triangles % 2 or len(sizes) % segments:
+        return None
+    rings = len(sizes) // segments
+    if len(co) != segments * (rings - 1) + 2:
+        return None
+    distances = np.linalg.norm(co - co.mean(axis=0), axis=1)
+    if np.ptp(distances) > tolerance * distances.mean():
+        return None
+    return 'SPHERE'
+
+
+def cylinder_cap_normal(polygon_normals, polygon_sizes):
+    """Normal of the first n-gon, taken as a cylinder cap; None without two n-gons."""
+    caps = np.flatnonzero(np.asarray(polygon_sizes) > 3)
+    if len(caps) < 2:
+        return None
+    return np.asarray(polygon_normals, dtype=np.float64).reshape(-1, 3)[caps[0]]
+
+
+def cylinder_parameters(co, cap_normal):
+    """Vertex count, height and radius of a cylinder along the given cap normal."""
+    co = np.asarray(co, dtype=np.float64).reshape(-1, 3)
+    projection = co @ cap_normal
+    min_proj = projection.min()
+    height = float(projection.max() - min_proj)
+
+    base_vertices = co[np.round(projection, 4) == round(min_proj, 4)]
+    base_center = base_vertices.mean(axis=0)
+    radius = float(np.linalg.norm(base_vertices - base_center, axis=1).mean())
+    return len(base_vertices), height, radius
+
+
+# Допуски на направление нормали инлайера: синус наклона к плоскости поперёк оси
+# цилиндра и косинус угла с радиусом сферы (оба около 15 градусов)
+AXIS_NORMAL_TOLERANCE = 0.25
+RADIAL_NORMAL_TOLERANCE = 0.968
+
+
+def _required_iterations(inlier_ratio, minimal, confidence):
+    """RANSAC draws needed to hit one all-inlier minimal sample with the given confidence."""
+    hit = inlier_ratio ** minimal
+    if hit <= 0.0:
+        return np.inf
+    if hit >= 1.0:
+        return 0
+    return np.log(1.0 - confidence) / np.log(1.0 - hit)
+
+
+def _ransac(points, minimal, hypothesize, residuals, threshold, max_iterations, confidence, rng, batch=64):
+    """Best inlier mask over batches of random minimal samples of ``points``.
+
+    ``hypothesize(picks)`` turns an (H, minimal) index array into models and
+    a validity mask, ``residuals(models)`` scores them against all points as
+    an (H, N) array. Stops as soon as the best model so far makes further
+    draws unnecessary at ``confidence``. Returns (inliers, draws).
+    """
+    best = np.zeros(len(points), dtype=bool)
+    best_count = 0
+    draws = 0
+    needed = max_iterations
+    while draws < min(needed, max_iterations):
+        picks = rng.integers(0, len(points), (batch, minimal))
+        models, valid = hypothesize(picks)
+        draws += batch
+        if not valid.any():
+            continue
+        inliers = residuals(tuple(model[valid] for model in models)) <= threshold
+        counts = inliers.sum(axis=1)
+        winner = int(counts.argmax())
+        if counts[winner] > best_count:
+            best, best_count = inliers[winner], int(counts[winner])
+            needed = _required_iterations(best_count / len(points), minimal, confidence)
+    return best, draws
+
+
+def _sample_rows(count, sample_size, rng):
+    """Rows of a random sample of at most ``sample_size`` out of ``count``."""
+    if count <= sample_size:
+        return np.arange(count)
+    return rng.integers(0, count, sample_size)
+
+
+def _normalized(points):
+    """Points centred and scaled to unit size for conditioning, with (offset, scale) to undo it."""
+    offset = points.mean(axis=0)
+    scale = float(np.linalg.norm(np.ptp(points, axis=0))) or 1.0
+    return (points - offset) / scale, offset, scale
+
+
+def _solve_spheres(samples):
+    """Algebraic sphere through every (H, 4, 3) point quadruple, as (centres, radii, valid)."""
+    matrices = np.concatenate((2.0 * samples, np.ones(samples.shape[:2] + (1,))), axis=2)
+    valid = np.abs(np.linalg.det(matrices)) > 1e-9
+    solution = np.zeros((len(samples), 4))
+    if valid.any():
+        rhs = (samples[valid] ** 2).sum(axis=2)
+        solution[valid] = np.linalg.solve(matrices[valid], rhs[..., None])[..., 0]
+    centres = solution[:, :3]
+    squared = solution[:, 3] + (centres ** 2).sum(axis=1)
+    valid &= squared > 0.0
+    return centres, np.sqrt(np.maximum(squared, 0.0)), valid
+
+
+def _refine_sphere(points):
+    """Least-squares algebraic sphere through all given points, as (centre, radius)."""
+    matrix = np.column_stack((2.0 * points, np.ones(len(points))))
+    solution = np.linalg.lstsq(matrix, (points ** 2).sum(axis=1), rcond=None)[0]
+    centre = solution[:3]
+    return centre, float(np.sqrt(max(solution[3] + centre @ centre, 0.0)))
+
+
+def _vertex_radius(vertices, distances, radius, threshold):
+    """Median distance of the vertices near the fitted surface, or None.
+
+    Samples taken at polygon centres lie inside the circumscribed surface
+    of a low-poly primitive, its vertices lie on it.
+    """
+    near = np.abs(distances - radius) <= max(threshold, 0.25 * radius)
+    if not near.any():
+        return None, near
+    return float(np.median(distances[near])), near
+
+
+def fit_sphere(co, centres, normals, sample_size=4096, threshold=0.01, confidence=0.99, max_iterations=1024,
+               seed=0):
+    """Robustly fit a sphere to noisy or retopologized geometry with subsampled RANSAC.
+
+    Hypotheses come from 4 random oriented surface samples (polygon
+    centres and normals, or vertices and their normals on dense scans) out
+    of at most ``sample_size``, and are scored all at once; a sample is an
+    inlier within ``threshold`` of the surface, as a fraction of the
+    sample's bounding diagonal, with its normal pointing away from the
+    centre. The centre is refined on the inliers and the radius measured on
+    a vertex sample of ``co``. Returns (centre, radius, inlier ratio), or
+    None when no sphere is found.
+    """
+    rng = np.random.default_rng(seed)
+    centres = np.asarray(centres, dtype=np.float64).reshape(-1, 3)
+    if len(centres) < 4:
+        return None
+    rows = _sample_rows(len(centres), sample_size, rng)
+    points, offset, scale = _normalized(centres[rows])
+    normals = normalize_rows(np.asarray(normals, dtype=np.float64).reshape(-1, 3)[rows])
+
+    def residuals(models):
+        sphere_centres, radii = models
+        offsets = points[None, :, :] - sphere_centres[:, None, :]
+        distances = np.linalg.norm(offsets, axis=2)
+        # Нормаль сферы направлена по радиусу
+        cosines = np.abs(np.einsum('hnj,nj->hn', offsets, normals)) / np.maximum(distances, 1e-12)
+        return np.where(cosines < RADIAL_NORMAL_TOLERANCE, np.inf, np.abs(distances - radii[:, None]))
+
+    def hypothesize(picks):
+        sphere_centres, radii, valid = _solve_spheres(points[picks])
+        return (sphere_centres, radii), valid
+
+    inliers, _draws = _ransac(points, 4, hypothesize, residuals, threshold, max_iterations, confidence, rng)
+    if inliers.sum() < 4:
+        return None
+    # Два уточнения: набор инлайеров пересчитывается по уточнённой сфере
+    for _ in range(2):
+        centre, radius = _refine_sphere(points[inliers])
+        refined = residuals((centre[None], np.array([radius])))[0] <= threshold
+        if refined.sum() < 4:
+            break
+        inliers = refined
+    centre, radius = _refine_sphere(points[inliers])
+
+    co = np.asarray(co, dtype=np.float64).reshape(-1, 3)
+    vertices = (co[_sample_rows(len(co), sample_size, rng)] - offset) / scale
+    radius, _near = _vertex_radius(vertices, np.linalg.norm(vertices - centre, axis=1), radius, threshold)
+    if radius is None:
+        return None
+    return centre * scale + offset, radius * scale, float(inliers.mean())
+
+
+def _solve_cylinders(points, normals):
+    """Cylinder through every (H, 3) triple of oriented samples, as (axis points, axes, radii, valid).
+
+    The axis is perpendicular to the first two normals; the circle passes
+    through all three samples projected across it, so samples off the
+    middle of flat faces still give the exact axis.
+    """
+    axes = np.cross(normals[:, 0], normals[:, 1])
+    length = np.linalg.norm(axes, axis=1)
+    valid = length > 1e-3
+    axes = axes / np.where(valid, length, 1.0)[:, None]
+
+    # Описанная окружность трёх точек в плоскости, перпендикулярной оси
+    flat = points - np.einsum('hkj,hj->hk', points, axes)[..., None] * axes[:, None, :]
+    a = flat[:, 0] - flat[:, 2]
+    b = flat[:, 1] - flat[:, 2]
+    normal = np.cross(a, b)
+    squared = (normal ** 2).sum(axis=1)
+    valid &= squared > 1e-12
+    numerator = np.cross((a ** 2).sum(axis=1)[:, None] * b - (b ** 2).sum(axis=1)[:, None] * a, normal)
+    centres = flat[:, 2] + numerator / (2.0 * np.where(valid, squared, 1.0))[:, None]
+    radii = np.linalg.norm(flat[:, 0] - centres, axis=1)
+    return centres, axes, radii, valid
+
+
+def _axis_distances(points, centres, axes):
+    """(H, N) distances of every point from every axis line."""
+    offsets = points[None, :, :] - centres[:, None, :]
+    along = np.einsum('hnj,hj->hn', offsets, axes)
+    return np.linalg.norm(offsets - along[..., None] * axes[:, None, :], axis=2)
+
+
+def _supported_extent(values, window, support=0.1):
+    """(low, high) of the values with enough neighbours within ``window``.
+
+    A value needs at least ``support`` times the median neighbour count, so
+    sparse stray points past the ends of a cylinder do not stretch its
+    height, while a low-poly cylinder with only two rings keeps both.
+    """
+    values = np.sort(values)
+    counts = np.searchsorted(values, values + window, side='right') - np.searchsorted(values, values - window)
+    kept = values[counts >= support * np.median(counts)]
+    return kept[0], kept[-1]
+
+
+def _refine_axis(centres, normals):
+    """Axis and circle through oriented surface samples, as (axis point, axis, radius).
+
+    The axis is the direction the normals vary least along; the circle is
+    fitted to the samples projected across it.
+    """
+    # Нормали боковой поверхности перпендикулярны оси
+    _values, vectors = np.linalg.eigh(normals.T @ normals)
+    axis = vectors[:, 0]
+    u = _perpendicular(axis)
+    v = np.cross(axis, u)
+    planar = np.column_stack((centres @ u, centres @ v))
+    matrix = np.column_stack((2.0 * planar, np.ones(len(planar))))
+    solution = np.linalg.lstsq(matrix, (planar ** 2).sum(axis=1), rcond=None)[0]
+    radius = float(np.sqrt(max(solution[2] + solution[:2] @ solution[:2], 0.0)))
+    return solution[0] * u + solution[1] * v, axis, radius
+
+
+def fit_cylinder(co, centres, normals, sample_size=4096, threshold=0.01, confidence=0.99, max_iterations=1024,
+                 seed=0):
+    """Robustly fit a cylinder to noisy or retopologized geometry with subsampled RANSAC.
+
+    Hypotheses come from 3 random oriented surface samples (polygon
+    centres and normals, or vertices and their normals on dense scans) out
+    of at most ``sample_size``, and are scored all at once; ``threshold`` is
+    the inlier distance as a fraction of the sample's bounding diagonal.
+    Cap faces end up as outliers, so open and capped cylinders fit alike.
+    The axis is refined on the inliers, then radius and height are measured
+    on a vertex sample of ``co``. Returns (centre, axis, radius, height,
+    inlier ratio), or None when no cylinder is found.
+    """
+    rng = np.random.default_rng(seed)
+    centres = np.asarray(centres, dtype=np.float64).reshape(-1, 3)
+    if len(centres) < 3:
+        return None
+    rows = _sample_rows(len(centres), sample_size, rng)
+    points, offset, scale = _normalized(centres[rows])
+    normals = normalize_rows(np.asarray(normals, dtype=np.float64).reshape(-1, 3)[rows])
+
+    def residuals(models):
+        axis_points, axes, radii = models
+        distances = np.abs(_axis_distances(points, axis_points, axes) - radii[:, None])
+        # Нормаль боковой поверхности почти перпендикулярна оси, грани крышек отсекаются
+        return np.where(np.abs(axes @ normals.T) > AXIS_NORMAL_TOLERANCE, np.inf, distances)
+
+    def hypothesize(picks):
+        axis_points, axes, radii, valid = _solve_cylinders(points[picks], normals[picks])
+        return (axis_points, axes, radii), valid
+
+    inliers, _draws = _ransac(points, 3, hypothesize, residuals, threshold, max_iterations, confidence, rng)
+    if inliers.sum() < 3:
+        return None
+    for _ in range(2):
+        axis_point, axis, radius = _refine_axis(points[inliers], normals[inliers])
+        refined = residuals((axis_point[None], axis[None], np.array([radius])))[0] <= threshold
+        if refined.sum() < 3:
+            break
+        inliers = refined
+    axis_point, axis, radius = _refine_axis(points[inliers], normals[inliers])
+
+    # Радиус и высоту меряем по вершинам
+    co = np.asarray(co, dtype=np.float64).reshape(-1, 3)
+    vertices = (co[_sample_rows(len(co), sample_size, rng)] - offset) / scale
+    distances = _axis_distances(vertices, axis_point[None], axis[None])[0]
+    radius, near = _vertex_radius(vertices, distances, radius, threshold)
+    if radius is None:
+        return None
+    low, high = _supported_extent(vertices[near] @ axis, threshold)
+    centre = axis_point + (low + high) / 2 * axis
+    return centre * scale + offset, axis, radius * scale, float(high - low) * scale, float(inliers.mean())
+
+
+def _perpendicular(normal):
+    """Unit vector perpendicular to a unit normal, built from the least aligned world axis."""
+    axis = np.zeros(3)
+    axis[np.argmin(np.abs(normal))] = 1.0
+    tangent = axis - normal * (axis @ normal)
+    return tangent / np.linalg.norm(tangent)
+
+
+def selection_frame(normals, weights, points):
+    """Orthonormal (tangent, bitangent, normal) frame of a selection as 3x3 columns.
+
+    The normal is the weighted average of ``normals`` (face normals weighted
+    by area, or vertex normals with unit weights). The tangent is the main
+    spread direction of ``points`` within the normal plane, so elongated
+    selections line up with the view's X axis. Returns None when the
+    normals cancel out.
+    """
+    normals = np.asarray(normals, dtype=np.float64).reshape(-1, 3)
+    normal = np.asarray(weights, dtype=np.float64) @ normals
+    length = np.linalg.norm(normal)
+    if not len(normals) or length < 1e-12:
+        return None
+    normal /= length
+
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    tangent = None
+    if len(points) > 1:
+        centered = points - points.mean(axis=0)
+        centered -= np.outer(centered @ normal, normal)
+        values, vectors = np.linalg.eigh(centered.T @ centered)
+        if values[-1] > 1e-12 and values[-1] > values[-2] * (1.0 + 1e-6):
+            tangent = vectors[:, -1]
+    if tangent is None:
+        tangent = _perpendicular(normal)
+
+    # Знак собственного вектора произволен: делаем наибольшую компоненту положительной
+    if tangent[np.argmax(np.abs(tangent))] < 0:
+        tangent = -tangent
+    return np.column_stack((tangent, np.cross(normal, tangent), normal))
+
+
+def transform_frame(frame, matrix):
+    """Carry an object-space frame into world space by a 3x3 matrix, keeping it orthonormal."""
+    matrix = np.asarray(matrix, dtype=np.float64)
+    normal = np.linalg.inv(matrix).T @ frame[:, 2]
+    normal /= np.linalg.norm(normal)
+    tangent = matrix @ frame[:, 0]
+    tangent -= normal * (tangent @ normal)
+    length = np.linalg.norm(tangent)
+    tangent = tangent / length if length > 1e-12 else _perpendicular(normal)
+    return np.column_stack((tangent, np.cross(normal, tangent), normal))
@@ -1,48 +1,92 @@
-bl_info = {
-    "name": "Geometry Nodes Generator",
-    "author": "Your Name",
-    "version": (1, 1),
-    "blender": (4, 3, 0),
-    "location": "Hotkey (Alt+Shift+N)",
-    "description": "Generate Geometry Nodes for different object types using a Pie Menu.",
-    "warning": "",
-    "wiki_url": "",
-    "category": "Object",
-}
+"""Generate Geometry Nodes for different object types using a Pie Menu (Alt+Shift+N)."""
 
 import bpy
-import bmesh
-from mathutils import Vector, Euler
 
+from . import instrumentation
 
-def save_reset_and_apply_transforms(ob):
-    """Save current transforms, reset and apply them."""
-    saved_loc = Vector(ob.location)
-    saved_rot = Euler(ob.rotation_euler)
-    ob.location = (0, 0, 0)
-    ob.rotation_euler = (0, 0, 0)
-    bpy.ops.object.transform_apply(location=True, rotation=True, scale=True)
-    return saved_loc, saved_rot
 
+# Метка на группах узлов, созданных генератором, и отпечаток исходного меша
+GENERATED_KEY = "blender_startup_primitive"
+SOURCE_FINGERPRINT_KEY = "blender_startup_source"
+# Способ подгонки: у групп, подогнанных RANSAC, значение 'RANSAC'
+FIT_KEY = "blender_startup_fit"
 
-def calculate_sphere_segments(ob):
-    """Calculate the number of segments in a sphere by analyzing its vertices."""
-    saved_loc, saved_rot = save_reset_and_apply_transforms(ob)
+PRIMITIVE_KINDS = ('SPHERE', 'CYLINDER')
+# Наименьшая доля инлайеров, при которой устойчивая подгонка признаёт примитив
+MIN_INLIER_RATIO = 0.5
+
+
+def apply_scale(ob):
+    """Bake the object's scale into its mesh, leaving location and rotation as they are.
+
+    Works on the data directly, so it needs no selection or active object
+    and runs the same in background mode.
+    """
+    from mathutils import Matrix
+
+    if tuple(ob.scale) == (1.0, 1.0, 1.0):
+        return
+    ob.data.transform(Matrix.Diagonal((*ob.scale, 1.0)))
+    ob.scale = (1.0, 1.0, 1.0)
+
+
+def vertex_coordinates(mesh):
+    """Read all vertex coordinates of a mesh into an (N, 3) array."""
+    import numpy as np
+
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+    mesh.vertices.foreach_get("co", co)
+    return co.reshape(-1, 3)
+
+
+def cylinder_cap_normal(mesh):
+    """Normal of the first cylinder cap face of a mesh, or None without clear caps."""
+    import numpy as np
+    from . import geometry_kernels
+
+    normals = np.empty(len(mesh.polygons) * 3, dtype=np.float64)
+    mesh.polygons.foreach_get("normal", normals)
+    return geometry_kernels.cylinder_cap_normal(normals, polygon_sizes(mesh))
+
+
+def polygon_samples(mesh):
+    """Polygon centres and normals of a mesh as two (N, 3) arrays."""
+    import numpy as np
+
+    centres = np.empty(len(mesh.polygons) * 3, dtype=np.float64)
+    mesh.polygons.foreach_get("center", centres)
+    normals = np.empty(len(mesh.polygons) * 3, dtype=np.float64)
+    mesh.polygons.foreach_get("normal", normals)
+    return centres.reshape(-1, 3), normals.reshape(-1, 3)
+
+
+def polygon_sizes(mesh):
+    import numpy as np
+
+    sizes = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", sizes)
+    return sizes
 
-    bm = bmesh.new()
-    bm.from_mesh(ob.data)
 
-    bm.verts.ensure_lookup_table()
-    tempZ = round(bm.verts[4].co[2], 4)
-    i = 0
-    for v in bm.verts:
-        if round(v.co[2], 4) == tempZ:
-            i += 1
+def source_fingerprint(obj):
+    """Cheap digest of the source mesh and scale the node parameters were fitted to."""
+    import zlib
+    import numpy as np
 
-    bm.free()
-    ob.location = saved_loc
-    ob.rotation_euler = saved_rot
-    return i
+    mesh = obj.data
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    digest = zlib.crc32(polygon_sizes(mesh).tobytes(), zlib.crc32(co.tobytes()))
+    scale = ",".join(f"{value:.6g}" for value in obj.scale)
+    return f"{len(mesh.vertices)}:{len(mesh.polygons)}:{scale}:{digest:08x}"
+
+
+def calculate_sphere_segments(ob):
+    """Calculate the number of segments in a sphere by analyzing its vertices."""
+    from . import geometry_kernels
+
+    apply_scale(ob)
+    return geometry_kernels.sphere_segments(vertex_coordinates(ob.data))
 
 
 def calculate_geometry_parameters(obj):
@@ -55,44 +99,340 @@ def calculate_geometry_parameters(obj):
 
 def calculate_cylinder_parameters(obj):
     """Determine the cylinder's parameters: vertices, height, and radius."""
-    # Создаём bmesh из объекта
-    bm = bmesh.new()
-    bm.from_mesh(obj.data)
+    # Нормаль первой n-угольной грани считаем нормалью основания
+    normal = cylinder_cap_normal(obj.data)
+    if normal is None:
+        raise ValueError("Object does not have clear cylindrical bases.")
+
+    from . import geometry_kernels
+
+    return geometry_kernels.cylinder_parameters(vertex_coordinates(obj.data), normal)
+
+
+def fit_scanned_primitive(obj, kinds=PRIMITIVE_KINDS):
+    """Fit a sphere or cylinder to a triangulated, decimated or scanned mesh.
+
+    Uses subsampled RANSAC on the polygons instead of the exact topology,
+    in the object's local space. Returns (kind, fit) for the kind with the
+    most inliers, with ``fit`` as returned by ``geometry_kernels.fit_sphere``
+    or ``fit_cylinder``, or None when nothing fits well enough.
+    """
+    from . import geometry_kernels
+
+    if obj.type != 'MESH' or not len(obj.data.polygons):
+        return None
+    co = vertex_coordinates(obj.data)
+    centres, normals = polygon_samples(obj.data)
+    fitters = {'SPHERE': geometry_kernels.fit_sphere, 'CYLINDER': geometry_kernels.fit_cylinder}
+
+    fits = {}
+    for kind in kinds:
+        fit = fitters[kind](co, centres, normals)
+        if fit is not None and fit[-1] >= MIN_INLIER_RATIO:
+            fits[kind] = fit
+    if not fits:
+        return None
+    kind = max(fits, key=lambda kind: fits[kind][-1])
+    return kind, fits[kind]
+
+
+def _resolution(value):
+    """Even node resolution between 8 and 128."""
+    return int(min(max(round(value / 2) * 2, 8), 128))
+
+
+def _new_node_group(obj, sockets):
+    """Add a Geometry Nodes modifier with a fresh node group exposing the given input sockets."""
+    geo_nodes = obj.modifiers.new(name="GeometryNodes", type='NODES')
+    node_tree = bpy.data.node_groups.new(name=f"{obj.name}_Geometry", type='GeometryNodeTree')
+    geo_nodes.node_group = node_tree
+
+    interface = node_tree.interface
+    for name, socket_type in sockets:
+        interface.new_socket(name=name, in_out='INPUT', socket_type=socket_type)
+    interface.new_socket(name="Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry')
+    return geo_nodes, node_tree
 
-    bm.verts.ensure_lookup_table()
 
-    # Определяем векторы нормалей граней основания
-    # Находим две плоские грани, принадлежащие основаниям цилиндра
-    face_normals = [face.normal for face in bm.faces if len(face.verts) > 3]  # Считаем основания
-    if len(face_normals) < 2:
-        bm.free()
+def create_sphere_nodes(obj, segments, rings, radius, translation=None):
+    """Give a mesh object a Geometry Nodes modifier building the matching UV sphere.
+
+    A ``translation`` moves the sphere off the object origin.
+    """
+    geo_nodes, node_tree = _new_node_group(obj, (
+        ("Segments", 'NodeSocketInt'),
+        ("Rings", 'NodeSocketInt'),
+        ("Radius", 'NodeSocketFloat'),
+    ))
+    node_tree[GENERATED_KEY] = 'SPHERE'
+
+    # Create nodes
+    nodes = node_tree.nodes
+    links = node_tree.links
+
+    group_output = nodes.new(type="NodeGroupOutput")
+    group_output.location = (400, 0)
+
+    sphere_node = nodes.new(type="GeometryNodeMeshUVSphere")
+    sphere_node.location = (0, 0)
+
+    # Connect UV Sphere to output
+    links.new(sphere_node.outputs["Mesh"], group_output.inputs[0])
+
+    # Set default values
+    sphere_node.inputs["Segments"].default_value = segments
+    sphere_node.inputs["Rings"].default_value = rings
+    sphere_node.inputs["Radius"].default_value = radius
+
+    if translation is not None:
+        _add_transform(node_tree, sphere_node).inputs["Translation"].default_value = translation
+
+    _track(obj, node_tree)
+    return geo_nodes
+
+
+def create_cylinder_nodes(obj, vertices, height, radius, rotation=None, translation=None):
+    """Give a mesh object a Geometry Nodes modifier building the matching cylinder.
+
+    Without a ``rotation`` the cylinder is oriented along the cap normal.
+    """
+    geo_nodes, node_tree = _new_node_group(obj, (
+        ("Vertices", 'NodeSocketInt'),
+        ("Height", 'NodeSocketFloat'),
+        ("Radius", 'NodeSocketFloat'),
+    ))
+    node_tree[GENERATED_KEY] = 'CYLINDER'
+
+    # Создаём узлы
+    nodes = node_tree.nodes
+    links = node_tree.links
+
+    group_output = nodes.new(type="NodeGroupOutput")
+    group_output.location = (400, 0)
+
+    cylinder_node = nodes.new(type="GeometryNodeMeshCylinder")
+    cylinder_node.location = (0, 0)
+
+    # Подключаем узлы
+    links.new(cylinder_node.outputs["Mesh"], group_output.inputs[0])
+
+    # Устанавливаем значения по умолчанию
+    cylinder_node.inputs["Vertices"].default_value = vertices
+    cylinder_node.inputs["Depth"].default_value = height
+    cylinder_node.inputs["Radius"].default_value = radius
+
+    # Ориентация нового цилиндра
+    align_geometry_nodes_to_object(obj, geo_nodes, rotation, translation)
+
+    _track(obj, node_tree)
+    return geo_nodes
+
+
+def _track(obj, node_tree):
+    from . import primitive_sync
+
+    node_tree[SOURCE_FINGERPRINT_KEY] = source_fingerprint(obj)
+    primitive_sync.track(obj)
+
+
+def axis_rotation(axis):
+    """Rotation taking the Z axis onto the given axis."""
+    from mathutils import Vector
+
+    return Vector((0, 0, 1)).rotation_difference(Vector(axis).normalized()).to_euler()
+
+
+def cylinder_rotation(obj):
+    """Rotation taking the Z axis onto the cylinder axis of a mesh object."""
+    # Нормаль основания цилиндра
+    cap_normal = cylinder_cap_normal(obj.data)
+    if cap_normal is None:
         raise ValueError("Object does not have clear cylindrical bases.")
+    return axis_rotation(cap_normal)
 
-    # Выбираем две нормали, соответствующие основаниям
-    normal_1 = face_normals[0]
-    normal_2 = face_normals[1]
 
-    # Находим высоту цилиндра как расстояние между плоскостями
-    vertices_positions = [v.co for v in bm.verts]
-    projection = [v.dot(normal_1) for v in vertices_positions]
-    min_proj = min(projection)
-    max_proj = max(projection)
-    height = max_proj - min_proj
+def _add_transform(node_tree, mesh_node):
+    """Route the primitive's mesh through a new Transform node into the group output."""
+    nodes = node_tree.nodes
+    links = node_tree.links
 
-    # Находим радиус как среднее расстояние от центра основания до вершин
-    base_center = sum((v.co for v in bm.verts if round(v.co.dot(normal_1), 4) == round(min_proj, 4)), Vector()) / len(
-        [v for v in bm.verts if round(v.co.dot(normal_1), 4) == round(min_proj, 4)]
-    )
-    base_vertices = [v for v in bm.verts if round(v.co.dot(normal_1), 4) == round(min_proj, 4)]
-    radius = sum((v.co - base_center).length for v in base_vertices) / len(base_vertices)
+    # Поиск узла Group Output
+    group_output = next((node for node in nodes if isinstance(node, bpy.types.NodeGroupOutput)), None)
+    if not group_output:
+        raise ValueError("Group Output node not found in the node tree")
+
+    # Добавление узла Transform
+    transform_node = nodes.new(type="GeometryNodeTransform")
+    transform_node.location = (200, 0)
+
+    # Подключение узлов
+    links.new(mesh_node.outputs["Mesh"], transform_node.inputs["Geometry"])
+    links.new(transform_node.outputs["Geometry"], group_output.inputs["Geometry"])
+    return transform_node
+
+
+def align_geometry_nodes_to_object(obj, modifier, rotation=None, translation=None):
+    """Align the Geometry Nodes cylinder to match the orientation of the original object."""
+    if rotation is None:
+        rotation = cylinder_rotation(obj)
+
+    # Поиск узла цилиндра
+    cylinder_node = _find_node(modifier.node_group, bpy.types.GeometryNodeMeshCylinder)
+    if not cylinder_node:
+        raise ValueError("Cylinder node not found in the node tree")
+
+    # Установка вращения для узла Transform
+    transform_node = _add_transform(modifier.node_group, cylinder_node)
+    transform_node.inputs["Rotation"].default_value = rotation
+    if translation is not None:
+        transform_node.inputs["Translation"].default_value = translation
+
+
+def generated_modifier(obj):
+    """The Geometry Nodes modifier built by the generator, or None."""
+    return next((modifier for modifier in obj.modifiers
+                 if modifier.type == 'NODES' and modifier.node_group is not None
+                 and GENERATED_KEY in modifier.node_group), None)
 
-    # Количество вершин в основании
-    vertices_count = len(base_vertices)
 
-    # Освобождаем bmesh
-    bm.free()
+def has_generated_nodes(obj):
+    return generated_modifier(obj) is not None
 
-    return vertices_count, height, radius
+
+def detect_primitive(obj):
+    """'SPHERE', 'CYLINDER' or None for a mesh object, judged from its topology."""
+    from . import geometry_kernels
+
+    if obj.type != 'MESH' or not len(obj.data.polygons):
+        return None
+    return geometry_kernels.classify_primitive(vertex_coordinates(obj.data), polygon_sizes(obj.data))
+
+
+def generate_primitive_nodes(obj, kind=None):
+    """Detect (unless ``kind`` is given) and build the node group of one object.
+
+    Returns a summary dict, or None when the object is not a recognised
+    primitive. Needs no context, so it works in background mode.
+    """
+    kind = kind or detect_primitive(obj)
+    if kind == 'SPHERE':
+        segments, rings, radius = calculate_geometry_parameters(obj)
+        create_sphere_nodes(obj, segments, rings, radius)
+        parameters = {"segments": segments, "rings": rings, "radius": radius}
+    elif kind == 'CYLINDER':
+        vertices, height, radius = calculate_cylinder_parameters(obj)
+        create_cylinder_nodes(obj, vertices, height, radius)
+        parameters = {"vertices": int(vertices), "height": height, "radius": radius}
+    else:
+        return None
+    return {"object": obj.name, "kind": kind, "parameters": parameters}
+
+
+def generate_scanned_nodes(obj, kinds=PRIMITIVE_KINDS):
+    """Fit (see ``fit_scanned_primitive``) and build the node group of one object.
+
+    The node resolution is estimated from the vertex count. Returns a
+    summary dict, or None when no primitive fits.
+    """
+    result = fit_scanned_primitive(obj, kinds)
+    if result is None:
+        return None
+    kind, fit = result
+    vert_count = len(obj.data.vertices)
+    if kind == 'SPHERE':
+        centre, radius, inlier_ratio = fit
+        # У UV-сферы с вдвое меньшим числом колец около segments^2 / 2 вершин
+        segments = _resolution((2 * vert_count) ** 0.5)
+        modifier = create_sphere_nodes(obj, segments, segments // 2, radius, translation=centre)
+        parameters = {"segments": segments, "rings": segments // 2, "radius": radius}
+    else:
+        centre, axis, radius, height, inlier_ratio = fit
+        vertices = _resolution(vert_count / 2)
+        modifier = create_cylinder_nodes(obj, vertices, height, radius,
+                                         rotation=axis_rotation(axis), translation=centre)
+        parameters = {"vertices": vertices, "height": height, "radius": radius}
+    modifier.node_group[FIT_KEY] = 'RANSAC'
+    parameters.update(centre=[float(value) for value in centre], inlier_ratio=inlier_ratio)
+    return {"object": obj.name, "kind": kind, "fit": 'RANSAC', "parameters": parameters}
+
+
+def _find_node(node_tree, node_type):
+    return next((node for node in node_tree.nodes if isinstance(node, node_type)), None)
+
+
+def resync_primitive_nodes(obj):
+    """Re-fit the generated node parameters to the current source mesh.
+
+    Does nothing while the stored source fingerprint still matches. A mesh
+    that turned into the other primitive gets its node group rebuilt; one
+    that no longer looks like a primitive keeps its last parameters.
+    Returns True when the node group was changed.
+    """
+    from . import geometry_kernels
+
+    modifier = generated_modifier(obj)
+    if modifier is None:
+        return False
+    node_tree = modifier.node_group
+    fingerprint = source_fingerprint(obj)
+    if node_tree.get(SOURCE_FINGERPRINT_KEY) == fingerprint:
+        return False
+
+    # Дубликаты объекта делят группу узлов, её нужно отделить
+    if node_tree.users > 1:
+        node_tree = node_tree.copy()
+        modifier.node_group = node_tree
+    node_tree[SOURCE_FINGERPRINT_KEY] = fingerprint
+
+    if node_tree.get(FIT_KEY) == 'RANSAC':
+        # Разрешение узлов не трогаем, подгоняем размеры и положение
+        result = fit_scanned_primitive(obj, (node_tree[GENERATED_KEY],))
+        if result is None:
+            return False
+        _kind, fit = result
+        transform_node = _find_node(node_tree, bpy.types.GeometryNodeTransform)
+        if node_tree[GENERATED_KEY] == 'SPHERE':
+            centre, radius, _inlier_ratio = fit
+            _find_node(node_tree, bpy.types.GeometryNodeMeshUVSphere).inputs["Radius"].default_value = radius
+        else:
+            centre, axis, radius, height, _inlier_ratio = fit
+            cylinder_node = _find_node(node_tree, bpy.types.GeometryNodeMeshCylinder)
+            cylinder_node.inputs["Depth"].default_value = height
+            cylinder_node.inputs["Radius"].default_value = radius
+            if transform_node is not None:
+                transform_node.inputs["Rotation"].default_value = axis_rotation(axis)
+        if transform_node is not None:
+            transform_node.inputs["Translation"].default_value = centre
+        return True
+
+    kind = detect_primitive(obj)
+    if kind is None:
+        return False
+    if kind != node_tree[GENERATED_KEY]:
+        obj.modifiers.remove(modifier)
+        if not node_tree.users:
+            bpy.data.node_groups.remove(node_tree)
+        generate_primitive_nodes(obj, kind)
+        return True
+
+    if kind == 'SPHERE':
+        # Масштаб учитываем без применения, чтобы не менять объект
+        co = vertex_coordinates(obj.data) * tuple(obj.scale)
+        segments, rings, radius = geometry_kernels.sphere_parameters(co, len(obj.data.polygons))
+        sphere_node = _find_node(node_tree, bpy.types.GeometryNodeMeshUVSphere)
+        sphere_node.inputs["Segments"].default_value = segments
+        sphere_node.inputs["Rings"].default_value = rings
+        sphere_node.inputs["Radius"].default_value = radius
+    else:
+        vertices, height, radius = calculate_cylinder_parameters(obj)
+        cylinder_node = _find_node(node_tree, bpy.types.GeometryNodeMeshCylinder)
+        cylinder_node.inputs["Vertices"].default_value = vertices
+        cylinder_node.inputs["Depth"].default_value = height
+        cylinder_node.inputs["Radius"].default_value = radius
+        transform_node = _find_node(node_tree, bpy.types.GeometryNodeTransform)
+        if transform_node is not None:
+            transform_node.inputs["Rotation"].default_value = cylinder_rotation(obj)
+    return True
 
 
 class OBJECT_OT_GenerateSphereGeometryNodes(bpy.types.Operator):
@@ -101,6 +441,13 @@ class OBJECT_OT_GenerateSphereGeometryNodes(bpy.types.Operator):
     bl_label = "Generate Sphere Geometry Nodes"
     bl_options = {'REGISTER', 'UNDO'}
 
+    robust: bpy.props.BoolProperty(
+        name="Robust Fit",
+        description="Fit by RANSAC on sampled polygons, for triangulated, decimated or scanned spheres",
+        default=False
+    )
+
+    @instrumentation.instrumented
     def execute(self, context):
         obj = context.object
 
@@ -113,42 +460,26 @@ class OBJECT_OT_GenerateSphereGeometryNodes(bpy.types.Operator):
             self.report({'WARNING'}, "The selected object does not appear to be a sphere.")
             return {'CANCELLED'}
 
+        instrumentation.note(objects=1, verts=len(obj.data.vertices))
+        if self.robust:
+            return self.fit_scanned(obj)
         segments, rings, radius = calculate_geometry_parameters(obj)
-
-        # Add Geometry Nodes modifier
-        geo_nodes = obj.modifiers.new(name="GeometryNodes", type='NODES')
-        node_tree = bpy.data.node_groups.new(name=f"{obj.name}_Geometry", type='GeometryNodeTree')
-        geo_nodes.node_group = node_tree
-
-        # Create interface
-        interface = node_tree.interface
-        interface.new_socket(name="Segments", in_out='INPUT', socket_type='NodeSocketInt')
-        interface.new_socket(name="Rings", in_out='INPUT', socket_type='NodeSocketInt')
-        interface.new_socket(name="Radius", in_out='INPUT', socket_type='NodeSocketFloat')
-        interface.new_socket(name="Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry')
-
-        # Create nodes
-        nodes = node_tree.nodes
-        links = node_tree.links
-
-        group_output = nodes.new(type="NodeGroupOutput")
-        group_output.location = (400, 0)
-
-        sphere_node = nodes.new(type="GeometryNodeMeshUVSphere")
-        sphere_node.location = (0, 0)
-
-        # Connect UV Sphere to output
-        links.new(sphere_node.outputs["Mesh"], group_output.inputs[0])
-
-        # Set default values
-        sphere_node.inputs["Segments"].default_value = segments
-        sphere_node.inputs["Rings"].default_value = rings
-        sphere_node.inputs["Radius"].default_value = radius
+        create_sphere_nodes(obj, segments, rings, radius)
 
         self.report({'INFO'},
                     f"Generated Geometry Nodes for '{obj.name}' (Segments={segments}, Rings={rings}, Radius={radius})")
         return {'FINISHED'}
 
+    def fit_scanned(self, obj):
+        summary = generate_scanned_nodes(obj, ('SPHERE',))
+        if summary is None:
+            self.report({'WARNING'}, "No sphere could be fitted to the selected object.")
+            return {'CANCELLED'}
+        parameters = summary["parameters"]
+        self.report({'INFO'}, f"Fitted Geometry Nodes sphere to '{obj.name}' (Radius={parameters['radius']:.4g}, "
+                              f"{parameters['inlier_ratio']:.0%} inliers)")
+        return {'FINISHED'}
+
 
 class OBJECT_OT_GenerateCylinderGeometryNodes(bpy.types.Operator):
     """Generate Geometry Nodes for Cylinder"""
@@ -156,6 +487,13 @@ class OBJECT_OT_GenerateCylinderGeometryNodes(bpy.types.Operator):
     bl_label = "Generate Cylinder Geometry Nodes"
     bl_options = {'REGISTER', 'UNDO'}
 
+    robust: bpy.props.BoolProperty(
+        name="Robust Fit",
+        description="Fit by RANSAC on sampled polygons, for triangulated, decimated or scanned cylinders",
+        default=False
+    )
+
+    @instrumentation.instrumented
     def execute(self, context):
         obj = context.object
 
@@ -168,94 +506,27 @@ class OBJECT_OT_GenerateCylinderGeometryNodes(bpy.types.Operator):
             self.report({'WARNING'}, "The selected object does not appear to be a cylinder.")
             return {'CANCELLED'}
 
+        instrumentation.note(objects=1, verts=len(obj.data.vertices))
+        if self.robust:
+            return self.fit_scanned(obj)
         vertices, height, radius = calculate_cylinder_parameters(obj)
-
-        # Добавляем модификатор Geometry Nodes
-        geo_nodes = obj.modifiers.new(name="GeometryNodes", type='NODES')
-        node_tree = bpy.data.node_groups.new(name=f"{obj.name}_Geometry", type='GeometryNodeTree')
-        geo_nodes.node_group = node_tree
-
-        # Создаём интерфейс
-        interface = node_tree.interface
-        interface.new_socket(name="Vertices", in_out='INPUT', socket_type='NodeSocketInt')
-        interface.new_socket(name="Height", in_out='INPUT', socket_type='NodeSocketFloat')
-        interface.new_socket(name="Radius", in_out='INPUT', socket_type='NodeSocketFloat')
-        interface.new_socket(name="Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry')
-
-        # Создаём узлы
-        nodes = node_tree.nodes
-        links = node_tree.links
-
-        group_output = nodes.new(type="NodeGroupOutput")
-        group_output.location = (400, 0)
-
-        cylinder_node = nodes.new(type="GeometryNodeMeshCylinder")
-        cylinder_node.location = (0, 0)
-
-        # Подключаем узлы
-        links.new(cylinder_node.outputs["Mesh"], group_output.inputs[0])
-
-        # Устанавливаем значения по умолчанию
-        cylinder_node.inputs["Vertices"].default_value = vertices
-        cylinder_node.inputs["Depth"].default_value = height
-        cylinder_node.inputs["Radius"].default_value = radius
-
-        # Ориентация нового цилиндра
-        self.align_geometry_nodes_to_object(obj, geo_nodes)
+        create_cylinder_nodes(obj, vertices, height, radius)
 
         self.report({'INFO'},
-                    f"Generated Geometry Nodes for '{obj.name}' (Vertices={vertices}, Height={height}, Radius={radius})")
+                    f"Generated Geometry Nodes for '{obj.name}' "
+                    f"(Vertices={vertices}, Height={height}, Radius={radius})")
         return {'FINISHED'}
 
-    def align_geometry_nodes_to_object(self, obj, modifier):
-        """Align the Geometry Nodes cylinder to match the orientation of the original object."""
-
-        import bmesh
-        from mathutils import Vector
-
-        # Создаём bmesh из оригинального объекта
-        bm = bmesh.new()
-        bm.from_mesh(obj.data)
-
-        # Получаем нормаль основания цилиндра
-        face_normals = [face.normal for face in bm.faces if len(face.verts) > 3]
-        if len(face_normals) < 2:
-            bm.free()
-            raise ValueError("Object does not have clear cylindrical bases.")
-
-        # Нормаль основания цилиндра
-        cylinder_axis = face_normals[0].normalized()
-        bm.free()
-
-        # Вычисляем вращение между осью Z и осью цилиндра
-        z_axis = Vector((0, 0, 1))
-        rotation = z_axis.rotation_difference(cylinder_axis).to_euler()
-
-        # Работа с деревом узлов Geometry Nodes
-        node_tree = modifier.node_group
-        nodes = node_tree.nodes
-        links = node_tree.links
-
-        # Поиск узла Group Output
-        group_output = next((node for node in nodes if isinstance(node, bpy.types.NodeGroupOutput)), None)
-        if not group_output:
-            raise ValueError("Group Output node not found in the node tree")
-
-        # Добавление узла Transform
-        transform_node = nodes.new(type="GeometryNodeTransform")
-        transform_node.location = (200, 0)
-
-        # Поиск узла цилиндра
-        cylinder_node = next((node for node in nodes if isinstance(node, bpy.types.GeometryNodeMeshCylinder)), None)
-        if not cylinder_node:
-            raise ValueError("Cylinder node not found in the node tree")
-
-        # Подключение узлов
-        links.new(cylinder_node.outputs["Mesh"], transform_node.inputs["Geometry"])
-        links.new(transform_node.outputs["Geometry"], group_output.inputs["Geometry"])
-
-        # Установка вращения для узла Transform
-        transform_node.inputs["Rotation"].default_value = rotation
+    def fit_scanned(self, obj):
+        summary = generate_scanned_nodes(obj, ('CYLINDER',))
+        if summary is None:
+            self.report({'WARNING'}, "No cylinder could be fitted to the selected object.")
+            return {'CANCELLED'}
+        parameters = summary["parameters"]
+        self.report({'INFO'}, f"Fitted Geometry Nodes cylinder to '{obj.name}' "
+                              f"(Height={parameters['height']:.4g}, Radius={parameters['radius']:.4g}, "
+                              f"{parameters['inlier_ratio']:.0%} inliers)")
+        return {'FINISHED'}
 
 
 class VIEW3D_MT_GenerateGeometryNodesSubMenu(bpy.types.Menu):
@@ -275,6 +546,17 @@ class VIEW3D_MT_GenerateGeometryNodesSubMenu(bpy.types.Menu):
             text="Generate for Cylinder",
             icon='MESH_CYLINDER',
         )
+        layout.separator()
+        layout.operator(
+            OBJECT_OT_GenerateSphereGeometryNodes.bl_idname,
+            text="Fit Scanned Sphere",
+            icon='MESH_UVSPHERE',
+        ).robust = True
+        layout.operator(
+            OBJECT_OT_GenerateCylinderGeometryNodes.bl_idname,
+            text="Fit Scanned Cylinder",
+            icon='MESH_CYLINDER',
+        ).robust = True
 
 
 class VIEW3D_MT_GeometryNodesPie(bpy.types.Menu):
@@ -288,36 +570,13 @@ class VIEW3D_MT_GeometryNodesPie(bpy.types.Menu):
         pie.menu(VIEW3D_MT_GenerateGeometryNodesSubMenu.bl_idname, text="Generate Nodes", icon='NODETREE')
 
 
-addon_keymaps = []
-
-
-def register():
-    bpy.utils.register_class(OBJECT_OT_GenerateSphereGeometryNodes)
-    bpy.utils.register_class(OBJECT_OT_GenerateCylinderGeometryNodes)
-    bpy.utils.register_class(VIEW3D_MT_GenerateGeometryNodesSubMenu)
-    bpy.utils.register_class(VIEW3D_MT_GeometryNodesPie)
-
-    wm = bpy.context.window_manager
-    km = wm.keyconfigs.addon.keymaps.new(name="3D View", space_type='VIEW_3D')
-    kmi = km.keymap_items.new("wm.call_menu_pie", type='N', value='PRESS', alt=True, shift=True)
-    kmi.properties.name = VIEW3D_MT_GeometryNodesPie.bl_idname
-    addon_keymaps.append((km, kmi))
-
-    print("Pie menu 'Geometry Nodes' registered with hotkey Alt+Shift+N.")
-
-
-def unregister():
-    for km, kmi in addon_keymaps:
-        km.keymap_items.remove(kmi)
-    addon_keymaps.clear()
-
-    bpy.utils.unregister_class(OBJECT_OT_GenerateSphereGeometryNodes)
-    bpy.utils.unregister_class(OBJECT_OT_GenerateCylinderGeometryNodes)
-    bpy.utils.unregister_class(VIEW3D_MT_GenerateGeometryNodesSubMenu)
-    bpy.utils.unregister_class(VIEW3D_MT_GeometryNodesPie)
-
-    print("Pie menu 'Geometry Nodes' unregistered.")
-
+classes = (
+    OBJECT_OT_GenerateSphereGeometryNodes,
+    OBJECT_OT_GenerateCylinderGeometryNodes,
+    VIEW3D_MT_GenerateGeometryNodesSubMenu,
+    VIEW3D_MT_GeometryNodesPie,
+)
 
-if __name__ == "__main__":
-    register()
+keymap_items = (
+    ("wm.call_menu_pie", 'N', {'alt': True, 'shift': True}, {'name': VIEW3D_MT_GeometryNodesPie.bl_idname}),
+)
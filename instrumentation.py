@@ -0,0 +1,210 @@
+"""Wall time, element counts and memory peaks of the addon operators (View3D > Sidebar > Stats)."""
+
+import cProfile
+import csv
+import json
+import math
+import os
+import time
+import tracemalloc
+from collections import deque
+from functools import wraps
+
+import bpy
+from bpy_extras.io_utils import ExportHelper
+
+# Каталог для .prof файлов; если задан, каждый вызов оператора профилируется
+PROFILE_ENV = "BLENDER_STARTUP_PROFILE_DIR"
+# Если задан, пик памяти замеряется через tracemalloc
+TRACEMALLOC_ENV = "BLENDER_STARTUP_TRACEMALLOC"
+MAX_RECORDS = 2000
+PERCENTILES = (50, 90, 99)
+
+_records = deque(maxlen=MAX_RECORDS)
+_active_counts = []
+
+
+def note(**counts):
+    """Attach element counts (selected_verts, pairs, groups, objects, ...) to the running operator."""
+    if _active_counts:
+        _active_counts[-1].update(counts)
+
+
+def _tracemalloc_enabled(context):
+    if os.environ.get(TRACEMALLOC_ENV):
+        return True
+    return getattr(context.window_manager, "operator_stats_tracemalloc", False)
+
+
+def _dump_profile(profiler, bl_idname):
+    directory = os.environ[PROFILE_ENV]
+    os.makedirs(directory, exist_ok=True)
+    name = f"{bl_idname.replace('.', '_')}_{time.strftime('%Y%m%d_%H%M%S')}_{len(_records)}.prof"
+    profiler.dump_stats(os.path.join(directory, name))
+
+
+def instrumented(execute):
+    """Decorate an operator's execute to record its wall time, counts and memory peak."""
+
+    @wraps(execute)
+    def wrapper(self, context):
+        counts = {}
+        _active_counts.append(counts)
+        trace = _tracemalloc_enabled(context) and not tracemalloc.is_tracing()
+        if trace:
+            tracemalloc.start()
+        profiler = cProfile.Profile() if os.environ.get(PROFILE_ENV) else None
+
+        result = {'ERROR'}
+        start = time.perf_counter()
+        try:
+            if profiler:
+                result = profiler.runcall(execute, self, context)
+            else:
+                result = execute(self, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            _active_counts.pop()
+            peak = None
+            if trace:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+            _records.append({
+                "operator": self.bl_idname,
+                "timestamp": time.time(),
+                "wall_s": elapsed,
+                "result": ",".join(sorted(result)),
+                "peak_bytes": peak,
+                "counts": counts,
+            })
+            if profiler:
+                _dump_profile(profiler, self.bl_idname)
+        return result
+
+    return wrapper
+
+
+def records():
+    return list(_records)
+
+
+def clear():
+    _records.clear()
+
+
+def _percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(math.ceil(percent / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+def summary():
+    """Per-operator call count, mean, percentiles and max of wall time."""
+    timings = {}
+    for record in _records:
+        timings.setdefault(record["operator"], []).append(record["wall_s"])
+
+    rows = []
+    for operator, values in sorted(timings.items()):
+        values.sort()
+        row = {"operator": operator, "calls": len(values), "mean_s": sum(values) / len(values)}
+        for percent in PERCENTILES:
+            row[f"p{percent}_s"] = _percentile(values, percent)
+        row["max_s"] = values[-1]
+        rows.append(row)
+    return rows
+
+
+def dump(filepath, file_format='JSON'):
+    """Write the summary (and raw records for JSON) to a file."""
+    rows = summary()
+    with open(filepath, "w", newline="") as f:
+        if file_format == 'CSV':
+            fieldnames = ["operator", "calls", "mean_s"] + [f"p{p}_s" for p in PERCENTILES] + ["max_s"]
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            json.dump({"summary": rows, "records": records()}, f, indent=2)
+    return len(rows)
+
+
+class WM_OT_DumpOperatorStats(bpy.types.Operator, ExportHelper):
+    """Dump operator timing percentiles to a JSON or CSV file"""
+    bl_idname = "wm.dump_operator_stats"
+    bl_label = "Dump Operator Stats"
+
+    filename_ext = ".json"
+
+    file_format: bpy.props.EnumProperty(
+        name="Format",
+        items=[
+            ('JSON', "JSON", "Summary and raw records"),
+            ('CSV', "CSV", "Per-operator summary rows"),
+        ],
+        default='JSON'
+    )
+
+    def execute(self, context):
+        filepath = bpy.path.ensure_ext(self.filepath, "." + self.file_format.lower())
+        count = dump(filepath, self.file_format)
+        self.report({'INFO'}, f"Wrote stats of {count} operators to {filepath}")
+        return {'FINISHED'}
+
+
+class WM_OT_ClearOperatorStats(bpy.types.Operator):
+    """Clear recorded operator timings"""
+    bl_idname = "wm.clear_operator_stats"
+    bl_label = "Clear Operator Stats"
+
+    def execute(self, context):
+        clear()
+        return {'FINISHED'}
+
+
+class VIEW3D_PT_OperatorStats(bpy.types.Panel):
+    """Panel with recorded operator timings"""
+    bl_label = "Operator Stats"
+    bl_idname = "VIEW3D_PT_operator_stats"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "Stats"
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(context.window_manager, "operator_stats_tracemalloc")
+
+        rows = summary()
+        if not rows:
+            layout.label(text="No operator calls recorded.")
+        for row in rows:
+            box = layout.box()
+            box.label(text=f"{row['operator']} ({row['calls']} calls)")
+            box.label(text=f"p50 {row['p50_s'] * 1000:.1f} ms  p90 {row['p90_s'] * 1000:.1f} ms  "
+                           f"max {row['max_s'] * 1000:.1f} ms")
+
+        row = layout.row()
+        row.operator(WM_OT_DumpOperatorStats.bl_idname, text="Dump")
+        row.operator(WM_OT_ClearOperatorStats.bl_idname, text="Clear")
+
+
+classes = (
+    WM_OT_DumpOperatorStats,
+    WM_OT_ClearOperatorStats,
+    VIEW3D_PT_OperatorStats,
+)
+
+keymap_items = ()
+
+
+def register():
+    bpy.types.WindowManager.operator_stats_tracemalloc = bpy.props.BoolProperty(
+        name="Track Memory Peak",
+        description="Measure the peak Python memory of every operator call with tracemalloc (slower)",
+        default=False
+    )
+
+
+def unregister():
+    del bpy.types.WindowManager.operator_stats_tracemalloc
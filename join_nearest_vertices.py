@@ -1,18 +1,214 @@
-bl_info = {
-    "name": "Join and Equalize Vertices",
-    "author": "Your Name",
-    "version": (1, 7),
-    "blender": (3, 6, 0),
-    "location": "Hotkey (Shift+J)",
-    "description": "Join nearest vertices, equalize distances, and manage vertex groups",
-    "warning": "",
-    "wiki_url": "",
-    "category": "Mesh",
-}
+"""Join nearest vertices, equalize distances, and manage vertex groups (Shift+J)."""
 
 import bpy
-import bmesh
-from mathutils import Vector
+
+from . import instrumentation
+
+# Больше кандидатов почти не находит новых разрезов, а поиск k ближайших растёт с k
+MAX_CANDIDATES = 8
+
+
+def equalize_selection(snapshot, group1, group2, polyline, distance_factor, equalize_lengths, orthogonal,
+                       mode='CLOSEST', smoothing=25.0):
+    """Equalize one mesh.
+
+    ``polyline`` is the base group's persisted polyline, or None when the
+    base group is not a simple chain; vertices are then placed relative to
+    their closest base vertex. Returns (moved indices, coords, stats) with
+    stats of the relaxation (residual, seconds) or None, or a
+    warning message string.
+    """
+    import time
+    from . import geometry_kernels
+
+    # Calculate average edge length if equalize lengths is enabled
+    average_length = None
+    if equalize_lengths:
+        average_length = geometry_kernels.connecting_edge_length(snapshot.co, snapshot.edges, group1, group2)
+        if average_length is None:
+            return "No connecting edges found."
+
+    if mode == 'CLOSEST' and polyline is not None:
+        moved, coords = geometry_kernels.equalize_along_polyline(
+            snapshot.co, polyline, group2,
+            distance_factor=distance_factor,
+            average_length=average_length,
+            orthogonal=orthogonal,
+        )
+        return moved, coords, None
+    if mode == 'CLOSEST':
+        moved, coords = geometry_kernels.equalize_positions(
+            snapshot.co, group1, group2, snapshot.adjacency_indptr, snapshot.adjacency_indices,
+            distance_factor=distance_factor,
+            average_length=average_length,
+            orthogonal=orthogonal,
+        )
+        return moved, coords, None
+
+    if polyline is None:
+        return "The base group must form a single unbranched edge chain or loop."
+    start = time.perf_counter()
+    # Обход кривой начинается от базовой вершины, с которой вершина соединена ребром
+    feet = geometry_kernels.joined_base_parameters(
+        polyline, group2, snapshot.adjacency_indptr, snapshot.adjacency_indices)
+    moved, coords, residual = geometry_kernels.relax_spacing(
+        snapshot.co, polyline, group2,
+        distance_factor=distance_factor,
+        average_length=average_length,
+        smoothing=smoothing,
+        start=feet,
+    )
+    return moved, coords, (residual, time.perf_counter() - start)
+
+
+def join_candidates(snapshot, count=1):
+    """Nearest group2 candidates of every group1 vertex of one mesh, or None.
+
+    The two selected connected groups give group1 and group2; returns
+    (group1, candidates, distances) with the ``count`` nearest group2
+    vertices of every group1 vertex, closest first.
+    """
+    from . import geometry_kernels
+
+    # Компоненты и дерево могли быть построены заранее, пока пользователь выделял вершины
+    groups = snapshot.components()
+    if len(groups) != 2:
+        return None
+    group1, group2 = groups
+    count = min(count, MAX_CANDIDATES)
+    candidates, distances = geometry_kernels.nearest_candidates(snapshot.co, group1, group2, count,
+                                                                tree=snapshot.kd_tree(group2))
+    return group1, candidates, distances
+
+
+def _crosses_geometry(tree, co, i1, i2, polygons):
+    """Whether the segment between two vertices passes through a face not using either vertex."""
+    from mathutils import Vector
+
+    origin = Vector(co[i1])
+    direction = Vector(co[i2]) - origin
+    length = direction.length
+    if length == 0.0:
+        return False
+    direction /= length
+
+    # Ближайшее попадание может быть в собственную грань конца отрезка,
+    # тогда луч продолжается сразу за ним
+    step = length * 1e-5
+    travelled = 0.0
+    while travelled < length:
+        location, _normal, index, distance = tree.ray_cast(origin + direction * travelled, direction,
+                                                           length - travelled)
+        if location is None:
+            return False
+        if i1 not in polygons[index] and i2 not in polygons[index]:
+            return True
+        travelled += distance + step
+    return False
+
+
+def validate_pairs(co, faces, group1, candidates, distances, max_length_factor=3.0):
+    """Pick for every group1 vertex the closest candidate whose cut stays clear of other geometry.
+
+    ``faces`` holds the (loop_starts, loop_totals, corner_verts) arrays of
+    the mesh; the BVH tree is built straight from them. Only the closest
+    remaining candidate of each vertex is ray-cast; a segment is rejected
+    when it crosses a face not using its end vertices, and the vertex then
+    falls back to its next candidate. Candidates longer than
+    ``max_length_factor`` times the median nearest distance (0 disables the
+    limit) are never tested. Returns (pairs, stats) with the rejection
+    counts.
+    """
+    import numpy as np
+    from mathutils.bvhtree import BVHTree
+
+    loop_starts, loop_totals, corner_verts = faces
+    corners = corner_verts.tolist()
+    polygons = [corners[start:start + total] for start, total in zip(loop_starts.tolist(), loop_totals.tolist())]
+    tree = BVHTree.FromPolygons(co.tolist(), polygons)
+
+    max_length = np.inf
+    if max_length_factor > 0 and len(distances):
+        max_length = max_length_factor * float(np.median(distances[:, 0]))
+    # Кандидаты идут по возрастанию расстояния: за слишком длинным остальные тоже длиннее
+    present = candidates >= 0
+    usable = present & (distances <= max_length)
+
+    stats = {"crossing": 0, "too_long": 0, "fallbacks": 0, "dropped": 0}
+    chosen = np.full(len(group1), -1, dtype=np.int64)
+    pending = np.arange(len(group1))
+    for rank in range(candidates.shape[1]):
+        stats["too_long"] += int((present[pending, rank] & ~usable[pending, rank]).sum())
+        pending = pending[usable[pending, rank]]
+        clear = [not _crosses_geometry(tree, co, i1, i2, polygons)
+                 for i1, i2 in zip(group1[pending].tolist(), candidates[pending, rank].tolist())]
+        clear = np.array(clear, dtype=bool)
+        chosen[pending[clear]] = candidates[pending[clear], rank]
+        stats["crossing"] += int((~clear).sum())
+        if rank:
+            stats["fallbacks"] += int(clear.sum())
+        pending = pending[~clear]
+
+    picked = chosen >= 0
+    stats["dropped"] = int((~picked).sum())
+    return np.column_stack((group1[picked], chosen[picked])), stats
+
+
+def equalize_object(obj, distance_factor=1.0, equalize_lengths=False, orthogonal=False,
+                    mode='CLOSEST', smoothing=25.0):
+    """Scripting entry point: equalize the selected vertices of a mesh object to its base group.
+
+    Works in object mode straight on the Mesh data. Returns the same value
+    as ``equalize_selection``, after writing the coordinates back.
+    """
+    import numpy as np
+    from . import base_curve, mesh_snapshot
+
+    snapshot = mesh_snapshot.get_snapshot(obj)
+    group1 = np.asarray(obj.get("base_group", ()), dtype=np.int64)
+    group1 = group1[group1 < snapshot.vert_count]
+    group2 = snapshot.selected_indices()
+    if not len(group1) or not len(group2):
+        return "A base group and a selection are required."
+
+    polyline = base_curve.load(obj, snapshot)
+    result = equalize_selection(snapshot, group1, group2, polyline, distance_factor, equalize_lengths, orthogonal,
+                                mode, smoothing)
+    if not isinstance(result, str) and len(result[0]):
+        mesh_snapshot.write_coords(obj, result[0], result[1])
+    return result
+
+
+def pick_pairs(obj, co, group1, candidates, distances, validate=True, max_length_factor=3.0):
+    """Join pairs of one mesh, validated against its faces or simply the nearest candidates.
+
+    Returns (pairs, stats) as ``validate_pairs`` does; stats is None
+    without validation.
+    """
+    import numpy as np
+    from . import mesh_snapshot
+
+    if not validate:
+        return np.column_stack((group1, candidates[:, 0])), None
+    # Грани читаются из Mesh массивами, без преобразования в BMesh
+    return validate_pairs(co, mesh_snapshot.read_faces(obj), group1, candidates, distances, max_length_factor)
+
+
+def join_object(obj, validate=True, candidates=4, max_length_factor=3.0):
+    """Scripting entry point: join the two selected groups of a mesh object in object mode.
+
+    The chosen pairs are joined with new edges written directly to the
+    Mesh; returns (edges added, validation stats), or None without two
+    groups.
+    """
+    from . import mesh_snapshot
+
+    snapshot = mesh_snapshot.get_snapshot(obj)
+    result = join_candidates(snapshot, candidates if validate else 1)
+    if result is None:
+        return None
+    pairs, stats = pick_pairs(obj, snapshot.co, *result, validate=validate, max_length_factor=max_length_factor)
+    return mesh_snapshot.add_edges(obj, pairs), stats
 
 
 class EqualizeDistancesOperator(bpy.types.Operator):
@@ -43,68 +239,91 @@ class EqualizeDistancesOperator(bpy.types.Operator):
         default=False
     )
 
-    def execute(self, context):
-        obj = context.object
-        if not obj or obj.mode != 'EDIT':
-            self.report({'WARNING'}, "Please enter Edit Mode and select vertices.")
-            return {'CANCELLED'}
+    mode: bpy.props.EnumProperty(
+        name="Mode",
+        description="How the selected vertices are placed along the base group",
+        items=[
+            ('CLOSEST', "Closest Point", "Place every vertex relative to its closest point on the base curve"),
+            ('RELAX', "Relax Spacing", "Space the vertices evenly along the base curve and smooth their offsets"),
+        ],
+        default='CLOSEST'
+    )
 
-        bm = bmesh.from_edit_mesh(obj.data)
-        bm.verts.ensure_lookup_table()
+    smoothing: bpy.props.FloatProperty(
+        name="Smoothing",
+        description="How strongly the offsets from the curve are evened out against keeping their lengths "
+                    "(0 keeps them as they are)",
+        default=25.0,
+        min=0.0,
+        soft_max=1000.0
+    )
 
-        if "base_group" not in obj or not obj["base_group"]:
-            self.report({'WARNING'}, "No base group set. Please save a base group first.")
-            return {'CANCELLED'}
+    @instrumentation.instrumented
+    def execute(self, context):
+        import numpy as np
+        from . import base_curve, mesh_snapshot, multi_edit
 
-        selected_verts = [v for v in bm.verts if v.select]
-        if len(selected_verts) < 1:
-            self.report({'WARNING'}, "At least one vertex must be selected for the second group.")
+        objects = multi_edit.mesh_objects(context)
+        if not objects:
+            self.report({'WARNING'}, "Please select mesh objects or enter Edit Mode and select vertices.")
             return {'CANCELLED'}
 
-        group1 = [bm.verts[i] for i in obj["base_group"] if i < len(bm.verts)]
-        group2 = selected_verts
-
-        # Calculate average edge length if equalize lengths is enabled
-        average_length = None
-        if self.equalize_lengths:
-            total_length = sum(e.calc_length() for v2 in group2 for e in v2.link_edges if e.other_vert(v2) in group1)
-            edge_count = sum(1 for v2 in group2 for e in v2.link_edges if e.other_vert(v2) in group1)
-            if edge_count == 0:
-                self.report({'WARNING'}, "No connecting edges found.")
-                return {'CANCELLED'}
-            average_length = total_length / edge_count
-
-        for v2 in group2:
-            closest_base = min(group1, key=lambda bv: (v2.co - bv.co).length)
-            neighbors = [e.other_vert(closest_base) for e in closest_base.link_edges if
-                         e.other_vert(closest_base) in group1]
-
-            if not neighbors:
-                continue  # Skip if no neighbors
-
-            # Get local tangent based on one or two neighbors
-            if len(neighbors) == 1:
-                local_tangent = (closest_base.co - neighbors[0].co).normalized()
+        jobs = []
+        for obj in objects:
+            if "base_group" not in obj or not obj["base_group"]:
+                continue
+            snapshot = mesh_snapshot.get_snapshot(obj)
+            group2 = snapshot.selected_indices()
+            if len(group2):
+                group1 = np.asarray(obj["base_group"], dtype=np.int64)
+                # Полилиния базы читается из свойств объекта, поэтому в основном потоке
+                polyline = base_curve.load(obj, snapshot)
+                jobs.append((obj, snapshot, group1[group1 < snapshot.vert_count], group2, polyline))
+
+        if not jobs:
+            if not any("base_group" in obj and obj["base_group"] for obj in objects):
+                self.report({'WARNING'}, "No base group set. Please save a base group first.")
             else:
-                neighbor1, neighbor2 = neighbors[:2]
-                local_tangent = (neighbor2.co - neighbor1.co).normalized()
-
-            perpendicular = local_tangent.cross((v2.co - closest_base.co)).normalized().cross(
-                local_tangent).normalized()
-
-            # Calculate new position
-            if self.orthogonal_to_curve:
-                edge_length = average_length if self.equalize_lengths else (v2.co - closest_base.co).length
-                new_position = closest_base.co + perpendicular * edge_length * self.distance_factor
-            else:
-                direction = (v2.co - closest_base.co).normalized()
-                edge_length = average_length if self.equalize_lengths else (v2.co - closest_base.co).length
-                new_position = closest_base.co + direction * edge_length * self.distance_factor
+                self.report({'WARNING'}, "At least one vertex must be selected for the second group.")
+            return {'CANCELLED'}
 
-            v2.co = new_position  # Apply new position
+        instrumentation.note(objects=len(jobs),
+                             selected_verts=sum(len(group2) for _obj, _snapshot, _group1, group2, _polyline in jobs),
+                             base_verts=sum(len(group1) for _obj, _snapshot, group1, _group2, _polyline in jobs))
+
+        # Свойства оператора читаем до запуска потоков: RNA не потокобезопасна
+        options = (self.distance_factor, self.equalize_lengths, self.orthogonal_to_curve,
+                   self.mode, self.smoothing)
+        results = multi_edit.run_parallel(
+            equalize_selection, [(snapshot, group1, group2, polyline, *options)
+                                 for _obj, snapshot, group1, group2, polyline in jobs])
+
+        equalized = 0
+        warning = None
+        stats = []
+        for (obj, _snapshot, _group1, _group2, _polyline), result in zip(jobs, results):
+            if isinstance(result, str):
+                warning = result
+                continue
+            moved_indices, moved_coords, relaxation = result
+            if len(moved_indices):
+                mesh_snapshot.write_coords(obj, moved_indices, moved_coords)
+            if relaxation is not None:
+                stats.append(relaxation)
+            equalized += 1
+
+        if not equalized:
+            self.report({'WARNING'}, warning)
+            return {'CANCELLED'}
 
-        bmesh.update_edit_mesh(obj.data)
-        self.report({'INFO'}, "Equalized distances relative to base group.")
+        if stats:
+            residual = max(residual for residual, _seconds in stats)
+            seconds = max(seconds for _residual, seconds in stats)
+            instrumentation.note(residual=residual)
+            self.report({'INFO'}, f"Relaxed spacing on {equalized} objects in {seconds * 1000:.1f} ms "
+                                  f"(residual {residual:.2e}).")
+        else:
+            self.report({'INFO'}, f"Equalized distances relative to base group on {equalized} objects.")
         return {'FINISHED'}
 
 
@@ -114,22 +333,32 @@ class SaveBaseGroupOperator(bpy.types.Operator):
     bl_label = "Save Base Group"
     bl_options = {'REGISTER'}
 
+    @instrumentation.instrumented
     def execute(self, context):
+        from . import base_curve, mesh_snapshot
+
         obj = context.object
-        if not obj or obj.mode != 'EDIT':
+        if not obj or obj.type != 'MESH':
             self.report({'WARNING'}, "Please enter Edit Mode and select vertices.")
             return {'CANCELLED'}
 
-        bm = bmesh.from_edit_mesh(obj.data)
-        bm.verts.ensure_lookup_table()
-
-        selected_verts = [v.index for v in bm.verts if v.select]
-        if not selected_verts:
+        snapshot = mesh_snapshot.get_snapshot(obj)
+        selected_verts = snapshot.selected_indices()
+        if not len(selected_verts):
             self.report({'WARNING'}, "No vertices selected.")
             return {'CANCELLED'}
 
-        obj["base_group"] = selected_verts
-        self.report({'INFO'}, f"Saved {len(selected_verts)} vertices as base group.")
+        obj["base_group"] = selected_verts.tolist()
+        # Упорядоченная полилиния сохраняется вместе с группой
+        polyline = base_curve.save(obj, snapshot, selected_verts)
+        instrumentation.note(base_verts=len(selected_verts))
+        if polyline is None:
+            self.report({'INFO'}, f"Saved {len(selected_verts)} vertices as base group "
+                                  "(not a single chain, equalize will use closest vertices).")
+        else:
+            self.report({'INFO'}, f"Saved {len(selected_verts)} vertices as base group "
+                                  f"({'closed' if polyline.closed else 'open'} curve, "
+                                  f"length {polyline.length:.4g}).")
         return {'FINISHED'}
 
 
@@ -142,6 +371,7 @@ class EqualizeDistancesSubMenu(bpy.types.Menu):
         layout = self.layout
         layout.operator(SaveBaseGroupOperator.bl_idname, text="Save Base Group")
         layout.operator(EqualizeDistancesOperator.bl_idname, text="Equalize to Base Group")
+        layout.operator(EqualizeDistancesOperator.bl_idname, text="Relax Spacing Along Base").mode = 'RELAX'
 
 
 class JoinNearestVerticesOperator(bpy.types.Operator):
@@ -150,66 +380,102 @@ class JoinNearestVerticesOperator(bpy.types.Operator):
     bl_label = "Join Nearest Vertices"
     bl_options = {'REGISTER', 'UNDO'}
 
+    validate: bpy.props.BoolProperty(
+        name="Validate Cuts",
+        description="Skip cuts that pass through other faces or are far longer than the rest",
+        default=True
+    )
+
+    candidates: bpy.props.IntProperty(
+        name="Candidates",
+        description="Nearest vertices tried in turn when a closer cut is rejected",
+        default=4,
+        min=1,
+        max=MAX_CANDIDATES
+    )
+
+    max_length_factor: bpy.props.FloatProperty(
+        name="Max Length Factor",
+        description="Reject cuts longer than this multiple of the median nearest distance (0: no limit)",
+        default=3.0,
+        min=0.0,
+        max=100.0
+    )
+
+    @instrumentation.instrumented
     def execute(self, context):
-        obj = context.object
-        if not obj or obj.mode != 'EDIT':
-            self.report({'WARNING'}, "Please enter Edit Mode and select vertices.")
+        import bmesh
+        from . import mesh_snapshot, multi_edit
+
+        objects = multi_edit.mesh_objects(context)
+        if not objects:
+            self.report({'WARNING'}, "Please select mesh objects or enter Edit Mode and select vertices.")
             return {'CANCELLED'}
 
-        bm = bmesh.from_edit_mesh(obj.data)
-        selected_verts = [v for v in bm.verts if v.select]
+        jobs = []
+        for obj in objects:
+            snapshot = mesh_snapshot.get_snapshot(obj)
+            if len(snapshot.selected_indices()) >= 2:
+                jobs.append((obj, snapshot))
 
-        if len(selected_verts) < 2:
+        if not jobs:
             self.report({'WARNING'}, "At least two vertices must be selected.")
             return {'CANCELLED'}
 
-        groups = self.find_vertex_groups(selected_verts, bm)
-
-        if len(groups) != 2:
+        count = self.candidates if self.validate else 1
+        results = multi_edit.run_parallel(join_candidates, [(snapshot, count) for _obj, snapshot in jobs])
+        instrumentation.note(objects=len(jobs),
+                             selected_verts=sum(int(snapshot.select.sum()) for _obj, snapshot in jobs))
+
+        # Проверка по BVH читает Mesh и mathutils, поэтому идёт в основном потоке
+        joinable = []
+        totals = {}
+        for (obj, snapshot), result in zip(jobs, results):
+            if result is None:
+                continue
+            pairs, stats = pick_pairs(obj, snapshot.co, *result,
+                                      validate=self.validate, max_length_factor=self.max_length_factor)
+            joinable.append((obj, pairs.tolist()))
+            for key, value in (stats or {}).items():
+                totals[key] = totals.get(key, 0) + value
+        if not joinable:
             self.report({'WARNING'}, "Two separate groups of connected vertices are required.")
             return {'CANCELLED'}
 
-        group1, group2 = groups
-        pairs = self.find_nearest_pairs(group1, group2)
-
-        if not pairs:
-            self.report({'WARNING'}, "No nearest pairs found.")
+        pair_count = sum(len(pairs) for _obj, pairs in joinable)
+        instrumentation.note(pairs=pair_count, **totals)
+        if not pair_count:
+            self.report({'WARNING'}, "No nearest pairs found." if not totals else
+                        f"All cuts rejected ({totals['crossing']} crossing faces, {totals['too_long']} too long).")
             return {'CANCELLED'}
 
-        for v1, v2 in pairs:
-            self.create_join_cut(bm, v1, v2)
-
-        bmesh.update_edit_mesh(obj.data)
-        self.report({'INFO'}, f"Joined {len(pairs)} vertex pairs.")
+        summary = ""
+        if totals:
+            summary = (f" Rejected {totals['crossing']} cuts crossing faces and {totals['too_long']} too long; "
+                       f"{totals['fallbacks']} pairs used a farther vertex, {totals['dropped']} were skipped.")
+
+        if context.mode == 'OBJECT':
+            # В режиме объекта рёбра добавляются прямо в Mesh, без BMesh
+            added = sum(mesh_snapshot.add_edges(obj, pairs) for obj, pairs in joinable)
+            self.report({'INFO'}, f"Added {added} edges between nearest pairs on {len(joinable)} objects.{summary}")
+            return {'FINISHED'}
+
+        # vert_connect_path работает по выделению во всех объектах режима,
+        # поэтому разрезы делаются последовательно в основном потоке
+        for obj, pairs in joinable:
+            bm = bmesh.from_edit_mesh(obj.data)
+            bm.verts.ensure_lookup_table()
+            vert_pairs = [(bm.verts[i1], bm.verts[i2]) for i1, i2 in pairs]
+            for v1, v2 in vert_pairs:
+                self.create_join_cut(bm, v1, v2)
+
+            # Топология изменилась, снимок больше не соответствует мешу
+            mesh_snapshot.invalidate(obj)
+            bmesh.update_edit_mesh(obj.data)
+
+        self.report({'INFO'}, f"Joined {pair_count} vertex pairs on {len(joinable)} objects.{summary}")
         return {'FINISHED'}
 
-    def find_vertex_groups(self, verts, bm):
-        visited = set()
-        groups = []
-
-        def dfs(vertex, group):
-            stack = [vertex]
-            while stack:
-                current = stack.pop()
-                if current not in visited:
-                    visited.add(current)
-                    group.append(current)
-                    for edge in current.link_edges:
-                        neighbor = edge.other_vert(current)
-                        if neighbor in verts and neighbor not in visited:
-                            stack.append(neighbor)
-
-        for v in verts:
-            if v not in visited:
-                group = []
-                dfs(v, group)
-                groups.append(group)
-
-        return groups
-
-    def find_nearest_pairs(self, group1, group2):
-        return [(v1, min(group2, key=lambda v2: (v1.co - v2.co).length)) for v1 in group1]
-
     def create_join_cut(self, bm, v1, v2):
         """Create a join cut between two vertices"""
         bpy.ops.mesh.select_all(action='DESELECT')
@@ -224,7 +490,10 @@ class LogSelectedVerticesOperator(bpy.types.Operator):
     bl_label = "Log Selected Vertices"
     bl_options = {'REGISTER'}
 
+    @instrumentation.instrumented
     def execute(self, context):
+        import bmesh
+
         obj = context.object
         if not obj or obj.mode != 'EDIT':
             self.report({'WARNING'}, "Please enter Edit Mode and select vertices.")
@@ -265,7 +534,10 @@ class SaveSelectionOperator(bpy.types.Operator):
 
     group_index: bpy.props.IntProperty(name="Group Index", default=1, min=1, max=2)
 
+    @instrumentation.instrumented
     def execute(self, context):
+        import bmesh
+
         obj = context.object
         if not obj or obj.mode != 'EDIT':
             self.report({'WARNING'}, "Please enter Edit Mode and select vertices.")
@@ -313,43 +585,20 @@ class VertexOperationsPieMenu(bpy.types.Menu):
         pie.operator(JoinNearestVerticesOperator.bl_idname, text="Join Nearest Vertices")
         pie.menu(EqualizeDistancesSubMenu.bl_idname, text="Equalize Distances")
         pie.menu(LogVerticesSubMenu.bl_idname, text="Log Selected Vertices")
-
-
-addon_keymaps = []
-
-
-def register():
-    bpy.utils.register_class(JoinNearestVerticesOperator)
-    bpy.utils.register_class(EqualizeDistancesOperator)
-    bpy.utils.register_class(SaveBaseGroupOperator)
-    bpy.utils.register_class(EqualizeDistancesSubMenu)
-    bpy.utils.register_class(LogSelectedVerticesOperator)
-    bpy.utils.register_class(SaveSelectionOperator)
-    bpy.utils.register_class(LogVerticesSubMenu)
-    bpy.utils.register_class(VertexOperationsPieMenu)
-
-    wm = bpy.context.window_manager
-    km = wm.keyconfigs.addon.keymaps.new(name="3D View", space_type='VIEW_3D')
-    kmi = km.keymap_items.new("wm.call_menu_pie", type='J', value='PRESS', shift=True)
-    kmi.properties.name = VertexOperationsPieMenu.bl_idname
-    addon_keymaps.append((km, kmi))
-
-    print("Pie menu 'Vertex Operations' registered with hotkey Shift+J.")
-
-
-def unregister():
-    for km, kmi in addon_keymaps:
-        km.keymap_items.remove(kmi)
-    addon_keymaps.clear()
-    bpy.utils.unregister_class(JoinNearestVerticesOperator)
-    bpy.utils.unregister_class(EqualizeDistancesOperator)
-    bpy.utils.unregister_class(SaveBaseGroupOperator)
-    bpy.utils.unregister_class(EqualizeDistancesSubMenu)
-    bpy.utils.unregister_class(LogSelectedVerticesOperator)
-    bpy.utils.unregister_class(SaveSelectionOperator)
-    bpy.utils.unregister_class(LogVerticesSubMenu)
-    bpy.utils.unregister_class(VertexOperationsPieMenu)
-
-
-if __name__ == "__main__":
-    register()
+        pie.menu("VIEW3D_MT_coordinate_checkpoints_submenu", text="Checkpoints")
+
+
+classes = (
+    JoinNearestVerticesOperator,
+    EqualizeDistancesOperator,
+    SaveBaseGroupOperator,
+    EqualizeDistancesSubMenu,
+    LogSelectedVerticesOperator,
+    SaveSelectionOperator,
+    LogVerticesSubMenu,
+    VertexOperationsPieMenu,
+)
+
+keymap_items = (
+    ("wm.call_menu_pie", 'J', {'shift': True}, {'name': VertexOperationsPieMenu.bl_idname}),
+)
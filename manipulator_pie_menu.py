@@ -1,26 +1,20 @@
-bl_info = {
-    "name": "Manipulator Pie Menu with F1/F2/F3 Hotkeys",
-    "author": "Your Name",
-    "version": (1, 10),
-    "blender": (3, 6, 0),
-    "location": "Hotkey (F1/F2/F3) and Alt+Space for Pie Menu",
-    "description": "Pie Menu for toggling manipulators and F1/F2/F3 for gizmo modes",
-    "warning": "",
-    "wiki_url": "",
-    "category": "3D View",
-}
+"""Pie Menu for toggling manipulators (Alt+Space), F1/F2/F3 for gizmo modes and Alt+F1 for fast navigation."""
 
 import bpy
+from bpy.app.handlers import persistent
+
+from . import instrumentation
+from . import viewport_profiles
 
 
 class WM_OT_ToggleExclusiveGizmo(bpy.types.Operator):
     """Toggle a single gizmo and disable others"""
     bl_idname = "wm.toggle_exclusive_gizmo"
     bl_label = "Toggle Exclusive Gizmo"
-    bl_options = {'UNDO'}
 
     gizmo: bpy.props.StringProperty()
 
+    @instrumentation.instrumented
     def execute(self, context):
         space = context.space_data
 
@@ -45,6 +39,68 @@ class WM_OT_ToggleExclusiveGizmo(bpy.types.Operator):
         return {'FINISHED'}
 
 
+class WM_OT_ApplyViewportProfile(bpy.types.Operator):
+    """Apply a viewport performance profile to every 3D viewport"""
+    bl_idname = "wm.apply_viewport_profile"
+    bl_label = "Apply Viewport Profile"
+
+    profile: bpy.props.EnumProperty(
+        name="Profile",
+        items=[(name, profile["label"], profile["description"])
+               for name, profile in viewport_profiles.PROFILES.items()],
+        default='FAST'
+    )
+    toggle: bpy.props.BoolProperty(
+        name="Toggle",
+        description="Restore the previous state if this profile is already active",
+        default=False
+    )
+
+    @instrumentation.instrumented
+    def execute(self, context):
+        wm = context.window_manager
+        if self.toggle and viewport_profiles.active_profile() == self.profile:
+            spaces, scenes = viewport_profiles.restore(wm)
+            instrumentation.note(spaces=spaces, scenes=scenes)
+            self.report({'INFO'}, "Viewport state restored.")
+            return {'FINISHED'}
+
+        spaces, scenes = viewport_profiles.apply_profile(self.profile, wm, context.scene)
+        instrumentation.note(spaces=spaces, scenes=scenes)
+        label = viewport_profiles.PROFILES[self.profile]["label"]
+        self.report({'INFO'}, f"Profile '{label}' applied to {spaces} viewports.")
+        return {'FINISHED'}
+
+
+class WM_OT_RestoreViewportProfile(bpy.types.Operator):
+    """Restore the viewport state saved before the first profile was applied"""
+    bl_idname = "wm.restore_viewport_profile"
+    bl_label = "Restore Viewport State"
+
+    @classmethod
+    def poll(cls, context):
+        return viewport_profiles.active_profile() is not None
+
+    @instrumentation.instrumented
+    def execute(self, context):
+        spaces, scenes = viewport_profiles.restore(context.window_manager)
+        instrumentation.note(spaces=spaces, scenes=scenes)
+        return {'FINISHED'}
+
+
+class VIEW3D_MT_ViewportProfilesSubMenu(bpy.types.Menu):
+    """Submenu for Viewport Profiles"""
+    bl_label = "Viewport Profiles"
+    bl_idname = "VIEW3D_MT_viewport_profiles_submenu"
+
+    def draw(self, context):
+        layout = self.layout
+        for name, profile in viewport_profiles.PROFILES.items():
+            layout.operator(WM_OT_ApplyViewportProfile.bl_idname, text=profile["label"]).profile = name
+        layout.separator()
+        layout.operator(WM_OT_RestoreViewportProfile.bl_idname, text="Restore")
+
+
 class VIEW3D_MT_ManipulatorPieMenu(bpy.types.Menu):
     """Pie Menu for Manipulators"""
     bl_label = "Manipulator Pie"
@@ -82,47 +138,42 @@ class VIEW3D_MT_ManipulatorPieMenu(bpy.types.Menu):
             icon='FULLSCREEN_ENTER',
         ).gizmo = "scale"
 
+        # Профили вьюпорта (вверху слева)
+        pie.menu(VIEW3D_MT_ViewportProfilesSubMenu.bl_idname, text="Viewport Profiles", icon='PREFERENCES')
 
-addon_keymaps = []
 
+@persistent
+def _forget_profiles(_dummy):
+    # Сохранённые указатели на вьюпорты недействительны в другом файле
+    viewport_profiles.forget()
 
-def register():
-    bpy.utils.register_class(WM_OT_ToggleExclusiveGizmo)
-    bpy.utils.register_class(VIEW3D_MT_ManipulatorPieMenu)
 
-    # Добавляем горячие клавиши для 3D View (во всех режимах)
-    wm = bpy.context.window_manager
-    km = wm.keyconfigs.addon.keymaps.new(name="3D View", space_type='VIEW_3D')
+classes = (
+    WM_OT_ToggleExclusiveGizmo,
+    WM_OT_ApplyViewportProfile,
+    WM_OT_RestoreViewportProfile,
+    VIEW3D_MT_ViewportProfilesSubMenu,
+    VIEW3D_MT_ManipulatorPieMenu,
+)
 
+# Горячие клавиши для 3D View (во всех режимах)
+keymap_items = (
     # Alt+Space для вызова Pie Menu
-    kmi = km.keymap_items.new("wm.call_menu_pie", type='SPACE', value='PRESS', alt=True)
-    kmi.properties.name = "VIEW3D_MT_manipulator_pie_menu"
-
-    # F1 для Location
-    kmi1 = km.keymap_items.new("wm.toggle_exclusive_gizmo", type='F1', value='PRESS')
-    kmi1.properties.gizmo = "translate"
+    ("wm.call_menu_pie", 'SPACE', {'alt': True}, {'name': "VIEW3D_MT_manipulator_pie_menu"}),
+    # F1 для Location, F2 для Scale, F3 для Rotation
+    ("wm.toggle_exclusive_gizmo", 'F1', {}, {'gizmo': "translate"}),
+    ("wm.toggle_exclusive_gizmo", 'F2', {}, {'gizmo': "scale"}),
+    ("wm.toggle_exclusive_gizmo", 'F3', {}, {'gizmo': "rotate"}),
+    # Alt+F1 включает и выключает быструю навигацию
+    ("wm.apply_viewport_profile", 'F1', {'alt': True}, {'profile': 'FAST', 'toggle': True}),
+)
 
-    # F2 для Scale
-    kmi2 = km.keymap_items.new("wm.toggle_exclusive_gizmo", type='F2', value='PRESS')
-    kmi2.properties.gizmo = "scale"
 
-    # F3 для Rotation
-    kmi3 = km.keymap_items.new("wm.toggle_exclusive_gizmo", type='F3', value='PRESS')
-    kmi3.properties.gizmo = "rotate"
-
-    addon_keymaps.extend([kmi, kmi1, kmi2, kmi3])
-
-    print("Pie menu 'Manipulator Pie' registered with hotkey Alt+Space and F1/F2/F3 for gizmos.")
+def register():
+    bpy.app.handlers.load_pre.append(_forget_profiles)
 
 
 def unregister():
-    for km, kmi in addon_keymaps:
-        km.keymap_items.remove(kmi)
-    addon_keymaps.clear()
-
-    bpy.utils.unregister_class(WM_OT_ToggleExclusiveGizmo)
-    bpy.utils.unregister_class(VIEW3D_MT_ManipulatorPieMenu)
-
-
-if __name__ == "__main__":
-    register()
+    if _forget_profiles in bpy.app.handlers.load_pre:
+        bpy.app.handlers.load_pre.remove(_forget_profiles)
+    viewport_profiles.forget()
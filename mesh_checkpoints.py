@@ -0,0 +1,165 @@
+"""Operators and menu for lightweight vertex coordinate checkpoints."""
+
+import sys
+
+import bpy
+from bpy.app.handlers import persistent
+
+from . import instrumentation
+
+
+class SaveCoordinateCheckpointOperator(bpy.types.Operator):
+    """Save the coordinates of the selected vertices as a lightweight checkpoint"""
+    bl_idname = "mesh.save_coordinate_checkpoint"
+    bl_label = "Save Checkpoint"
+    bl_options = {'REGISTER'}
+
+    selected_only: bpy.props.BoolProperty(
+        name="Selected Only",
+        description="Store only the selected vertices instead of the whole mesh",
+        default=True
+    )
+
+    storage: bpy.props.EnumProperty(
+        name="Storage",
+        description="How the checkpoint coordinates are kept",
+        items=[
+            ('MEMORY', "Memory", "Keep raw float32 arrays in memory"),
+            ('COMPRESSED', "Compressed", "Keep zlib-compressed arrays in memory"),
+            ('MEMMAP', "Temp File", "Spill coordinates to a memory-mapped temporary file"),
+        ],
+        default='MEMORY'
+    )
+
+    @instrumentation.instrumented
+    def execute(self, context):
+        from . import checkpoint_store
+
+        obj = context.object
+        if not obj or obj.type != 'MESH':
+            self.report({'WARNING'}, "Please select a Mesh object.")
+            return {'CANCELLED'}
+
+        vert_count, indices, coords = checkpoint_store.read_coordinates(obj, self.selected_only)
+        instrumentation.note(selected_verts=len(indices))
+        if not len(indices):
+            self.report({'WARNING'}, "No vertices selected.")
+            return {'CANCELLED'}
+
+        checkpoint = checkpoint_store.CoordinateCheckpoint(vert_count, indices, coords, self.storage)
+        checkpoint_store.push_checkpoint(obj, checkpoint)
+
+        self.report({'INFO'}, f"Saved checkpoint of {checkpoint.count} vertices "
+                              f"({checkpoint.nbytes / 1024:.1f} KiB, "
+                              f"{len(checkpoint_store.get_checkpoints(obj))}/{checkpoint_store.MAX_CHECKPOINTS}).")
+        return {'FINISHED'}
+
+
+class RestoreCoordinateCheckpointOperator(bpy.types.Operator):
+    """Restore vertex coordinates from the latest checkpoint"""
+    bl_idname = "mesh.restore_coordinate_checkpoint"
+    bl_label = "Restore Checkpoint"
+    bl_options = {'REGISTER'}
+
+    keep: bpy.props.BoolProperty(
+        name="Keep Checkpoint",
+        description="Keep the checkpoint in the ring after restoring it",
+        default=False
+    )
+
+    @instrumentation.instrumented
+    def execute(self, context):
+        import bmesh
+        from . import checkpoint_store
+
+        obj = context.object
+        if not obj or obj.type != 'MESH':
+            self.report({'WARNING'}, "Please select a Mesh object.")
+            return {'CANCELLED'}
+
+        ring = checkpoint_store.get_checkpoints(obj)
+        if not ring:
+            self.report({'WARNING'}, "No checkpoints saved for this object.")
+            return {'CANCELLED'}
+
+        checkpoint = ring[-1]
+        vert_count = len(bmesh.from_edit_mesh(obj.data).verts) if obj.mode == 'EDIT' else len(obj.data.vertices)
+        if vert_count != checkpoint.vert_count:
+            self.report({'WARNING'}, "Mesh topology changed since the checkpoint was saved.")
+            return {'CANCELLED'}
+
+        instrumentation.note(selected_verts=checkpoint.count)
+        checkpoint_store.write_coordinates(obj, checkpoint.indices(), checkpoint.coords())
+
+        if not self.keep:
+            ring.pop().release()
+
+        self.report({'INFO'}, f"Restored {checkpoint.count} vertices from checkpoint.")
+        return {'FINISHED'}
+
+
+class ClearCoordinateCheckpointsOperator(bpy.types.Operator):
+    """Remove all checkpoints of the active object"""
+    bl_idname = "mesh.clear_coordinate_checkpoints"
+    bl_label = "Clear Checkpoints"
+    bl_options = {'REGISTER'}
+
+    @instrumentation.instrumented
+    def execute(self, context):
+        from . import checkpoint_store
+
+        obj = context.object
+        if not obj:
+            self.report({'WARNING'}, "No active object.")
+            return {'CANCELLED'}
+
+        checkpoint_store.clear_checkpoints(obj)
+        self.report({'INFO'}, "Cleared checkpoints.")
+        return {'FINISHED'}
+
+
+class CoordinateCheckpointsSubMenu(bpy.types.Menu):
+    """Submenu for Coordinate Checkpoints"""
+    bl_label = "Checkpoints"
+    bl_idname = "VIEW3D_MT_coordinate_checkpoints_submenu"
+
+    def draw(self, context):
+        layout = self.layout
+        layout.operator(SaveCoordinateCheckpointOperator.bl_idname, text="Save Checkpoint")
+        layout.operator(SaveCoordinateCheckpointOperator.bl_idname,
+                        text="Save Checkpoint (Compressed)").storage = 'COMPRESSED'
+        layout.operator(RestoreCoordinateCheckpointOperator.bl_idname, text="Restore Checkpoint")
+        layout.operator(ClearCoordinateCheckpointsOperator.bl_idname, text="Clear Checkpoints")
+
+
+classes = (
+    SaveCoordinateCheckpointOperator,
+    RestoreCoordinateCheckpointOperator,
+    ClearCoordinateCheckpointsOperator,
+    CoordinateCheckpointsSubMenu,
+)
+
+keymap_items = ()
+
+
+def _clear_checkpoints():
+    # Хранилище загружается только при первом сохранении чекпоинта
+    checkpoint_store = sys.modules.get(f"{__package__}.checkpoint_store")
+    if checkpoint_store:
+        checkpoint_store.clear_checkpoints()
+
+
+@persistent
+def _on_load_pre(_dummy):
+    # Кольца ключены по имени объекта, а в другом файле под тем же именем другой меш
+    _clear_checkpoints()
+
+
+def register():
+    bpy.app.handlers.load_pre.append(_on_load_pre)
+
+
+def unregister():
+    if _on_load_pre in bpy.app.handlers.load_pre:
+        bpy.app.handlers.load_pre.remove(_on_load_pre)
+    _clear_checkpoints()
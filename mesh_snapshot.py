@@ -0,0 +1,433 @@
+"""Cached NumPy snapshots of edit meshes shared by the vertex tools.
+
+A snapshot holds vertex coordinates, the selection mask, the edge list and a
+CSR vertex adjacency of a mesh object, plus derived structures (selected
+connected components, KD-trees) built on first use. Snapshots are cached
+per object and stay valid until a depsgraph update touches the object or
+its mesh (or an undo step or another file is loaded), so back-to-back
+operators on the same mesh extract the data only once. The cache is bounded by ``MEMORY_BUDGET`` and evicts the least
+recently used snapshots first; ``stats`` counts hits and misses.
+"""
+
+import threading
+import zlib
+from collections import OrderedDict
+
+import bpy
+import numpy as np
+from bpy.app.handlers import persistent
+
+from .geometry_kernels import KDTree, build_adjacency, connected_components, selection_frame
+
+MEMORY_BUDGET = 512 * 2 ** 20
+
+# Кэш снимков по имени объекта (от давно использованных к недавним) и счётчики обновлений по ключу ID
+_snapshots = OrderedDict()
+# Производные структуры строятся и в потоках пула, вытеснение идёт под замком
+_lock = threading.Lock()
+_update_counters = {}
+# ID, чьё обновление в ближайшем проходе depsgraph вызвано нашей же записью координат
+_pending_writes = set()
+# Номер шага отмены: повтор оператора из панели Redo откатывает меш без прохода depsgraph
+_undo_generation = 0
+
+stats = {"hits": 0, "misses": 0, "prefetched": 0, "evictions": 0, "derived_hits": 0, "derived_misses": 0}
+
+
+class MeshSnapshot:
+    """Array view of a mesh: coordinates, selection and CSR vertex adjacency.
+
+    ``normals`` is None unless requested from ``get_snapshot``; it then holds
+    the face selection, face normals, face areas and vertex normals read in
+    the same pass as the coordinates.
+    """
+
+    def __init__(self, co, select, edges, version, normals=None):
+        self.co = co
+        self.select = select
+        self.edges = edges
+        self.version = version
+        self.normals = normals
+        self.adjacency_indptr, self.adjacency_indices = build_adjacency(edges, len(co))
+        # Производные структуры по ключу: (значение, размер в байтах)
+        self._derived = {}
+
+    @property
+    def vert_count(self):
+        return len(self.co)
+
+    @property
+    def nbytes(self):
+        arrays = (self.co, self.select, self.edges, self.adjacency_indptr, self.adjacency_indices,
+                  *(self.normals or ()))
+        return sum(array.nbytes for array in arrays) + sum(size for _value, size in self._derived.values())
+
+    def _derived_value(self, key, build, size, count):
+        entry = self._derived.get(key)
+        if entry is not None:
+            if count:
+                stats["derived_hits"] += 1
+            return entry[0]
+        if count:
+            stats["derived_misses"] += 1
+        value = build()
+        # Вытеснение обходит _derived всех снимков под замком, поэтому и вставка под ним
+        with _lock:
+            self._derived[key] = (value, size(value))
+        _enforce_budget()
+        return value
+
+    def selected_indices(self, count=True):
+        """Indices of the selected vertices; the array is shared, do not modify it."""
+        return self._derived_value("selected", lambda: np.flatnonzero(self.select),
+                                   lambda value: value.nbytes, count)
+
+    def components(self, count=True):
+        """Connected components of the selection, computed once per snapshot."""
+        return self._derived_value("components", lambda: connected_components(self.edges, self.select),
+                                   lambda value: sum(members.nbytes for members in value), count)
+
+    def kd_tree(self, indices, count=True):
+        """KD-tree over the coordinates of the given vertices, built once per snapshot and index set."""
+        indices = np.ascontiguousarray(indices, dtype=np.int64)
+        key = ("tree", len(indices), zlib.crc32(indices.tobytes()))
+        # Дерево держит точки, их копию в порядке дерева, порядок и границы узлов
+        return self._derived_value(key, lambda: KDTree(self.co[indices]), lambda _value: 7 * 8 * len(indices), count)
+
+    def selection_frame(self, count=True):
+        """Local frame of the selected faces, or of the selected vertices without faces, or None.
+
+        The snapshot must have been read with normals.
+        """
+        def build():
+            face_select, face_normals, face_areas, vert_normals = self.normals
+            if face_select.any():
+                normals, weights = face_normals[face_select], face_areas[face_select]
+            else:
+                normals = vert_normals[self.select]
+                weights = np.ones(len(normals))
+            return selection_frame(normals, weights, self.co[self.select].astype(np.float64))
+        return self._derived_value("frame", build, lambda _value: 9 * 8, count)
+
+    def coords_changed(self):
+        """Drop the structures built from coordinates after the coordinates were patched."""
+        with _lock:
+            # Нормали и кадр выделения тоже устарели, их перечитают при следующем запросе
+            self.normals = None
+            for key in [key for key in self._derived if key == "frame" or isinstance(key, tuple) and key[0] == "tree"]:
+                del self._derived[key]
+
+    def neighbors(self, index):
+        """Indices of the vertices sharing an edge with the given vertex."""
+        return self.adjacency_indices[self.adjacency_indptr[index]:self.adjacency_indptr[index + 1]]
+
+
+def _id_key(id_data):
+    # Объект и меш часто называются одинаково, поэтому ключ включает тип ID
+    return ('OBJECT' if isinstance(id_data, bpy.types.Object) else 'MESH'), id_data.name
+
+
+def _version(obj):
+    return _undo_generation, _update_counters.get(_id_key(obj), 0), _update_counters.get(_id_key(obj.data), 0)
+
+
+def sync_from_editmode(obj):
+    """Copy the edit-mesh of an object to its Mesh data, so it can be read with ``foreach_get``.
+
+    The sync itself tags the object as updated; that update is absorbed, so
+    it does not make the object's snapshot stale.
+    """
+    obj.update_from_editmode()
+    _pending_writes.add(_id_key(obj))
+
+
+def _read_normals(mesh):
+    """Face selection, face normals, face areas and vertex normals of a Mesh, read in bulk."""
+    face_count = len(mesh.polygons)
+    face_select = np.empty(face_count, dtype=bool)
+    mesh.polygons.foreach_get("select", face_select)
+    face_normals = np.empty(face_count * 3, dtype=np.float64)
+    mesh.polygons.foreach_get("normal", face_normals)
+    face_areas = np.empty(face_count, dtype=np.float64)
+    mesh.polygons.foreach_get("area", face_areas)
+    vert_normals = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+    mesh.vertices.foreach_get("normal", vert_normals)
+    return face_select, face_normals.reshape(-1, 3), face_areas, vert_normals.reshape(-1, 3)
+
+
+def _extract(obj, normals=False):
+    """Read coordinates, selection, edges and optionally normals of a mesh object in bulk."""
+    if obj.mode == 'EDIT':
+        sync_from_editmode(obj)
+    mesh = obj.data
+    vert_count = len(mesh.vertices)
+
+    co = np.empty(vert_count * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+
+    select = np.empty(vert_count, dtype=bool)
+    mesh.vertices.foreach_get("select", select)
+
+    edges = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edges)
+
+    return co.reshape(-1, 3), select, edges.reshape(-1, 2), _read_normals(mesh) if normals else None
+
+
+def read_faces(obj):
+    """Corner offsets, corner counts and corner vertices of every face, read in bulk from the Mesh.
+
+    In edit mode the Mesh was synced with the edit-mesh when the snapshot
+    was extracted, and any later edit makes the snapshot stale.
+    """
+    mesh = obj.data
+    loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    corner_verts = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", corner_verts)
+    return loop_starts, loop_totals, corner_verts
+
+
+def get_snapshot(obj, prefetch=False, normals=False):
+    """Return the cached snapshot of a mesh object, re-extracting it when stale.
+
+    ``prefetch`` marks idle-time warm-up calls, which are counted apart from
+    the operators' hits and misses. With ``normals`` the snapshot also
+    carries ``MeshSnapshot.normals``, read after the same edit-mesh sync as
+    the coordinates; a valid snapshot without them syncs once to add them.
+    """
+    _ensure_handler()
+    version = _version(obj)
+    with _lock:
+        snapshot = _snapshots.get(obj.name)
+        if snapshot is not None and snapshot.version == version:
+            _snapshots.move_to_end(obj.name)
+            if not prefetch:
+                stats["hits"] += 1
+        else:
+            snapshot = None
+    if snapshot is not None:
+        if normals and snapshot.normals is None:
+            # После записи через bmesh Mesh отстаёт от edit-mesh, нормали читаются после синхронизации
+            if obj.mode == 'EDIT':
+                sync_from_editmode(obj)
+            snapshot.normals = _read_normals(obj.data)
+            _enforce_budget()
+        return snapshot
+
+    stats["prefetched" if prefetch else "misses"] += 1
+    co, select, edges, mesh_normals = _extract(obj, normals)
+    snapshot = MeshSnapshot(co, select, edges, version, mesh_normals)
+    with _lock:
+        _snapshots[obj.name] = snapshot
+        _snapshots.move_to_end(obj.name)
+    _enforce_budget()
+    return snapshot
+
+
+def cached_snapshot(obj):
+    """The cached snapshot of a mesh object while it is still valid, else None; never extracts."""
+    version = _version(obj)
+    with _lock:
+        snapshot = _snapshots.get(obj.name)
+    if snapshot is None or snapshot.version != version:
+        return None
+    return snapshot
+
+
+def memory_usage():
+    with _lock:
+        return sum(snapshot.nbytes for snapshot in _snapshots.values())
+
+
+def _enforce_budget():
+    """Evict the least recently used snapshots until the cache fits ``MEMORY_BUDGET``.
+
+    The most recent snapshot always stays, even when it alone is larger.
+    """
+    with _lock:
+        total = sum(snapshot.nbytes for snapshot in _snapshots.values())
+        while total > MEMORY_BUDGET and len(_snapshots) > 1:
+            _name, snapshot = _snapshots.popitem(last=False)
+            total -= snapshot.nbytes
+            stats["evictions"] += 1
+
+
+def invalidate(obj=None):
+    """Drop the cached snapshot of one object, or of every object when none is given."""
+    with _lock:
+        if obj is None:
+            _snapshots.clear()
+        else:
+            _snapshots.pop(obj.name, None)
+
+
+def apply_coords(obj, bm, indices, coords):
+    """Write coordinates to the edit bmesh and keep the cached snapshot in sync.
+
+    The depsgraph update caused by this write is absorbed, so the snapshot
+    stays valid for the next operator instead of being extracted again. Only
+    the next depsgraph pass is absorbed, and undo or redo (including a redo
+    panel re-run, which skips the depsgraph) drops every snapshot.
+    """
+    bm.verts.ensure_lookup_table()
+    verts = bm.verts
+    for index, co in zip(np.asarray(indices).tolist(), np.asarray(coords).tolist()):
+        verts[index].co = co
+
+    snapshot = _snapshots.get(obj.name)
+    if snapshot is not None and snapshot.version == _version(obj):
+        snapshot.co[indices] = coords
+        snapshot.coords_changed()
+        _pending_writes.update((_id_key(obj), _id_key(obj.data)))
+
+
+def write_coords(obj, indices, coords):
+    """Write coordinates with a single mesh update in either edit or object mode.
+
+    In edit mode this goes through the edit bmesh; in object mode the
+    coordinates are written to the Mesh with ``foreach_set``, so a heavy
+    mesh is never converted to BMesh.
+    """
+    if obj.mode == 'EDIT':
+        import bmesh
+
+        apply_coords(obj, bmesh.from_edit_mesh(obj.data), indices, coords)
+        bmesh.update_edit_mesh(obj.data)
+        return
+
+    mesh = obj.data
+    snapshot = _snapshots.get(obj.name)
+    if snapshot is not None and snapshot.version == _version(obj):
+        co = snapshot.co
+        snapshot.coords_changed()
+        _pending_writes.update((_id_key(obj), _id_key(obj.data)))
+    else:
+        co = np.empty((len(mesh.vertices), 3), dtype=np.float32)
+        mesh.vertices.foreach_get("co", co.ravel())
+    co[indices] = coords
+    mesh.vertices.foreach_set("co", co.ravel())
+    mesh.update()
+
+
+def write_and_weld(obj, indices, coords, sources, targets):
+    """Write coordinates and weld every source vertex into its target in one BMesh pass.
+
+    A single ``weld_verts`` call takes the target map of all clusters. In
+    object mode the Mesh goes through a temporary BMesh. Returns the
+    number of vertices removed; the cached snapshot is dropped since the
+    topology changed.
+    """
+    import bmesh
+
+    editing = obj.mode == 'EDIT'
+    if editing:
+        bm = bmesh.from_edit_mesh(obj.data)
+    else:
+        bm = bmesh.new()
+        bm.from_mesh(obj.data)
+    try:
+        bm.verts.ensure_lookup_table()
+        verts = bm.verts
+        for index, co in zip(np.asarray(indices).tolist(), np.asarray(coords).tolist()):
+            verts[index].co = co
+        targetmap = {verts[source]: verts[target]
+                     for source, target in zip(np.asarray(sources).tolist(), np.asarray(targets).tolist())}
+        bmesh.ops.weld_verts(bm, targetmap=targetmap)
+        if editing:
+            bmesh.update_edit_mesh(obj.data)
+        else:
+            bm.to_mesh(obj.data)
+            obj.data.update()
+    finally:
+        if not editing:
+            bm.free()
+    invalidate(obj)
+    return len(targetmap)
+
+
+def add_edges(obj, pairs):
+    """Add an edge for every vertex pair not yet joined, straight on the Mesh data.
+
+    Object mode only. Returns the number of edges added; the cached
+    snapshot is dropped since the topology changed.
+    """
+    if obj.mode == 'EDIT':
+        raise ValueError("Edges can only be added to the Mesh data outside Edit Mode.")
+    mesh = obj.data
+    pairs = np.sort(np.asarray(pairs, dtype=np.int64).reshape(-1, 2), axis=1)
+    edges = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edges)
+    edges = np.sort(edges.reshape(-1, 2).astype(np.int64), axis=1)
+
+    vert_count = len(mesh.vertices)
+    existing = edges[:, 0] * vert_count + edges[:, 1]
+    keys, first = np.unique(pairs[:, 0] * vert_count + pairs[:, 1], return_index=True)
+    pairs = pairs[first[~np.isin(keys, existing)]]
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    if not len(pairs):
+        return 0
+
+    mesh.edges.add(len(pairs))
+    mesh.edges.foreach_set("vertices", np.vstack((edges, pairs)).astype(np.int32).ravel())
+    mesh.update()
+    invalidate(obj)
+    return len(pairs)
+
+
+def _on_depsgraph_update(scene, depsgraph):
+    for update in depsgraph.updates:
+        id_data = update.id.original if update.id else None
+        if not isinstance(id_data, (bpy.types.Object, bpy.types.Mesh)):
+            continue
+        key = _id_key(id_data)
+        if key in _pending_writes:
+            continue
+        _update_counters[key] = _update_counters.get(key, 0) + 1
+    # Поглощается только ближайший проход: не дошедшая до него запись не должна
+    # съесть настоящую правку, пришедшую позже
+    _pending_writes.clear()
+
+
+@persistent
+def _on_undo(*_args):
+    # Отмена и повтор подменяют меш без обновления depsgraph, все снимки и версии устаревают
+    global _undo_generation
+    _undo_generation += 1
+    invalidate()
+    _pending_writes.clear()
+
+
+@persistent
+def _on_load_pre(_dummy):
+    # Кэш и счётчики ключены по именам, а в новом файле те же имена у других объектов
+    invalidate()
+    _update_counters.clear()
+    _pending_writes.clear()
+
+
+def _handlers():
+    handlers = bpy.app.handlers
+    return ((handlers.depsgraph_update_post, _on_depsgraph_update),
+            (handlers.load_pre, _on_load_pre),
+            (handlers.undo_pre, _on_undo),
+            (handlers.undo_post, _on_undo),
+            (handlers.redo_post, _on_undo))
+
+
+def _ensure_handler():
+    # Обработчики ставятся при первом снимке, а не при регистрации аддона
+    for handlers, handler in _handlers():
+        if handler not in handlers:
+            handlers.append(handler)
+
+
+def unregister():
+    for handlers, handler in _handlers():
+        if handler in handlers:
+            handlers.remove(handler)
+    invalidate()
+    _update_counters.clear()
+    _pending_writes.clear()
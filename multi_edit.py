@@ -0,0 +1,62 @@
+"""Helpers for running the vertex tools over every object in multi-object edit mode.
+
+In object mode the tools run on the selected mesh objects instead, reading
+and writing Mesh data directly.
+
+Array extraction and write-back stay on the main thread, since ``bpy`` is
+not thread safe. The NumPy kernels in between run in a thread pool, where
+NumPy releases the GIL on large arrays.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+def edit_mesh_objects(context):
+    """Mesh objects in edit mode, one per mesh, the active object first."""
+    objects = [obj for obj in getattr(context, "objects_in_mode", ()) if obj.type == 'MESH']
+    active = context.object
+    if active is not None and active.type == 'MESH' and active.mode == 'EDIT' and active not in objects:
+        objects.insert(0, active)
+    elif active in objects:
+        objects.remove(active)
+        objects.insert(0, active)
+
+    # Связанные дубликаты редактируют один и тот же меш
+    seen = set()
+    unique = []
+    for obj in objects:
+        if obj.data.name not in seen:
+            seen.add(obj.data.name)
+            unique.append(obj)
+    return unique
+
+
+def mesh_objects(context):
+    """Objects the vertex tools act on: every mesh in edit mode, else the selected meshes."""
+    if context.mode == 'EDIT_MESH':
+        return edit_mesh_objects(context)
+    if context.mode != 'OBJECT':
+        return []
+
+    active = context.object
+    objects = [obj for obj in context.selected_objects if obj.type == 'MESH']
+    if active in objects:
+        objects.remove(active)
+        objects.insert(0, active)
+    seen = set()
+    unique = []
+    for obj in objects:
+        if obj.data.name not in seen and obj.data.library is None:
+            seen.add(obj.data.name)
+            unique.append(obj)
+    return unique
+
+
+def run_parallel(func, jobs):
+    """Call ``func(*job)`` for every job, concurrently when there is more than one."""
+    jobs = list(jobs)
+    if len(jobs) < 2:
+        return [func(*job) for job in jobs]
+    with ThreadPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as pool:
+        return list(pool.map(lambda job: func(*job), jobs))
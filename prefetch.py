@@ -0,0 +1,182 @@
+"""Warm the vertex tools' caches in idle time after the selection changes.
+
+A depsgraph handler only notes that an edit mesh or the object selection
+changed. A debounced timer then builds, for the objects the Shift+J and
+Shift+X pies would act on, the mesh snapshot, the selected connected
+components with the KD-tree Join Nearest Vertices queries, and the saved
+base polyline, so the operators start from a warm cache. Edit meshes are
+never synced for a warm-up, since ``update_from_editmode`` re-evaluates
+the modifier stack and GPU batches; they only get the structures built on
+a snapshot that is still valid. Memory stays within
+``mesh_snapshot.MEMORY_BUDGET`` through its LRU eviction; hit and miss
+counts are shown in View3D > Sidebar > Stats.
+"""
+
+import time
+
+import bpy
+from bpy.app.handlers import persistent
+
+# Пауза после последнего изменения, чтобы не строить структуры посреди серии кликов
+DEBOUNCE_S = 0.3
+# Время на один тик таймера; остальные объекты прогреваются в следующих тиках
+TICK_BUDGET_S = 0.05
+MAX_OBJECTS = 8
+# Один прогрев не делится между тиками: извлечение меша и построение
+# структур крупнее этого заняли бы больше TICK_BUDGET_S
+MAX_VERTS = 100_000
+
+_last_change = 0.0
+_queue = []
+stats = {"runs": 0, "warmed": 0, "skipped": 0}
+
+
+def _enabled():
+    return getattr(bpy.context.window_manager, "vertex_tools_prefetch", False)
+
+
+def _busy():
+    # Во время модальных операторов (перемещение, нож) меш меняется непрерывно
+    return any(getattr(window, "modal_operators", ()) for window in bpy.context.window_manager.windows)
+
+
+def _targets():
+    """Mesh objects the vertex tools would act on: the edit meshes, else the selected meshes."""
+    view_layer = bpy.context.view_layer
+    active = view_layer.objects.active
+    editing = active is not None and active.mode == 'EDIT'
+    objects = [obj for obj in view_layer.objects.selected
+               if obj.type == 'MESH' and (obj.mode == 'EDIT') == editing]
+    if editing and active.type == 'MESH' and active not in objects:
+        objects.insert(0, active)
+    return [obj.name for obj in objects[:MAX_OBJECTS]]
+
+
+def warm(obj):
+    """Build everything the vertex tools need for one object, unless it is already cached.
+
+    Nothing is written to Blender data, so the warm-up needs no undo step.
+    Returns False for an edit mesh without a valid snapshot, which would
+    need a full sync.
+    """
+    from . import base_curve, mesh_snapshot
+
+    if obj.mode == 'EDIT':
+        snapshot = mesh_snapshot.cached_snapshot(obj)
+        if snapshot is None:
+            return False
+    else:
+        snapshot = mesh_snapshot.get_snapshot(obj, prefetch=True)
+    if len(snapshot.selected_indices(count=False)):
+        groups = snapshot.components(count=False)
+        if len(groups) == 2:
+            snapshot.kd_tree(groups[1], count=False)
+    if obj.get("base_group"):
+        # Устаревший порядок пересохранит сам оператор, под undo
+        polyline = base_curve.load_stored(obj, snapshot)
+        if polyline is not None:
+            # Первая проекция строит KD-дерево полилинии
+            polyline.project(polyline.points[:1])
+    return True
+
+
+def _warm_pending():
+    remaining = _last_change + DEBOUNCE_S - time.monotonic()
+    if remaining > 0:
+        return remaining
+    if not _enabled():
+        _queue.clear()
+        return None
+    if _busy():
+        return DEBOUNCE_S
+
+    if not _queue:
+        stats["runs"] += 1
+        _queue.extend(_targets())
+    start = time.perf_counter()
+    while _queue and time.perf_counter() - start < TICK_BUDGET_S:
+        obj = bpy.data.objects.get(_queue.pop(0))
+        if obj is None or obj.type != 'MESH':
+            continue
+        if len(obj.data.vertices) > MAX_VERTS or not warm(obj):
+            stats["skipped"] += 1
+            continue
+        stats["warmed"] += 1
+    return 0.0 if _queue else None
+
+
+@persistent
+def _on_depsgraph_update(scene, depsgraph):
+    global _last_change
+    # Выделение в режиме редактирования обновляет меш, выделение объектов - сцену
+    if not any(isinstance(update.id, (bpy.types.Mesh, bpy.types.Scene)) for update in depsgraph.updates):
+        return
+    if not _enabled():
+        return
+    _last_change = time.monotonic()
+    if not bpy.app.timers.is_registered(_warm_pending):
+        bpy.app.timers.register(_warm_pending, first_interval=DEBOUNCE_S)
+
+
+@persistent
+def _on_load_pre(_dummy):
+    _queue.clear()
+
+
+class VIEW3D_PT_PrefetchStats(bpy.types.Panel):
+    """Panel with the vertex tools' cache counters"""
+    bl_label = "Vertex Tools Cache"
+    bl_idname = "VIEW3D_PT_prefetch_stats"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "Stats"
+
+    def draw(self, context):
+        import sys
+
+        layout = self.layout
+        layout.prop(context.window_manager, "vertex_tools_prefetch")
+
+        # Без снимков модуль кэша ещё не загружен, numpy ради панели не импортируем
+        mesh_snapshot = sys.modules.get(f"{__package__}.mesh_snapshot")
+        if mesh_snapshot is None:
+            layout.label(text="Cache is empty.")
+            return
+        counters = mesh_snapshot.stats
+        lookups = counters["hits"] + counters["misses"]
+        hit_rate = f"{counters['hits'] / lookups:.0%}" if lookups else "-"
+        layout.label(text=f"Snapshots: {counters['hits']} hits, {counters['misses']} misses ({hit_rate})")
+        layout.label(text=f"Structures: {counters['derived_hits']} hits, {counters['derived_misses']} misses")
+        layout.label(text=f"Prefetched {counters['prefetched']} in {stats['runs']} runs, "
+                          f"skipped {stats['skipped']}, evicted {counters['evictions']}")
+        layout.label(text=f"Memory {mesh_snapshot.memory_usage() / 2 ** 20:.1f} / "
+                          f"{mesh_snapshot.MEMORY_BUDGET / 2 ** 20:.0f} MB")
+
+
+classes = (
+    VIEW3D_PT_PrefetchStats,
+)
+
+keymap_items = ()
+
+
+def register():
+    bpy.types.WindowManager.vertex_tools_prefetch = bpy.props.BoolProperty(
+        name="Prefetch on Selection Change",
+        description="Build the vertex tools' mesh snapshots, components and KD-trees in idle time "
+                    "after the selection changes",
+        default=True
+    )
+    bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+    bpy.app.handlers.load_pre.append(_on_load_pre)
+
+
+def unregister():
+    for handlers, handler in ((bpy.app.handlers.depsgraph_update_post, _on_depsgraph_update),
+                              (bpy.app.handlers.load_pre, _on_load_pre)):
+        if handler in handlers:
+            handlers.remove(handler)
+    if bpy.app.timers.is_registered(_warm_pending):
+        bpy.app.timers.unregister(_warm_pending)
+    _queue.clear()
+    del bpy.types.WindowManager.vertex_tools_prefetch
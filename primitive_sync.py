@@ -0,0 +1,123 @@
+"""Keep generated primitive node groups in sync with their source meshes.
+
+Objects that got a generator node group are tracked by name. A depsgraph
+handler only marks tracked objects whose geometry or transform changed as
+dirty; a throttled timer then re-fits the dirty objects in batches, so a
+burst of edits costs one re-fit per object and untouched objects are never
+scanned. A re-fit is skipped while the source fingerprint stored on the
+modifier's node group still matches. Objects in edit mode stay dirty and
+are retried once they leave it.
+
+The timer runs outside any operator, so a batch that changed node groups
+pushes its own undo step. When no undo step can be pushed (no window, e.g.
+in background mode) the changes join the next undo step of the user.
+"""
+
+import logging
+
+import bpy
+from bpy.app.handlers import persistent
+
+# Пауза перед пересчётом, чтобы слить серию правок в один проход
+THROTTLE_S = 0.25
+MAX_PER_TICK = 64
+
+_tracked = set()
+_dirty = set()
+stats = {"batches": 0, "checked": 0, "refits": 0, "failures": 0}
+log = logging.getLogger(__name__)
+
+
+def track(obj):
+    _tracked.add(obj.name)
+
+
+def rescan():
+    """Rebuild the tracked set from the node groups present in the file."""
+    from .geometry_nodes_tools import has_generated_nodes
+
+    _tracked.clear()
+    _dirty.clear()
+    _tracked.update(obj.name for obj in bpy.data.objects if obj.type == 'MESH' and has_generated_nodes(obj))
+
+
+def _flush():
+    from .geometry_nodes_tools import resync_primitive_nodes
+
+    stats["batches"] += 1
+    refits = 0
+    checked = 0
+    for name in list(_dirty):
+        if checked == MAX_PER_TICK:
+            break
+        obj = bpy.data.objects.get(name)
+        if obj is None:
+            _dirty.discard(name)
+            _tracked.discard(name)
+            continue
+        # В режиме редактирования меш обновится только при выходе из него, до тех пор объект ждёт
+        if obj.mode == 'EDIT':
+            continue
+        _dirty.discard(name)
+        checked += 1
+        try:
+            if resync_primitive_nodes(obj):
+                refits += 1
+        except ValueError as error:
+            stats["failures"] += 1
+            log.warning("Re-sync of '%s' failed: %s", name, error)
+
+    stats["checked"] += checked
+    stats["refits"] += refits
+    if refits and bpy.ops.ed.undo_push.poll():
+        bpy.ops.ed.undo_push(message="Re-sync Primitive Nodes")
+    return THROTTLE_S if _dirty else None
+
+
+@persistent
+def _on_depsgraph_update(scene, depsgraph):
+    if not _tracked:
+        return
+    for update in depsgraph.updates:
+        # Масштаб входит в отпечаток источника, поэтому важны и трансформации
+        if not (update.is_updated_geometry or update.is_updated_transform):
+            continue
+        id_data = update.id.original
+        if isinstance(id_data, bpy.types.Object) and id_data.name in _tracked:
+            _dirty.add(id_data.name)
+    if _dirty and not bpy.app.timers.is_registered(_flush):
+        bpy.app.timers.register(_flush, first_interval=THROTTLE_S)
+
+
+@persistent
+def _on_load_post(_dummy):
+    rescan()
+
+
+def _initial_scan():
+    # Во время регистрации аддона bpy.data недоступен
+    rescan()
+    return None
+
+
+classes = ()
+
+keymap_items = ()
+
+
+def register():
+    bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+    bpy.app.handlers.load_post.append(_on_load_post)
+    bpy.app.timers.register(_initial_scan, first_interval=0.0)
+
+
+def unregister():
+    for handlers, handler in ((bpy.app.handlers.depsgraph_update_post, _on_depsgraph_update),
+                              (bpy.app.handlers.load_post, _on_load_post)):
+        if handler in handlers:
+            handlers.remove(handler)
+    for timer in (_flush, _initial_scan):
+        if bpy.app.timers.is_registered(timer):
+            bpy.app.timers.unregister(timer)
+    _tracked.clear()
+    _dirty.clear()
@@ -0,0 +1,103 @@
+"""Run the headless Geometry Nodes generator over a directory of .blend files.
+
+Plain ``python``, no Blender modules needed; every file is handled by its own
+background Blender process, several at a time:
+
+    python scripts/batch_generate_nodes.py assets/ --jobs 8 --output batch.json
+
+Background mode needs neither a display nor a GPU, so this runs on a bare
+Linux box. Per-file summaries land next to each file; ``--output`` collects
+them together with the wall time of every Blender process.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "generate_nodes_headless.py")
+
+
+def find_blend_files(directory, recursive):
+    if not recursive:
+        return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".blend"))
+    found = []
+    for root, _dirs, names in os.walk(directory):
+        found.extend(os.path.join(root, name) for name in names if name.endswith(".blend"))
+    return sorted(found)
+
+
+def run_file(blender, path, extra_args, timeout):
+    """Process one file in a background Blender; return its summary with timing."""
+    summary_path = os.path.splitext(path)[0] + ".nodes.json"
+    command = [
+        blender, "-b", "--factory-startup", "-noaudio", path,
+        "--python-exit-code", "1",
+        "--python", SCRIPT, "--", "--summary", summary_path, *extra_args,
+    ]
+    start = time.perf_counter()
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+        returncode, output = completed.returncode, completed.stdout + completed.stderr
+    except subprocess.TimeoutExpired:
+        returncode, output = None, f"timed out after {timeout}s"
+    elapsed = time.perf_counter() - start
+
+    result = {"file": path, "wall_s": elapsed, "returncode": returncode}
+    if returncode == 0 and os.path.exists(summary_path):
+        with open(summary_path) as f:
+            result["summary"] = json.load(f)
+    else:
+        result["log"] = output[-4000:]
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", help="directory with .blend files")
+    parser.add_argument("--blender", default=os.environ.get("BLENDER", "blender"), help="Blender executable")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Blender processes at a time")
+    parser.add_argument("--recursive", action="store_true", help="also look in subdirectories")
+    parser.add_argument("--timeout", type=float, default=600, help="seconds before a file is given up on")
+    parser.add_argument("--kinds", default="SPHERE,CYLINDER", help="comma separated primitive kinds to build")
+    parser.add_argument("--robust", action="store_true", help="fit meshes that are not exact primitives by RANSAC")
+    parser.add_argument("--no-save", action="store_true", help="only write the summaries")
+    parser.add_argument("--output", help="write all results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    files = find_blend_files(args.directory, args.recursive)
+    if not files:
+        print(f"No .blend files in {args.directory}")
+        return 1
+
+    extra_args = ["--kinds", args.kinds]
+    extra_args += ["--robust"] if args.robust else []
+    extra_args += ["--no-save"] if args.no_save else []
+    start = time.perf_counter()
+    results = []
+    # Каждый поток лишь ждёт свой процесс Blender, вся работа идёт в процессах
+    with ThreadPoolExecutor(max_workers=max(args.jobs, 1)) as pool:
+        futures = [pool.submit(run_file, args.blender, path, extra_args, args.timeout) for path in files]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            generated = result.get("summary", {}).get("generated", "-")
+            status = "ok" if result["returncode"] == 0 else "FAILED"
+            print(f"{status:<7}{result['wall_s']:>8.2f}s  generated {generated:>4}  {result['file']}")
+
+    failed = [result for result in results if result["returncode"] != 0]
+    total = time.perf_counter() - start
+    print(f"{len(files)} files in {total:.2f}s with {args.jobs} jobs, {len(failed)} failed")
+
+    if args.output:
+        results.sort(key=lambda result: result["file"])
+        with open(args.output, "w") as f:
+            json.dump({"jobs": args.jobs, "wall_s": total, "results": results}, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""Detect spheres and cylinders in a .blend file and give them Geometry Nodes, without UI.
+
+Run inside Blender, arguments after ``--`` belong to this script:
+
+    blender -b --factory-startup assets.blend --python scripts/generate_nodes_headless.py -- \
+        --summary assets.json
+
+Every mesh object recognised as an unmodified UV sphere or cylinder gets the
+same node group the pie menu operators build. Objects that already carry a
+generated node group are skipped. With ``--robust``, meshes whose topology
+is not an exact primitive (triangulated, decimated, scanned) are fitted by
+RANSAC instead. The file is saved in place (or to ``--output``) and a JSON
+summary with per-object timings is written.
+"""
+
+import argparse
+import importlib
+import importlib.util
+import json
+import os
+import sys
+import time
+
+import bpy
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Имя каталога checkout может не быть именем модуля (дефисы), поэтому пакет грузится под своим
+PACKAGE_NAME = "blender_startup_tools"
+
+
+def import_addon():
+    """Import the addon package from the checkout this script lives in, under ``PACKAGE_NAME``."""
+    if PACKAGE_NAME in sys.modules:
+        return sys.modules[PACKAGE_NAME]
+    spec = importlib.util.spec_from_file_location(PACKAGE_NAME, os.path.join(PACKAGE_DIR, "__init__.py"),
+                                                  submodule_search_locations=[PACKAGE_DIR])
+    addon = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE_NAME] = addon
+    spec.loader.exec_module(addon)
+    return addon
+
+
+def parse_args(argv):
+    argv = argv[argv.index("--") + 1:] if "--" in argv else []
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--summary", help="JSON summary path (default: next to the .blend file)")
+    parser.add_argument("--output", help="save the result here instead of overwriting the input file")
+    parser.add_argument("--kinds", default="SPHERE,CYLINDER", help="comma separated primitive kinds to build")
+    parser.add_argument("--robust", action="store_true", help="fit meshes that are not exact primitives by RANSAC")
+    parser.add_argument("--no-save", action="store_true", help="only write the summary")
+    return parser.parse_args(argv)
+
+
+def process(geometry_nodes_tools, kinds, robust=False):
+    objects = []
+    skipped = 0
+    for obj in bpy.data.objects:
+        if obj.type != 'MESH' or obj.library is not None:
+            continue
+        if geometry_nodes_tools.has_generated_nodes(obj):
+            skipped += 1
+            continue
+
+        start = time.perf_counter()
+        kind = geometry_nodes_tools.detect_primitive(obj)
+        entry = None
+        if kind in kinds:
+            try:
+                entry = geometry_nodes_tools.generate_primitive_nodes(obj, kind)
+            except ValueError as error:
+                entry = {"object": obj.name, "kind": kind, "error": str(error)}
+        elif kind is None and robust:
+            entry = geometry_nodes_tools.generate_scanned_nodes(obj, tuple(sorted(kinds)))
+        if entry is not None:
+            entry["seconds"] = time.perf_counter() - start
+            objects.append(entry)
+    return objects, skipped
+
+
+def main():
+    args = parse_args(sys.argv)
+    addon = import_addon()
+    geometry_nodes_tools = importlib.import_module(f"{addon.__name__}.geometry_nodes_tools")
+
+    start = time.perf_counter()
+    kinds = {kind.strip().upper() for kind in args.kinds.split(",") if kind.strip()}
+    objects, skipped = process(geometry_nodes_tools, kinds, args.robust)
+    generated = sum(1 for entry in objects if "error" not in entry)
+
+    saved_to = None
+    if generated and not args.no_save:
+        saved_to = args.output or bpy.data.filepath
+        bpy.ops.wm.save_as_mainfile(filepath=saved_to, copy=bool(args.output))
+
+    summary = {
+        "file": bpy.data.filepath,
+        "saved_to": saved_to,
+        "generated": generated,
+        "skipped_existing": skipped,
+        "seconds": time.perf_counter() - start,
+        "objects": objects,
+    }
+    summary_path = args.summary or os.path.splitext(bpy.data.filepath)[0] + ".nodes.json"
+    with open(summary_path, "w") as f:
+        json.dump(summary, f, indent=2)
+    print(f"Generated {generated} node groups in {summary['seconds']:.2f}s, summary in {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
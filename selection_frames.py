@@ -0,0 +1,28 @@
+"""World-space frames of edit-mode selections, shared by view and vertex alignment.
+
+A frame is a 3x3 array whose columns are the tangent, bitangent and normal
+of the selected faces (or vertices). The local frame is built once per mesh
+snapshot from normals read together with the snapshot, so an edit mesh is
+synced only once; only the object matrix is applied on every call.
+"""
+
+import numpy as np
+
+from . import geometry_kernels, mesh_snapshot
+
+
+def _object_frame(obj):
+    return np.array(obj.matrix_world.to_3x3().normalized(), dtype=np.float64)
+
+
+def selection_frame(obj):
+    """World-space frame of an object's selection, or of the object itself outside edit mode."""
+    if obj is None:
+        return None
+    if obj.mode != 'EDIT' or obj.type != 'MESH':
+        return _object_frame(obj)
+
+    frame = mesh_snapshot.get_snapshot(obj, normals=True).selection_frame()
+    if frame is None:
+        return _object_frame(obj)
+    return geometry_kernels.transform_frame(frame, np.array(obj.matrix_world.to_3x3()))
@@ -0,0 +1,172 @@
+"""Pytest setup: a minimal stand-in for the Blender modules the add-on imports.
+
+Only what registration touches is provided: base classes in ``bpy.types``,
+property factories in ``bpy.props``, class registration, handler lists and
+timers. The stubs are installed into ``sys.modules`` before the add-on is
+imported, so the tests run outside Blender; inside Blender they are not used.
+"""
+
+import importlib
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = os.path.basename(ROOT)
+
+
+class _Types(types.ModuleType):
+    # Любой тип bpy.types - пустой класс, создаётся при первом обращении
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        cls = type(name, (), {})
+        setattr(self, name, cls)
+        return cls
+
+
+class _Timers:
+    def __init__(self):
+        self.registered = set()
+
+    def register(self, function, first_interval=0.0, persistent=False):
+        self.registered.add(function)
+
+    def unregister(self, function):
+        self.registered.discard(function)
+
+    def is_registered(self, function):
+        return function in self.registered
+
+
+def _property(**options):
+    return options
+
+
+def _install_stubs():
+    bpy = types.ModuleType("bpy")
+    bpy.types = _Types("bpy.types")
+    bpy.props = types.ModuleType("bpy.props")
+    for name in ("BoolProperty", "EnumProperty", "FloatProperty", "IntProperty", "StringProperty",
+                 "FloatVectorProperty", "PointerProperty", "CollectionProperty"):
+        setattr(bpy.props, name, _property)
+
+    bpy.utils = types.ModuleType("bpy.utils")
+    bpy.utils.registered = []
+    bpy.utils.register_class = bpy.utils.registered.append
+    bpy.utils.unregister_class = bpy.utils.registered.remove
+
+    bpy.app = types.ModuleType("bpy.app")
+    handlers = types.ModuleType("bpy.app.handlers")
+    for name in ("load_pre", "load_post", "depsgraph_update_post", "save_pre", "undo_pre", "undo_post", "redo_post"):
+        setattr(handlers, name, [])
+    handlers.persistent = lambda function: function
+    bpy.app.handlers = handlers
+    bpy.app.timers = _Timers()
+
+    # Как в фоновом режиме: конфигурации клавиш аддонов нет
+    bpy.context = types.SimpleNamespace(
+        window_manager=types.SimpleNamespace(keyconfigs=types.SimpleNamespace(addon=None), windows=[]))
+    bpy.data = types.SimpleNamespace()
+    bpy.path = types.SimpleNamespace(ensure_ext=lambda path, ext: path if path.endswith(ext) else path + ext)
+
+    bpy_extras = types.ModuleType("bpy_extras")
+    bpy_extras.io_utils = types.ModuleType("bpy_extras.io_utils")
+    bpy_extras.io_utils.ExportHelper = type("ExportHelper", (), {})
+
+    sys.modules.update({
+        "bpy": bpy,
+        "bpy.types": bpy.types,
+        "bpy.props": bpy.props,
+        "bpy.utils": bpy.utils,
+        "bpy.app": bpy.app,
+        "bpy.app.handlers": handlers,
+        "bpy_extras": bpy_extras,
+        "bpy_extras.io_utils": bpy_extras.io_utils,
+    })
+
+
+if "bpy" not in sys.modules:
+    _install_stubs()
+if os.path.dirname(ROOT) not in sys.path:
+    sys.path.insert(0, os.path.dirname(ROOT))
+
+
+class FakeCollection:
+    """Mesh data collection with bulk ``foreach_get``/``foreach_set`` over NumPy attributes."""
+
+    def __init__(self, count, **attributes):
+        self.count = count
+        self.attributes = {name: np.asarray(value) for name, value in attributes.items()}
+
+    def __len__(self):
+        return self.count
+
+    def foreach_get(self, name, out):
+        out[...] = self.attributes[name].ravel()
+
+    def foreach_set(self, name, values):
+        attribute = self.attributes[name]
+        attribute[...] = np.asarray(values).reshape(attribute.shape)
+
+    def add(self, count):
+        self.count += count
+        for name, attribute in self.attributes.items():
+            self.attributes[name] = np.concatenate((attribute, np.zeros((count, *attribute.shape[1:]),
+                                                                        dtype=attribute.dtype)))
+
+
+def fake_mesh_object(co, edges=(), name="Mesh", mode='OBJECT'):
+    """Mesh object stand-in read and written in bulk like a real ``bpy.types.Object``."""
+    import bpy
+
+    co = np.array(co, dtype=np.float64).reshape(-1, 3)
+    edges = np.array(edges, dtype=np.int64).reshape(-1, 2)
+    mesh = bpy.types.Mesh()
+    mesh.name = name
+    mesh.vertices = FakeCollection(len(co), co=co, select=np.ones(len(co), dtype=bool),
+                                   normal=np.tile((0.0, 0.0, 1.0), (len(co), 1)))
+    mesh.edges = FakeCollection(len(edges), vertices=edges)
+    mesh.polygons = FakeCollection(0, loop_start=np.zeros(0, dtype=np.int64), loop_total=np.zeros(0, dtype=np.int64),
+                                   select=np.zeros(0, dtype=bool), normal=np.zeros((0, 3)), area=np.zeros(0))
+    mesh.loops = FakeCollection(0, vertex_index=np.zeros(0, dtype=np.int64))
+    mesh.update = lambda: None
+    mesh.original = mesh
+
+    obj = bpy.types.Object()
+    obj.name, obj.data, obj.mode, obj.type = name, mesh, mode, 'MESH'
+    obj.original = obj
+    obj.syncs = 0
+    # Пользовательские свойства объекта читаются через obj.get
+    obj.properties = {}
+    obj.get = obj.properties.get
+
+    def update_from_editmode():
+        obj.syncs += 1
+    obj.update_from_editmode = update_from_editmode
+    return obj
+
+
+def import_addon(name=""):
+    """Import the add-on package, or one of its modules when a name is given."""
+    return importlib.import_module(f"{PACKAGE}.{name}" if name else PACKAGE)
+
+
+@pytest.fixture
+def addon():
+    return import_addon()
+
+
+@pytest.fixture
+def kernels():
+    return import_addon("geometry_kernels")
+
+
+@pytest.fixture
+def mesh_snapshot():
+    module = import_addon("mesh_snapshot")
+    yield module
+    module.unregister()
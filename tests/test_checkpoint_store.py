@@ -0,0 +1,108 @@
+import sys
+
+import numpy as np
+import pytest
+from conftest import fake_mesh_object, import_addon
+
+
+@pytest.fixture
+def checkpoint_store(mesh_snapshot):
+    module = import_addon("checkpoint_store")
+    yield module
+    module.clear_checkpoints()
+
+
+def _coords(count, seed=0):
+    return np.random.default_rng(seed).normal(size=(count, 3)).astype(np.float32)
+
+
+@pytest.mark.parametrize("storage", ["MEMORY", "COMPRESSED", "MEMMAP"])
+def test_checkpoint_round_trip(checkpoint_store, storage):
+    indices = np.concatenate((np.arange(100, 600), np.arange(2000, 2100))).astype(np.int32)
+    coords = _coords(len(indices))
+    checkpoint = checkpoint_store.CoordinateCheckpoint(5000, indices, coords, storage)
+
+    assert checkpoint.vert_count == 5000 and checkpoint.count == len(indices)
+    assert np.array_equal(checkpoint.indices(), indices)
+    assert np.array_equal(checkpoint.coords(), coords)
+    if storage == 'COMPRESSED':
+        assert checkpoint.nbytes < indices.nbytes + coords.nbytes
+    checkpoint.release()
+
+
+def test_ring_drops_and_releases_the_oldest(checkpoint_store):
+    obj = fake_mesh_object(_coords(10), name="Ring")
+    checkpoints = [checkpoint_store.CoordinateCheckpoint(10, np.arange(10), _coords(10, seed), 'MEMMAP')
+                   for seed in range(checkpoint_store.MAX_CHECKPOINTS + 2)]
+    for checkpoint in checkpoints:
+        checkpoint_store.push_checkpoint(obj, checkpoint)
+
+    ring = checkpoint_store.get_checkpoints(obj)
+    assert list(ring) == checkpoints[2:]
+    assert all(checkpoint._file is None for checkpoint in checkpoints[:2])
+    assert all(checkpoint._file is not None for checkpoint in ring)
+
+    checkpoint_store.clear_checkpoints(obj)
+    assert all(checkpoint._file is None for checkpoint in checkpoints)
+    assert not checkpoint_store.get_checkpoints(obj)
+
+
+def test_read_and_restore_selected_vertices(checkpoint_store):
+    co = _coords(50)
+    obj = fake_mesh_object(co, name="Restore")
+    select = obj.data.vertices.attributes["select"]
+    select[:] = False
+    select[10:20] = True
+
+    vert_count, indices, coords = checkpoint_store.read_coordinates(obj)
+    assert vert_count == 50
+    assert np.array_equal(indices, np.arange(10, 20))
+    checkpoint = checkpoint_store.CoordinateCheckpoint(vert_count, indices, coords, 'COMPRESSED')
+
+    moved = co.copy()
+    moved[10:20] += 1.0
+    checkpoint_store.write_coordinates(obj, np.arange(10, 20), moved[10:20])
+    assert np.allclose(obj.data.vertices.attributes["co"], moved)
+
+    checkpoint_store.write_coordinates(obj, checkpoint.indices(), checkpoint.coords())
+    assert np.allclose(obj.data.vertices.attributes["co"], co)
+
+
+def test_saving_in_edit_mode_reuses_the_snapshot(checkpoint_store, mesh_snapshot):
+    obj = fake_mesh_object(_coords(20), name="Edit", mode='EDIT')
+    mesh_snapshot.get_snapshot(obj)
+    assert obj.syncs == 1
+
+    _vert_count, _indices, coords = checkpoint_store.read_coordinates(obj, selected_only=False)
+    assert obj.syncs == 1
+    # Чекпоинт не должен меняться вместе со снимком
+    mesh_snapshot.get_snapshot(obj).co[0] = 100.0
+    assert coords[0, 0] != 100.0
+
+
+class _FakeBMesh:
+    def __init__(self, co):
+        verts = [type("BMVert", (), {"co": tuple(point)})() for point in co.tolist()]
+        self.verts = type("BMVertSeq", (list,), {"ensure_lookup_table": lambda self: None})(verts)
+
+    def clear(self):
+        raise AssertionError("the edit BMesh must not be rebuilt")
+
+
+def test_restore_in_edit_mode_writes_only_checkpointed_verts(checkpoint_store, monkeypatch):
+    co = _coords(30)
+    obj = fake_mesh_object(co, name="EditRestore", mode='EDIT')
+    bm = _FakeBMesh(co)
+    updates = []
+    fake_bmesh = type(sys)("bmesh")
+    fake_bmesh.from_edit_mesh = lambda mesh: bm
+    fake_bmesh.update_edit_mesh = lambda mesh: updates.append(mesh)
+    monkeypatch.setitem(sys.modules, "bmesh", fake_bmesh)
+
+    _vert_count, _indices, coords = checkpoint_store.read_coordinates(obj, selected_only=False)
+    untouched = bm.verts[5]
+    checkpoint_store.write_coordinates(obj, np.array([1, 2]), coords[[1, 2]] + 1.0)
+
+    assert bm.verts[5] is untouched and bm.verts[5].co == tuple(co[5].tolist())
+    assert np.allclose(bm.verts[1].co, co[1] + 1.0)
+    assert updates == [obj.data]
@@ -0,0 +1,330 @@
+import time
+
+import numpy as np
+import pytest
+
+
+def _brute_distances(points, queries, k):
+    squared = ((queries[:, None] - points[None]) ** 2).sum(-1)
+    return np.sqrt(np.sort(squared, axis=1)[:, :k])
+
+
+def _brute_polyline_distances(polyline, queries):
+    start = polyline.points[:-1]
+    vectors = polyline.points[1:] - start
+    fraction = np.einsum('qsj,sj->qs', queries[:, None] - start[None], vectors)
+    fraction = np.clip(fraction / np.maximum((vectors * vectors).sum(1), 1e-300), 0.0, 1.0)
+    return np.linalg.norm(start[None] + vectors[None] * fraction[..., None] - queries[:, None], axis=2).min(1)
+
+
+def _projected_distances(polyline, queries):
+    foot, _tangent = polyline.evaluate(polyline.project(queries))
+    return np.linalg.norm(foot - queries, axis=1)
+
+
+def _ring(count, radius=1.0):
+    angles = np.linspace(0.0, 2.0 * np.pi, count, endpoint=False)
+    return np.column_stack((radius * np.cos(angles), radius * np.sin(angles), np.zeros(count)))
+
+
+def test_connected_components_of_selection(kernels):
+    edges = np.array([(0, 1), (1, 2), (3, 4), (4, 5), (2, 3)])
+    mask = np.array([True, True, True, False, True, True])
+    groups = kernels.connected_components(edges, mask)
+    assert [group.tolist() for group in groups] == [[0, 1, 2], [4, 5]]
+
+
+@pytest.mark.parametrize("count, query_count, k", [(5000, 700, 1), (5000, 700, 4), (3000, 500, 16), (20, 30, 25)])
+def test_query_k_matches_brute_force(kernels, count, query_count, k):
+    rng = np.random.default_rng(count + k)
+    points = rng.normal(size=(count, 3))
+    queries = rng.normal(size=(query_count, 3)) * 1.5
+    indices, distances = kernels.KDTree(points).query_k(queries, k)
+
+    found = min(k, count)
+    assert np.allclose(distances[:, :found], _brute_distances(points, queries, found))
+    assert np.allclose(np.linalg.norm(points[indices[:, :found]] - queries[:, None], axis=2), distances[:, :found])
+    assert (indices[:, found:] == -1).all()
+
+
+def test_query_k_with_small_block_limit(kernels):
+    rng = np.random.default_rng(7)
+    points = rng.normal(size=(3000, 3))
+    queries = rng.normal(size=(400, 3))
+    _indices, distances = kernels.KDTree(points).query_k(queries, 8, limit=64)
+    assert np.allclose(distances, _brute_distances(points, queries, 8))
+
+
+def test_query_k_between_parallel_rings(kernels):
+    # Кольца с частыми вершинами далеко друг от друга: границу нельзя брать от k ближайших листов
+    lower = _ring(4000)
+    upper = lower + (0.0, 0.0, 0.5)
+    _indices, distances = kernels.KDTree(upper).query_k(lower[::40], 4)
+    assert np.allclose(distances, _brute_distances(upper, lower[::40], 4))
+
+
+def test_nearest_matches_brute_force(kernels):
+    rng = np.random.default_rng(3)
+    points = rng.normal(size=(20000, 3))
+    queries = rng.normal(size=(300, 3)) * 2.0
+    _indices, distances = kernels.KDTree(points).query(queries)
+    assert np.allclose(distances, _brute_distances(points, queries, 1)[:, 0])
+
+
+@pytest.mark.parametrize("closed", [False, True])
+def test_polyline_projection_is_exact(kernels, closed):
+    rng = np.random.default_rng(11)
+    for _ in range(5):
+        count = rng.integers(2, 300)
+        # Сегменты очень разной длины, чтобы ближайшая середина не давала ближайший сегмент
+        steps = rng.normal(size=(count, 3)) * rng.choice([0.01, 1.0, 20.0], size=(count, 1))
+        polyline = kernels.Polyline(np.cumsum(steps, axis=0), closed)
+        queries = rng.normal(size=(500, 3)) * np.abs(steps).sum(0) / 5 + polyline.points.mean(0)
+        assert np.allclose(_projected_distances(polyline, queries), _brute_polyline_distances(polyline, queries))
+
+
+def test_polyline_projection_past_a_nearer_midpoint(kernels):
+    polyline = kernels.Polyline([(0, 0, 0), (10, 0, 0), (10, 1.2, 0), (4.9, 1.2, 0)])
+    assert np.allclose(_projected_distances(polyline, np.array([[5.5, 0.5, 0.0]])), 0.5)
+
+
+def test_closed_polyline_projection_across_the_seam(kernels):
+    polyline = kernels.Polyline(_ring(8), closed=True)
+    query = np.array([[np.cos(-0.05), np.sin(-0.05), 0.0]])
+    assert np.allclose(_projected_distances(polyline, query), _brute_polyline_distances(polyline, query))
+    assert polyline.length - 0.1 < polyline.project(query)[0] <= polyline.length
+
+
+@pytest.mark.parametrize("closed", [False, True])
+def test_relax_spacing_keeps_an_even_strip(kernels, closed):
+    # Ровная полоса вокруг базы уже расслаблена и не должна ни сжиматься, ни наклоняться
+    base = _ring(64)
+    if not closed:
+        base = base[:40]
+    co = np.vstack((base, base * 1.5))
+    moved = np.arange(len(base), 2 * len(base))
+    polyline = kernels.Polyline(base, closed)
+    indices, positions, residual = kernels.relax_spacing(co, polyline, moved)
+
+    assert np.allclose(positions, co[indices], atol=1e-9)
+    assert residual < 1e-9
+
+
+def test_relax_spacing_evens_out_arc_lengths(kernels):
+    base = np.column_stack((np.linspace(0, 10, 101), np.zeros(101), np.zeros(101)))
+    x = np.sort(np.random.default_rng(5).uniform(0, 10, 30))
+    co = np.vstack((base, np.column_stack((x, np.ones(30), np.zeros(30)))))
+    moved = np.arange(101, 131)
+    _indices, positions, _residual = kernels.relax_spacing(co, kernels.Polyline(base), moved)
+
+    assert np.allclose(np.diff(positions[:, 0]), (x[-1] - x[0]) / 29)
+    assert np.allclose(positions[:, 1], 1.0)
+
+
+def _strip(count, seed=0):
+    # База вдоль X и шумный ряд вершин над ней, каждая соединена ребром со своей базовой
+    rng = np.random.default_rng(seed)
+    base = np.column_stack((np.linspace(0.0, 10.0, count), np.zeros(count), np.zeros(count)))
+    moved = base + np.column_stack((rng.normal(scale=0.02, size=count), 1.0 + rng.normal(scale=0.1, size=count),
+                                    np.zeros(count)))
+    indices = np.arange(count)
+    edges = np.vstack((np.column_stack((indices[:-1], indices[1:])), np.column_stack((indices, indices + count))))
+    return np.vstack((base, moved)), edges, indices, indices + count
+
+
+def test_walk_from_joined_base_vertices_finds_the_closest_points(kernels):
+    co, edges, base, moved = _strip(5000)
+    indptr, indices = kernels.build_adjacency(edges, len(co))
+    polyline = kernels.Polyline(co[base], indices=base)
+    start = kernels.joined_base_parameters(polyline, moved, indptr, indices)
+    assert np.allclose(start, polyline.cumulative)
+
+    t, converged = polyline.walk(co[moved], start)
+    assert converged.all()
+    assert np.allclose(_projected_distances(polyline, co[moved]),
+                       np.linalg.norm(polyline.evaluate(t)[0] - co[moved], axis=1))
+
+
+def test_walk_stops_at_a_local_closest_point(kernels):
+    # Петля возвращается к запросу, но обход остаётся на своём участке кривой
+    polyline = kernels.Polyline([(0, 0, 0), (10, 0, 0), (10, 1.2, 0), (4.9, 1.2, 0)])
+    t, converged = polyline.walk(np.array([[5.5, 0.5, 0.0]]), np.array([5.5]))
+    assert converged.all()
+    assert np.allclose(t, 5.5)
+    t, _converged = polyline.walk(np.array([[5.5, 0.5, 0.0]]), np.array([polyline.length]))
+    assert np.allclose(polyline.evaluate(t)[0], [[5.5, 1.2, 0.0]])
+
+
+@pytest.mark.parametrize("closed", [False, True])
+def test_relax_spacing_solves_the_smoothing_system(kernels, closed):
+    rng = np.random.default_rng(2)
+    base = _ring(200)
+    co = np.vstack((base, base * (1.5 + rng.normal(scale=0.1, size=(200, 1)))))
+    moved = np.arange(200, 400)
+    polyline = kernels.Polyline(base, closed)
+    _indices, positions, residual = kernels.relax_spacing(co, polyline, moved, smoothing=100.0)
+    assert residual < 1e-9
+
+    _indices, kept, _residual = kernels.relax_spacing(co, polyline, moved, smoothing=0.0)
+    radii = np.sort(np.linalg.norm(co[moved], axis=1))
+    assert np.allclose(np.sort(np.linalg.norm(kept, axis=1)), radii)
+    # Сглаживание уменьшает разброс смещений, но не их среднее
+    smoothed = np.linalg.norm(positions, axis=1)
+    assert smoothed.std() < 0.5 * radii.std()
+    if closed:
+        assert np.isclose(smoothed.mean(), radii.mean())
+
+
+def test_relax_spacing_of_a_100k_strip_well_under_a_second(kernels):
+    co, edges, base, moved = _strip(100_000)
+    indptr, indices = kernels.build_adjacency(edges, len(co))
+    polyline = kernels.Polyline(co[base], indices=base)
+
+    began = time.perf_counter()
+    start = kernels.joined_base_parameters(polyline, moved, indptr, indices)
+    _indices, _positions, residual = kernels.relax_spacing(co, polyline, moved, start=start)
+    assert time.perf_counter() - began < 1.0
+    assert residual < 1e-9
+
+
+def test_relax_spacing_from_joined_base_vertices_matches_projection(kernels):
+    co, edges, base, moved = _strip(5000)
+    indptr, indices = kernels.build_adjacency(edges, len(co))
+    polyline = kernels.Polyline(co[base], indices=base)
+    start = kernels.joined_base_parameters(polyline, moved, indptr, indices)
+    walked, walked_positions, _residual = kernels.relax_spacing(co, polyline, moved, start=start)
+    projected, projected_positions, _residual = kernels.relax_spacing(co, polyline, moved)
+    assert np.array_equal(walked, projected)
+    assert np.allclose(walked_positions, projected_positions)
+
+
+def _first_fit_groups(points, radius):
+    # Группировка прежнего инструмента: первая группа, где есть вершина в пределах радиуса
+    groups = []
+    for index, point in enumerate(points):
+        for group in groups:
+            if any(np.sum((points[other] - point) ** 2) <= radius ** 2 for other in group):
+                group.append(index)
+                break
+        else:
+            groups.append([index])
+    return groups
+
+
+def test_cluster_by_distance_matches_the_first_fit_grouping(kernels):
+    points = np.random.default_rng(4).random((300, 3))
+    groups = kernels.cluster_by_distance(points, 0.08)
+    assert [group.tolist() for group in groups] == _first_fit_groups(points, 0.08)
+
+
+def test_cluster_by_distance_linkage(kernels):
+    # A, C и B между ними: C дальше радиуса от A, но связан с ним цепочкой через B
+    points = np.array([(0.0, 0, 0), (0.16, 0, 0), (0.08, 0, 0), (5.0, 0, 0)])
+    first = kernels.cluster_by_distance(points, 0.1)
+    chained = kernels.cluster_by_distance(points, 0.1, linkage='SINGLE')
+    assert [group.tolist() for group in first] == [[0, 2], [1], [3]]
+    assert [group.tolist() for group in chained] == [[0, 1, 2], [3]]
+
+
+def test_align_clusters_snaps_the_chosen_axes_to_centroids(kernels):
+    points = np.array([(0.0, 1, 2), (1, 3, 4), (5, 5, 5), (9, 7, 1)])
+    aligned = kernels.align_clusters(points, [np.array([0, 1]), np.array([2, 3])], [1, 2])
+    assert np.allclose(aligned[:, 0], points[:, 0])
+    assert np.allclose(aligned[:, 1:], [(2, 3), (2, 3), (6, 3), (6, 3)])
+
+
+@pytest.mark.parametrize("shape, flat_dimensions", [("LINE", 2), ("PLANE", 1)])
+def test_fit_clusters_flattens_every_cluster(kernels, shape, flat_dimensions):
+    rng = np.random.default_rng(6)
+    clusters = [np.arange(0, 50), np.arange(50, 100)]
+    points = rng.normal(size=(100, 3)) * (3.0, 1.0, 0.1) + np.repeat([(0, 0, 0), (10, 0, 0)], 50, axis=0)
+    fitted = kernels.fit_clusters(points, clusters, shape)
+    for members in clusters:
+        spread = np.linalg.svd(fitted[members] - fitted[members].mean(axis=0), compute_uv=False)
+        assert np.allclose(spread[3 - flat_dimensions:], 0.0, atol=1e-9)
+        assert np.allclose(fitted[members].mean(axis=0), points[members].mean(axis=0))
+
+
+def test_coincident_clusters_weld_onto_the_first_member(kernels):
+    points = np.array([(0.0, 0, 0), (0, 0, 1e-5), (0, 0, 0), (1, 0, 0), (1.1, 0, 0), (7, 7, 7)])
+    clusters = [np.array([0, 1, 2]), np.array([3, 4]), np.array([5])]
+    sources, targets = kernels.coincident_clusters(points, clusters, 1e-4)
+    assert sources.tolist() == [1, 2] and targets.tolist() == [0, 0]
+
+
+def test_equalize_positions_keeps_offsets_from_the_closest_base_vertex(kernels):
+    count = 11
+    base = np.column_stack((np.arange(count, dtype=float), np.zeros(count), np.zeros(count)))
+    moved = base + (0.2, 2.0, 0.0)
+    co = np.vstack((base, moved))
+    edges = np.array([(i, i + 1) for i in range(count - 1)] + [(i, i + count) for i in range(count)])
+    indptr, indices = kernels.build_adjacency(edges, len(co))
+
+    result, positions = kernels.equalize_positions(co, np.arange(count), np.arange(count, 2 * count), indptr,
+                                                   indices, distance_factor=0.5, orthogonal=True)
+    assert result.tolist() == list(range(count, 2 * count))
+    assert np.allclose(positions, base + (0.0, np.hypot(0.2, 2.0) * 0.5, 0.0))
+
+
+def test_nearest_pairs_and_candidates(kernels):
+    rng = np.random.default_rng(8)
+    co = rng.normal(size=(400, 3))
+    group1, group2 = np.arange(0, 100), np.arange(100, 400)
+    pairs = kernels.nearest_pairs(co, group1, group2)
+    candidates, distances = kernels.nearest_candidates(co, group1, group2, 3)
+
+    brute = np.linalg.norm(co[group1][:, None] - co[group2][None], axis=2)
+    assert np.array_equal(pairs[:, 0], group1)
+    assert np.array_equal(pairs[:, 1], group2[brute.argmin(axis=1)])
+    assert np.array_equal(candidates, group2[np.argsort(brute, axis=1)[:, :3]])
+    assert np.allclose(distances, np.sort(brute, axis=1)[:, :3])
+
+
+def test_order_polyline_walks_chains_and_loops(kernels):
+    edges = np.array([(0, 3), (3, 1), (1, 2), (5, 6), (6, 7), (7, 5)])
+    indptr, indices = kernels.build_adjacency(edges, 8)
+    ordered, closed = kernels.order_polyline(8, [0, 1, 2, 3], indptr, indices)
+    assert not closed and ordered.tolist() in ([0, 3, 1, 2], [2, 1, 3, 0])
+    ordered, closed = kernels.order_polyline(8, [5, 6, 7], indptr, indices)
+    assert closed and sorted(ordered.tolist()) == [5, 6, 7]
+    assert kernels.order_polyline(8, [0, 1, 5], indptr, indices) is None
+
+
+def _sphere_samples(count, centre, radius, rng, noise=0.0):
+    normals = rng.normal(size=(count, 3))
+    normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+    return centre + normals * (radius + rng.normal(scale=noise, size=(count, 1))), normals
+
+
+def test_fit_sphere_ignores_outliers(kernels):
+    rng = np.random.default_rng(9)
+    centre = np.array([1.0, -2.0, 0.5])
+    points, normals = _sphere_samples(3000, centre, 2.0, rng, noise=0.002)
+    # Пятая часть точек - мусор вокруг сферы
+    points[:600] = rng.uniform(-4, 4, size=(600, 3)) + centre
+    fitted_centre, radius, inliers = kernels.fit_sphere(points, points, normals)
+    assert np.allclose(fitted_centre, centre, atol=0.01)
+    assert abs(radius - 2.0) < 0.01
+    assert 0.7 < inliers <= 0.85
+
+
+def test_fit_cylinder_finds_axis_radius_and_height(kernels):
+    rng = np.random.default_rng(10)
+    angles = rng.uniform(0, 2 * np.pi, 4000)
+    heights = rng.uniform(-2.0, 2.0, 4000)
+    normals = np.column_stack((np.cos(angles), np.sin(angles), np.zeros(4000)))
+    points = normals * 1.5 + np.column_stack((np.zeros(4000), np.zeros(4000), heights)) + (3.0, 0.0, 1.0)
+    centre, axis, radius, height, inliers = kernels.fit_cylinder(points, points, normals)
+    assert abs(abs(axis[2]) - 1.0) < 1e-3
+    assert np.allclose(centre[:2], (3.0, 0.0), atol=0.01)
+    assert abs(radius - 1.5) < 0.01 and abs(height - 4.0) < 0.05
+    assert inliers > 0.95
+
+
+def test_selection_frame_follows_normal_and_spread(kernels):
+    points = np.column_stack((np.linspace(0, 4, 20), np.linspace(0, 1, 20) % 0.3, np.zeros(20)))
+    frame = kernels.selection_frame(np.tile((0.0, 0.0, 1.0), (5, 1)), np.ones(5), points)
+    assert np.allclose(frame.T @ frame, np.identity(3))
+    assert np.allclose(frame[:, 2], (0, 0, 1))
+    assert abs(frame[0, 0]) > 0.99
+    assert kernels.selection_frame([(0, 0, 1), (0, 0, -1)], [1.0, 1.0], points) is None
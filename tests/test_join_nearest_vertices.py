@@ -0,0 +1,37 @@
+import sys
+import types
+
+import numpy as np
+import pytest
+from conftest import import_addon
+
+
+@pytest.fixture
+def join(monkeypatch):
+    # Вне Blender mathutils нет: дерево не нужно, проверка разреза подменяется ниже
+    bvhtree = types.ModuleType("mathutils.bvhtree")
+    bvhtree.BVHTree = types.SimpleNamespace(FromPolygons=lambda co, polygons: None)
+    monkeypatch.setitem(sys.modules, "mathutils", types.ModuleType("mathutils"))
+    monkeypatch.setitem(sys.modules, "mathutils.bvhtree", bvhtree)
+    return import_addon("join_nearest_vertices")
+
+
+def test_validate_pairs_casts_only_the_candidate_it_tries(join, monkeypatch):
+    blocked = {(0, 10), (1, 11), (1, 12)}
+    cast = []
+
+    def crosses(tree, co, i1, i2, polygons):
+        cast.append((i1, i2))
+        return (i1, i2) in blocked
+    monkeypatch.setattr(join, "_crosses_geometry", crosses)
+
+    co = np.zeros((20, 3))
+    faces = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+    group1 = np.array([0, 1, 2, 3])
+    candidates = np.array([(10, 13, 14), (11, 12, 15), (16, 17, 18), (19, 10, -1)])
+    distances = np.array([(1.0, 1.1, 1.2), (1.0, 1.5, 9.0), (1.0, 1.1, 1.2), (9.0, 9.5, np.inf)])
+
+    pairs, stats = join.validate_pairs(co, faces, group1, candidates, distances, max_length_factor=3.0)
+    assert pairs.tolist() == [[0, 13], [2, 16]]
+    assert sorted(cast) == [(0, 10), (0, 13), (1, 11), (1, 12), (2, 16)]
+    assert stats == {"crossing": 3, "too_long": 2, "fallbacks": 1, "dropped": 2}
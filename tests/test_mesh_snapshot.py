@@ -0,0 +1,130 @@
+import threading
+import types
+
+import numpy as np
+from conftest import fake_mesh_object
+
+
+def _snapshot(module, vert_count, seed):
+    rng = np.random.default_rng(seed)
+    co = rng.normal(size=(vert_count, 3)).astype(np.float32)
+    edges = np.column_stack((np.arange(vert_count - 1), np.arange(1, vert_count))).astype(np.int32)
+    return module.MeshSnapshot(co, np.ones(vert_count, dtype=bool), edges, (0, 0))
+
+
+class _GuardedDict(dict):
+    # Вытеснение обходит _derived всех снимков под замком, поэтому менять его можно только под ним
+    def __init__(self, lock):
+        super().__init__()
+        self.lock = lock
+
+    def __setitem__(self, key, value):
+        assert self.lock.locked()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        assert self.lock.locked()
+        super().__delitem__(key)
+
+
+def test_derived_structures_change_under_the_lock(mesh_snapshot):
+    snapshot = _snapshot(mesh_snapshot, 200, 0)
+    snapshot._derived = _GuardedDict(mesh_snapshot._lock)
+    snapshot.selected_indices()
+    snapshot.components()
+    snapshot.kd_tree(np.arange(50))
+    snapshot.coords_changed()
+    assert set(snapshot._derived) == {"selected", "components"}
+
+
+def test_derived_structures_survive_concurrent_eviction(mesh_snapshot, monkeypatch):
+    # Пул префетча строит деревья, пока оператор вытесняет снимки
+    monkeypatch.setattr(mesh_snapshot, "MEMORY_BUDGET", 1)
+    snapshots = [_snapshot(mesh_snapshot, 2000, seed) for seed in range(4)]
+    errors = []
+
+    def build(snapshot):
+        try:
+            for step in range(200):
+                snapshot.kd_tree(np.arange(step % 50 + 1), count=False)
+                if step % 10 == 0:
+                    snapshot.coords_changed()
+        except Exception as error:
+            errors.append(error)
+
+    def evict():
+        try:
+            for _ in range(2000):
+                with mesh_snapshot._lock:
+                    for name, snapshot in enumerate(snapshots):
+                        mesh_snapshot._snapshots[name] = snapshot
+                mesh_snapshot._enforce_budget()
+                mesh_snapshot.memory_usage()
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=build, args=(snapshot,)) for snapshot in snapshots]
+    threads.append(threading.Thread(target=evict))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+
+
+def _depsgraph(*ids):
+    return types.SimpleNamespace(updates=[types.SimpleNamespace(id=id_data) for id_data in ids])
+
+
+def test_sync_from_editmode_update_is_absorbed(mesh_snapshot):
+    obj = fake_mesh_object(np.zeros((4, 3)), name="Cube", mode='EDIT')
+    key = mesh_snapshot._id_key(obj)
+
+    # Обновление от самой синхронизации поглощается, следующее уже учитывается
+    mesh_snapshot.sync_from_editmode(obj)
+    mesh_snapshot._on_depsgraph_update(None, _depsgraph(obj))
+    assert mesh_snapshot._update_counters.get(key, 0) == 0
+    mesh_snapshot._on_depsgraph_update(None, _depsgraph(obj))
+    assert mesh_snapshot._update_counters[key] == 1
+
+
+def test_absorption_lasts_one_depsgraph_pass(mesh_snapshot):
+    obj = fake_mesh_object(np.zeros((4, 3)), name="Cube", mode='EDIT')
+    other = fake_mesh_object(np.zeros((4, 3)), name="Other")
+
+    mesh_snapshot.sync_from_editmode(obj)
+    mesh_snapshot._on_depsgraph_update(None, _depsgraph(other))
+    mesh_snapshot._on_depsgraph_update(None, _depsgraph(obj))
+    assert mesh_snapshot._update_counters[mesh_snapshot._id_key(obj)] == 1
+
+
+def test_redo_rerun_reads_the_undone_mesh(mesh_snapshot):
+    co = np.arange(12, dtype=np.float64).reshape(4, 3)
+    obj = fake_mesh_object(co, edges=[(0, 1), (1, 2), (2, 3)], name="Cube")
+    first = mesh_snapshot.get_snapshot(obj)
+    mesh_snapshot.write_coords(obj, np.array([1, 2]), np.zeros((2, 3)))
+    assert np.allclose(first.co[1:3], 0.0)
+
+    # Панель Redo: отмена возвращает меш и сразу перезапускает оператор, depsgraph не обновляется
+    mesh_snapshot._on_undo(None)
+    obj.data.vertices.attributes["co"][...] = co
+    mesh_snapshot._on_undo(None)
+    snapshot = mesh_snapshot.get_snapshot(obj)
+    assert snapshot is not first
+    assert np.allclose(snapshot.co, co)
+
+    # Запоздалое обновление от отмены не должно поглотиться как наша запись
+    mesh_snapshot.write_coords(obj, np.array([0]), np.ones((1, 3)))
+    mesh_snapshot._on_undo(None)
+    mesh_snapshot._on_depsgraph_update(None, _depsgraph(obj, obj.data))
+    assert mesh_snapshot.get_snapshot(obj).version != snapshot.version
+
+
+def test_load_pre_forgets_snapshots_and_counters(mesh_snapshot):
+    mesh_snapshot._snapshots["Cube"] = _snapshot(mesh_snapshot, 10, 0)
+    mesh_snapshot._update_counters[('OBJECT', "Cube")] = 3
+    mesh_snapshot._pending_writes.add(('MESH', "Cube"))
+    mesh_snapshot._on_load_pre(None)
+    assert not mesh_snapshot._snapshots
+    assert not mesh_snapshot._update_counters
+    assert not mesh_snapshot._pending_writes
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from conftest import fake_mesh_object, import_addon
+
+
+@pytest.fixture
+def prefetch(mesh_snapshot):
+    return import_addon("prefetch")
+
+
+def _two_strips():
+    co = np.vstack((np.column_stack((np.arange(10.0), np.zeros(10), np.zeros(10))),
+                    np.column_stack((np.arange(10.0), np.ones(10), np.zeros(10)))))
+    edges = [(i, i + 1) for i in range(9)] + [(i, i + 1) for i in range(10, 19)]
+    return co, edges
+
+
+def test_warm_does_not_sync_an_edit_mesh(prefetch, mesh_snapshot):
+    obj = fake_mesh_object(*_two_strips(), name="Edit", mode='EDIT')
+    assert prefetch.warm(obj) is False
+    assert obj.syncs == 0
+    assert mesh_snapshot.cached_snapshot(obj) is None
+
+
+def test_warm_builds_structures_on_a_valid_edit_snapshot(prefetch, mesh_snapshot):
+    obj = fake_mesh_object(*_two_strips(), name="Edit", mode='EDIT')
+    snapshot = mesh_snapshot.get_snapshot(obj)
+    assert prefetch.warm(obj) is True
+    assert obj.syncs == 1
+    assert "components" in snapshot._derived
+    assert any(isinstance(key, tuple) and key[0] == "tree" for key in snapshot._derived)
+
+
+def test_warm_extracts_object_mode_meshes(prefetch, mesh_snapshot):
+    obj = fake_mesh_object(*_two_strips(), name="Object")
+    assert prefetch.warm(obj) is True
+    assert obj.syncs == 0
+    assert mesh_snapshot.cached_snapshot(obj) is not None
@@ -0,0 +1,74 @@
+import types
+
+import bpy
+import pytest
+from conftest import fake_mesh_object, import_addon
+
+
+@pytest.fixture
+def sync(monkeypatch):
+    module = import_addon("primitive_sync")
+    nodes = import_addon("geometry_nodes_tools")
+    objects = {}
+    pushed = []
+    monkeypatch.setattr(bpy, "data", types.SimpleNamespace(objects=objects), raising=False)
+    monkeypatch.setattr(bpy, "ops", types.SimpleNamespace(ed=types.SimpleNamespace(
+        undo_push=_UndoPush(pushed))), raising=False)
+    resynced = []
+
+    def resync(obj):
+        resynced.append(obj.name)
+        if obj.name == "Broken":
+            raise ValueError("Object does not have clear cylindrical bases.")
+        return True
+    monkeypatch.setattr(nodes, "resync_primitive_nodes", resync)
+    module.stats.update(batches=0, checked=0, refits=0, failures=0)
+    yield types.SimpleNamespace(module=module, objects=objects, resynced=resynced, pushed=pushed)
+    module.unregister()
+
+
+class _UndoPush:
+    def __init__(self, pushed):
+        self.pushed = pushed
+
+    def __call__(self, message):
+        self.pushed.append(message)
+
+    def poll(self):
+        return True
+
+
+def _add(sync, name, mode='OBJECT'):
+    obj = fake_mesh_object([(0.0, 0.0, 0.0)], name=name, mode=mode)
+    sync.objects[name] = obj
+    sync.module.track(obj)
+    return obj
+
+
+def _update(obj, geometry=False, transform=False):
+    return types.SimpleNamespace(id=obj, is_updated_geometry=geometry, is_updated_transform=transform)
+
+
+def test_transform_updates_mark_objects_dirty(sync):
+    cube = _add(sync, "Cube")
+    sync.module._on_depsgraph_update(None, types.SimpleNamespace(updates=[_update(cube, transform=True)]))
+    assert sync.module._dirty == {"Cube"}
+    assert bpy.app.timers.is_registered(sync.module._flush)
+
+
+def test_flush_retries_edit_mode_objects_and_pushes_one_undo_step(sync, caplog):
+    edit = _add(sync, "Edit", mode='EDIT')
+    for name in ("Cube", "Broken"):
+        _add(sync, name)
+    sync.module._dirty.update(("Edit", "Cube", "Broken", "Deleted"))
+
+    assert sync.module._flush() == sync.module.THROTTLE_S
+    assert sync.module._dirty == {"Edit"}
+    assert sorted(sync.resynced) == ["Broken", "Cube"]
+    assert sync.pushed == ["Re-sync Primitive Nodes"]
+    assert sync.module.stats["failures"] == 1
+    assert "Broken" in caplog.text
+
+    edit.mode = 'OBJECT'
+    assert sync.module._flush() is None
+    assert not sync.module._dirty and sync.resynced[-1] == "Edit"
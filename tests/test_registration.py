@@ -0,0 +1,40 @@
+import sys
+
+import bpy
+from conftest import PACKAGE, import_addon
+
+
+def _fresh_addon():
+    # Модули выгружаются, чтобы в замер попал и их импорт, как при запуске Blender
+    for name in [name for name in sys.modules if name == PACKAGE or name.startswith(PACKAGE + ".")]:
+        del sys.modules[name]
+    return import_addon()
+
+
+def test_registration_fits_budget():
+    addon = _fresh_addon()
+    addon.register()
+    try:
+        assert addon.registration_time < addon.REGISTRATION_BUDGET_S
+    finally:
+        addon.unregister()
+
+
+def test_registration_defers_heavy_modules():
+    addon = _fresh_addon()
+    addon.register()
+    try:
+        for name in ("geometry_kernels", "checkpoint_store", *addon.LAZY_MODULE_NAMES):
+            assert f"{PACKAGE}.{name}" not in sys.modules
+    finally:
+        addon.unregister()
+
+
+def test_unregister_removes_handlers_and_timers():
+    addon = _fresh_addon()
+    addon.register()
+    addon.unregister()
+    for name in ("load_pre", "load_post", "depsgraph_update_post", "undo_pre", "undo_post", "redo_post"):
+        assert not getattr(bpy.app.handlers, name)
+    assert not bpy.app.timers.registered
+    assert not bpy.utils.registered
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from conftest import FakeCollection, fake_mesh_object, import_addon
+
+
+class _Matrix:
+    def __init__(self, array):
+        self.array = np.asarray(array, dtype=np.float64)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.array if dtype is None else self.array.astype(dtype)
+
+    def to_3x3(self):
+        return _Matrix(self.array[:3, :3])
+
+    def normalized(self):
+        return _Matrix(self.array / np.linalg.norm(self.array, axis=0))
+
+
+@pytest.fixture
+def frames(mesh_snapshot):
+    return import_addon("selection_frames")
+
+
+def _tilted_quads():
+    # Две грани в плоскости XY, вытянутые вдоль X; выделена вторая, с нормалью по Z
+    co = np.array([(0, 0, 0), (4, 0, 0), (4, 1, 0), (0, 1, 0), (0, 0, 1), (4, 0, 1)], dtype=np.float64)
+    obj = fake_mesh_object(co, name="Quads", mode='EDIT')
+    obj.data.polygons = FakeCollection(2, select=np.array([False, True]), normal=np.array([(0, -1.0, 0), (0, 0, 1.0)]),
+                                       area=np.array([4.0, 4.0]))
+    obj.data.vertices.attributes["select"][4:] = False
+    obj.matrix_world = _Matrix(np.identity(4))
+    return obj
+
+
+def test_edit_frame_syncs_the_edit_mesh_once(frames, mesh_snapshot):
+    obj = _tilted_quads()
+    frame = frames.selection_frame(obj)
+    assert obj.syncs == 1
+    assert np.allclose(frame[:, 2], (0, 0, 1))
+    assert abs(frame[0, 0]) > 0.99
+
+    # Другая матрица объекта не требует нового чтения меша
+    rotation = np.identity(4)
+    rotation[:2, :2] = ((0, -1), (1, 0))
+    obj.matrix_world = _Matrix(rotation)
+    assert np.allclose(np.abs(frames.selection_frame(obj)[:, 0]), (0, 1, 0))
+    assert obj.syncs == 1
+
+    # Координаты, исправленные нашей записью, делают нормали устаревшими
+    mesh_snapshot.get_snapshot(obj).coords_changed()
+    frames.selection_frame(obj)
+    assert obj.syncs == 2
@@ -0,0 +1,142 @@
+"""Named viewport performance profiles applied to every 3D viewport at once.
+
+A profile sets gizmos, overlays, wireframe overlay, shading type and scene
+simplify; subdivision is capped through ``simplify_subdivision``, so no
+modifier data is ever changed. Applying the first profile remembers the
+previous viewport state, and the simplify settings of every scene a
+profile touches, so they can be restored instantly. None of this goes
+through undo: it is a pure display state.
+"""
+
+import bpy
+
+# None оставляет настройку без изменений
+PROFILES = {
+    'FAST': {
+        "label": "Fast Navigation",
+        "description": "Hide gizmos and overlays, solid shading, no subdivision in the viewport",
+        "show_gizmo": False,
+        "show_overlays": False,
+        "show_wireframes": False,
+        "shading_type": 'SOLID',
+        "use_simplify": True,
+        "simplify_subdivision": 0,
+    },
+    'WIREFRAME': {
+        "label": "Wireframe",
+        "description": "Wireframe shading with overlays, subdivision capped at level 1",
+        "show_gizmo": True,
+        "show_overlays": True,
+        "show_wireframes": False,
+        "shading_type": 'WIREFRAME',
+        "use_simplify": True,
+        "simplify_subdivision": 1,
+    },
+    'QUALITY': {
+        "label": "Quality",
+        "description": "Gizmos, overlays and material preview without simplify",
+        "show_gizmo": True,
+        "show_overlays": True,
+        "show_wireframes": None,
+        "shading_type": 'MATERIAL',
+        "use_simplify": False,
+        "simplify_subdivision": None,
+    },
+}
+
+SPACE_SETTINGS = (
+    ("show_gizmo", lambda space: space, "show_gizmo"),
+    ("show_overlays", lambda space: space.overlay, "show_overlays"),
+    ("show_wireframes", lambda space: space.overlay, "show_wireframes"),
+    ("shading_type", lambda space: space.shading, "type"),
+)
+SCENE_SETTINGS = ("use_simplify", "simplify_subdivision")
+
+# Состояние до применения первого профиля и имя активного профиля
+_saved_state = None
+_active_profile = None
+
+
+def active_profile():
+    return _active_profile
+
+
+def view3d_spaces(window_manager):
+    """Yield (area, space) for every 3D viewport in every window."""
+    for window in window_manager.windows:
+        for area in window.screen.areas:
+            if area.type != 'VIEW_3D':
+                continue
+            for space in area.spaces:
+                if space.type == 'VIEW_3D':
+                    yield area, space
+
+
+def _capture_spaces(window_manager):
+    spaces = {}
+    for _area, space in view3d_spaces(window_manager):
+        spaces[space.as_pointer()] = {
+            key: getattr(owner(space), attr) for key, owner, attr in SPACE_SETTINGS
+        }
+    return spaces
+
+
+def apply_profile(name, window_manager, scene):
+    """Apply a profile to all viewports and the scene; return (spaces, scenes) touched."""
+    global _saved_state, _active_profile
+    profile = PROFILES[name]
+    if _saved_state is None:
+        _saved_state = {"spaces": _capture_spaces(window_manager), "scenes": {}}
+    # Настройки каждой сцены запоминаются при первом профиле в ней
+    _saved_state["scenes"].setdefault(scene.name, {attr: getattr(scene.render, attr) for attr in SCENE_SETTINGS})
+
+    space_count = 0
+    for area, space in view3d_spaces(window_manager):
+        for key, owner, attr in SPACE_SETTINGS:
+            if profile[key] is not None:
+                setattr(owner(space), attr, profile[key])
+        area.tag_redraw()
+        space_count += 1
+
+    for attr in SCENE_SETTINGS:
+        if profile[attr] is not None:
+            setattr(scene.render, attr, profile[attr])
+
+    _active_profile = name
+    return space_count, len(_saved_state["scenes"])
+
+
+def restore(window_manager):
+    """Put back the state saved before the first profile; return (spaces, scenes) restored."""
+    global _saved_state, _active_profile
+    if _saved_state is None:
+        return 0, 0
+    state, _saved_state, _active_profile = _saved_state, None, None
+
+    space_count = 0
+    for area, space in view3d_spaces(window_manager):
+        # Вьюпорты, открытые после применения профиля, не трогаем
+        settings = state["spaces"].get(space.as_pointer())
+        if settings is None:
+            continue
+        for key, owner, attr in SPACE_SETTINGS:
+            setattr(owner(space), attr, settings[key])
+        area.tag_redraw()
+        space_count += 1
+
+    scene_count = 0
+    for scene_name, settings in state["scenes"].items():
+        scene = bpy.data.scenes.get(scene_name)
+        if scene is None:
+            continue
+        for attr, value in settings.items():
+            setattr(scene.render, attr, value)
+        scene_count += 1
+    return space_count, scene_count
+
+
+def forget():
+    """Drop the saved state without restoring it."""
+    global _saved_state, _active_profile
+    _saved_state = None
+    _active_profile = None